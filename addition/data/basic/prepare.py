@@ -1,8 +1,13 @@
 import os
 import pickle
 import random
+import sys
 import numpy as np
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from shared.encoding import CharTokenizer
+
 # 1. Generate Data
 # We want to teach the model single digit addition: "a+b=c"
 # Range: 0-9
@@ -42,11 +47,9 @@ print(f"Vocab size: {vocab_size}")
 stoi = { ch:i for i,ch in enumerate(chars) }
 itos = { i:ch for i,ch in enumerate(chars) }
 
-def encode(s):
-    return [stoi[c] for c in s]
-
-def decode(l):
-    return ''.join([itos[i] for i in l])
+# encoder / decoder: string <-> list of integers
+tok = CharTokenizer(stoi, itos)
+encode, decode = tok.encode, tok.decode
 
 print(f"Train size: {len(train_data)}")
 print(f"Val size: {len(val_data)}")
@@ -5,8 +5,13 @@ Examples: "12+34=46", "99+01=100", etc.
 import os
 import pickle
 import random
+import sys
 import numpy as np
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from shared.encoding import CharTokenizer
+
 # 1. Generate Data
 # Range: 00-99 + 00-99
 # We use zero-padding to keep length consistent (optional, but helps simple models)
@@ -49,11 +54,9 @@ print(f"Vocab size: {vocab_size}")
 stoi = {ch: i for i, ch in enumerate(chars)}
 itos = {i: ch for i, ch in enumerate(chars)}
 
-def encode(s):
-    return [stoi[c] for c in s]
-
-def decode(l):
-    return ''.join([itos[i] for i in l])
+# encoder / decoder: string <-> list of integers
+tok = CharTokenizer(stoi, itos)
+encode, decode = tok.encode, tok.decode
 
 # 3. Save
 train_ids = encode(train_data)
@@ -3,14 +3,18 @@ Evaluate the accuracy of the trained model on addition tasks.
 Generates prompts (e.g., "12+34=") and checks if the model's output matches the correct answer.
 """
 import os
-import pickle
 from contextlib import nullcontext
 import torch
 import sys
 # Add nanoGPT directory to sys.path so we can import model.py
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../comp560-nanoGPT')))
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from model import GPTConfig, GPT
+from shared.analytics import addition_tables, format_tables, write_tables
+from shared.encoding import CharTokenizer
+from shared.generation import generate_batch, check_kv_parity
 import random
 
 # -----------------------------------------------------------------------------
@@ -24,6 +28,11 @@ temperature = 0.8            # 0.8 is good for some randomness, or use ~0 for ri
 top_k = 200
 seed = 1337
 device = 'cuda' # or 'cpu'
+batched = False              # decode many prompts together instead of one model.generate call each
+batch_size = 500             # prompts per padded batch when batched=True
+kv_cache = False             # reuse per-layer keys/values, feeding only the newest token each step
+check_parity = False         # greedy-decode every prompt with and without the KV cache and compare
+analytics_dir = ''           # print the error breakdown tables (shared/analytics.py) and append them as CSVs here
 # -----------------------------------------------------------------------------
 # Allow config override from command line
 # e.g. python evaluate.py out_dir=out/basic dataset=basic num_samples=50
@@ -65,11 +74,9 @@ model.to(device)
 meta_path = os.path.join('data', dataset, 'meta.pkl')
 if os.path.exists(meta_path):
     print(f"Loading meta from {meta_path}...")
-    with open(meta_path, 'rb') as f:
-        meta = pickle.load(f)
-    stoi, itos = meta['stoi'], meta['itos']
-    encode = lambda s: [stoi[c] for c in s]
-    decode = lambda l: ''.join([itos[i] for i in l])
+    tok = CharTokenizer.from_meta(meta_path)
+    stoi = tok.stoi
+    encode, decode = tok.encode, tok.decode
 else:
     print(f"Error: meta.pkl not found at {meta_path}")
     sys.exit(1)
@@ -79,6 +86,7 @@ else:
 print(f"\nStarting evaluation (N={num_samples})...")
 correct_count = 0
 total_count = 0
+hits = []
 
 # We need to know what kind of problem (1-digit or 2-digit) we are testing.
 # We'll infer it roughly or just generate random additions suitable for the dataset.
@@ -88,34 +96,53 @@ total_count = 0
 is_basic = 'basic' in dataset
 range_max = 10 if is_basic else 100
 
-for i in range(num_samples):
-    # Generate a random test case
+# Draw the test set up front so both decoding paths score the same prompts.
+# The draw is unseeded as before unless seed= is passed on the command line.
+if any(arg.split('=', 1)[0] == 'seed' for arg in sys.argv[1:]):
+    random.seed(seed)
+cases = []
+for _ in range(num_samples):
     a = random.randint(0, range_max - 1)
     b = random.randint(0, range_max - 1)
+    cases.append((a, b))
+prompts = [f"{a}+{b}=" for a, b in cases]
+
+if check_parity:
+    mismatches = []
+    for start in range(0, len(prompts), batch_size):
+        chunk = [encode(p) for p in prompts[start:start + batch_size]]
+        mismatches += [start + j for j in check_kv_parity(model, chunk, max_new_tokens, stoi['\n'])]
+    print(f"KV-cache parity (greedy): {len(prompts) - len(mismatches)}/{len(prompts)} identical")
+    for j in mismatches[:10]:
+        print(f"  mismatch: {prompts[j]}")
+
+# Generate
+# Each completion is the decoded text after the prompt (model.generate output includes x).
+# With top_k=1 (greedy) both paths produce identical completions; with sampling they
+# consume random draws in a different order, so individual samples can differ.
+completions = []
+if batched or kv_cache:
+    step = batch_size if batched else 1
+    for start in range(0, len(prompts), step):
+        chunk = [encode(p) for p in prompts[start:start + step]]
+        outs = generate_batch(model, chunk, max_new_tokens, stoi['\n'],
+                              temperature=temperature, top_k=top_k, kv_cache=kv_cache)
+        completions.extend(decode(o) for o in outs)
+else:
+    for prompt in prompts:
+        start_ids = encode(prompt)
+        x = (torch.tensor(start_ids, dtype=torch.long, device=device)[None, ...])
+        with torch.no_grad():
+            y = model.generate(x, max_new_tokens, temperature=temperature, top_k=top_k, stop_token=stoi['\n'])
+        completions.append(decode(y[0].tolist())[len(prompt):])
+
+for i, ((a, b), prompt, generated_part) in enumerate(zip(cases, prompts, completions)):
     target = a + b
-    
-    prompt = f"{a}+{b}="
-    
-    # Encode
-    start_ids = encode(prompt)
-    x = (torch.tensor(start_ids, dtype=torch.long, device=device)[None, ...])
-
-    # Generate
-    with torch.no_grad():
-        # Using a slightly customized generate loop could be faster/cleaner to stop at \n
-        # but for simplicity we use model.generate and then parse string
-        y = model.generate(x, max_new_tokens, temperature=temperature, top_k=top_k, stop_token=stoi['\n'])
-        
-    output_str = decode(y[0].tolist())
-    
+
     # Parsing logic:
-    # prompt is "12+34=", output_str is "12+34=46\n" (ideally)
+    # prompt is "12+34=", generated_part is "46\n" (ideally)
     # We want to extract "46"
-    
-    # Remove the prompt part if it's there (model.generate output usually includes input x)
-    # But wait, model.generate returns full sequence including x.
-    generated_part = output_str[len(prompt):]
-    
+
     # Cut off at the first newline or end of string
     answer_str = generated_part.split('\n')[0].strip()
     
@@ -127,6 +154,7 @@ for i in range(num_samples):
     is_correct = (predicted_val == target)
     if is_correct:
         correct_count += 1
+    hits.append(is_correct)
     
     total_count += 1
     
@@ -139,3 +167,12 @@ accuracy = (correct_count / total_count) * 100
 print("-" * 30)
 print(f"Final Result: {correct_count}/{total_count} Correct")
 print(f"Accuracy: {accuracy:.2f}%")
+
+# Where the errors are: accuracy by operand length, carries, answer length, digit position
+if analytics_dir:
+    tables = addition_tables([a for a, _ in cases], [b for _, b in cases],
+                             [c.split('\n')[0] for c in completions], correct=hits)
+    print()
+    print(format_tables(tables))
+    write_tables(tables, analytics_dir, checkpoint=ckpt_path)
+    print(f"Saved breakdown tables to {analytics_dir}")
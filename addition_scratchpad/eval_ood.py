@@ -0,0 +1,98 @@
+"""
+Length-generalization report for one checkpoint, in one process.
+
+Replaces the per-file eval_scratchpad.py runs in commands.md: the model is loaded
+once and the in-distribution val split plus every OOD file are evaluated together,
+with samples grouped into (prompt length, output length) buckets so batches need
+no padding (see shared/ood_eval.py). Prints exact and final-answer accuracy per
+bucket and per file.
+
+Takes the same config files and --key=value overrides as train_benchmark.py;
+out_dir (ckpt.pt), dataset (meta.pkl, val.jsonl), max_new_tokens and device
+are read from them.
+
+Usage (from addition_scratchpad/):
+    python eval_ood.py config/phase4_curriculum.py
+
+    python eval_ood.py config/phase2_scratchpad.py --device=cpu \
+        --files="['data/plain_3_4digit/3digit.jsonl','data/plain_3_4digit/4digit.jsonl']" \
+        --csv=results/ood_phase2.csv
+"""
+
+import os
+import sys
+from ast import literal_eval
+
+# Add nanoGPT directory to sys.path so we can import model.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../comp560-nanoGPT')))
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model import GPT, GPTConfig
+from shared.encoding import CharTokenizer
+from shared.ood_eval import BucketedEval, format_report, write_report
+from shared.sweep import load_checkpoint
+
+OOD_FILES = [
+    'data/plain_3_4digit/3digit.jsonl',
+    'data/plain_3_4digit/4digit.jsonl',
+    'data/plain_5digit/5digit.jsonl',
+]
+
+# -----------------------------------------------------------------------------
+config = dict(
+    out_dir='out', dataset='scratchpad_1_4digit', device='cuda', max_new_tokens=100,
+    separator_token='=', stop_token='\n',
+    files=[],                # eval files (default: data/<dataset>/val.jsonl + OOD_FILES)
+    eval_batch_size=1000,    # prompts decoded together within a bucket
+    max_samples=0,           # per file (0 = all)
+    csv='',                  # append per-bucket rows here
+)
+# -----------------------------------------------------------------------------
+# Config file(s) and --key=value overrides, as in nanoGPT's configurator.py
+for arg in sys.argv[1:]:
+    if '=' not in arg:
+        assert not arg.startswith('--')
+        print(f"Overriding config with {arg}:")
+        with open(arg) as f:
+            scope = {}
+            exec(f.read(), scope)
+        config.update({k: v for k, v in scope.items() if k in config})
+    else:
+        assert arg.startswith('--')
+        key, val = arg[2:].split('=', 1)
+        if key not in config:
+            raise ValueError(f"Unknown config key: {key}")
+        try:
+            val = literal_eval(val)
+        except (SyntaxError, ValueError):
+            pass  # keep as string
+        print(f"Overriding: {key} = {val}")
+        config[key] = val
+
+data_dir = os.path.join('data', config['dataset'])
+files = config['files'] or [os.path.join(data_dir, 'val.jsonl')] + OOD_FILES
+found = []
+for f in files:
+    if os.path.exists(f):
+        found.append(f)
+    else:
+        print(f"Warning: {f} not found, skipped")
+files = found
+
+tok = CharTokenizer.from_meta(data_dir)
+evalset = BucketedEval(files, tok, config['separator_token'], config['stop_token'], config['max_samples'])
+
+ckpt_path = os.path.join(config['out_dir'], 'ckpt.pt')
+print(f"Loading model from {ckpt_path}...")
+checkpoint = load_checkpoint(ckpt_path)
+model = GPT(GPTConfig(**checkpoint['model_args']))
+model.load_state_dict(checkpoint['model'])
+model.eval()
+model.to(config['device'])
+del checkpoint
+
+rows = evalset.evaluate(model, config['max_new_tokens'], config['eval_batch_size'])
+print(format_report(rows))
+if config['csv']:
+    write_report(rows, config['csv'], out_dir=config['out_dir'])
+    print(f"Saved {config['csv']}")
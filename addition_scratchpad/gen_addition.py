@@ -20,54 +20,11 @@ Scratchpad bracket structure: [dA+dB(+carry)=sum,Cnew_carry]
 import json
 import random
 import os
+import sys
 
-
-def build_scratchpad(a: int, b: int) -> str:
-    """
-    Build the full scratchpad output string for a + b.
-
-    Examples:
-        build_scratchpad(15, 27) -> "[5+7=12,C1][1+2+1=4,C0]42"
-        build_scratchpad(99, 99) -> "[9+9=18,C1][9+9+1=19,C1][1]198"
-        build_scratchpad(3, 4)   -> "[3+4=7,C0]7"
-        build_scratchpad(0, 0)   -> "[0+0=0,C0]0"
-    """
-    result = a + b
-
-    # Determine max digit length (pad shorter number with leading zeros)
-    a_str = str(a)
-    b_str = str(b)
-    max_len = max(len(a_str), len(b_str), 1)
-
-    # Pad both to equal length
-    a_padded = a_str.zfill(max_len)
-    b_padded = b_str.zfill(max_len)
-
-    # Process right-to-left (least significant digit first)
-    a_digits = [int(c) for c in reversed(a_padded)]
-    b_digits = [int(c) for c in reversed(b_padded)]
-
-    brackets = []
-    carry = 0
-
-    for i in range(max_len):
-        da = a_digits[i]
-        db = b_digits[i]
-        s = da + db + carry
-        new_carry = s // 10
-
-        if carry > 0:
-            brackets.append(f"[{da}+{db}+{carry}={s},C{new_carry}]")
-        else:
-            brackets.append(f"[{da}+{db}={s},C{new_carry}]")
-
-        carry = new_carry
-
-    # Remaining carry becomes its own bracket
-    if carry > 0:
-        brackets.append(f"[{carry}]")
-
-    return "".join(brackets) + str(result)
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.scratchpad import build_scratchpad
 
 
 def generate_plain(out_dir: str, max_digits: int = 2) -> None:
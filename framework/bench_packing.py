@@ -0,0 +1,66 @@
+"""
+Compare nanoGPT's random windows with PackedLoader batches (shared/packing.py).
+
+For every prepared dataset given, draws --batches training batches both ways and
+reports the mean number of output-region labels per batch that are trained with
+their complete sample in context (the window reaches back to the sample's first
+input token). PackedLoader rows only hold whole samples, so every kept label
+counts; random windows lose the labels of samples cut at the window start. Also
+prints the slot utilization of the packed rows.
+
+Only the batches are compared: wiring forward_packed() into the nanoGPT trainer
+(comp560-nanoGPT train.py) is outside this repo.
+
+Usage (from framework/, after prepare.py has written train.bin / train.idx):
+    python bench_packing.py ../masking_study/data/phase2_3x ../masking_study/data/plain_3digit \
+        --block_size=64 --batch_size=128
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.packing import PackedLoader
+from shared.sample_index import read_index
+from shared.token_bin import open_bin
+
+
+def random_window_labels(data_len: int, index: np.ndarray, block_size: int, batch_size: int, rng) -> int:
+    """Output-region labels with their whole sample in context, over one batch of random windows."""
+    starts = rng.integers(0, data_len - block_size, batch_size)
+    q = starts[:, None] + 1 + np.arange(block_size)[None, :]        # absolute position of each label
+    sample = np.searchsorted(index[:, 0], q, side='right') - 1
+    in_output = q > index[sample, 1]
+    whole = index[sample, 0] >= starts[:, None]
+    return int((in_output & whole).sum())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Labels trained with full context: random windows vs packed rows.")
+    parser.add_argument('data_dirs', nargs='+', help='Prepared dataset dirs (train.bin + train.idx)')
+    parser.add_argument('--block_size', type=int, default=64)
+    parser.add_argument('--batch_size', type=int, default=128)
+    parser.add_argument('--batches', type=int, default=50, help='Batches averaged per mode')
+    parser.add_argument('--seed', type=int, default=1337)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<40} {'random':>8} {'packed':>8} {'util %':>7}")
+    for data_dir in args.data_dirs:
+        data_len = len(open_bin(os.path.join(data_dir, 'train.bin')))
+        index = np.asarray(read_index(os.path.join(data_dir, 'train.idx')))
+        rng = np.random.default_rng(args.seed)
+        random_labels = np.mean([random_window_labels(data_len, index, args.block_size, args.batch_size, rng)
+                                 for _ in range(args.batches)])
+
+        loader = PackedLoader(data_dir, 'train', args.block_size, target_mask=True, seed=args.seed)
+        packed_labels = np.mean([int((loader.get_batch(args.batch_size)[1] != -1).sum())
+                                 for _ in range(args.batches)])
+        print(f"{data_dir:<40} {random_labels:>8.0f} {packed_labels:>8.0f} {100 * loader.utilization:>7.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Import the Exp 6 results gathered before the results store existed into
+results/results.db: the accuracy CSVs scraped from the eval logs and the W&B
+validation-loss exports. New results are appended by eval_sweep.py and
+train_ensemble.py directly.
+
+Files already imported (by name) are skipped, so this is safe to rerun.
+
+Run from masking_benchmark/:
+    python build_results_db.py
+"""
+
+import os
+import sys
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.results_store import ResultsStore, import_accuracy_csv, import_wandb_csv
+
+EXPERIMENT = 'masking_benchmark'
+RESULTS_DIR = 'results'
+
+ACCURACY = [
+    ('accuracy_ab.csv',         'addition_2digit'),
+    ('accuracy_scratchpad.csv', 'scratchpad_1_2digit'),
+]
+LOSS = [
+    ('val_loss_ab.csv', 'addition_2digit'),
+    ('val_loss_cd.csv', 'scratchpad_1_2digit'),
+]
+
+
+def main():
+    store = ResultsStore(os.path.join(RESULTS_DIR, 'results.db'))
+    done = store.sources()
+    for name, dataset in ACCURACY + LOSS:
+        if os.path.basename(name) in done:
+            print(f"Skipping {name} (already imported)")
+            continue
+        path = os.path.join(RESULTS_DIR, name)
+        if name in dict(ACCURACY):
+            n = import_accuracy_csv(store, path, EXPERIMENT, dataset)
+        else:
+            n = import_wandb_csv(store, path, EXPERIMENT, dataset, step_scale=500)
+        print(f"Imported {n} rows from {path}")
+    print(f"Saved {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Post-hoc AR eval of every saved snapshot, in one process.
+
+Replaces the per-snapshot eval_generation.py loop in COMMANDS.md: meta.pkl and the
+eval split are loaded once, every out/<cond>/ckpt_*.pt is streamed through one
+resident model, and results go straight to the accuracy CSV (cond,iter,accuracy)
+and to the results store (results/results.db, see shared/results_store.py).
+Snapshots already in the CSV are skipped, so an interrupted sweep can be rerun.
+
+Usage (from masking_benchmark/):
+    python eval_sweep.py --dataset=addition_2digit --conds "cond_[AB]_s*" \
+        --csv results/accuracy_ab.csv
+
+    python eval_sweep.py --dataset=scratchpad_1_2digit --conds "cond_[CD]_s*" \
+        --csv results/accuracy_scratchpad.csv
+
+    # teacher-forced exact-match (tf_accuracy), one forward pass per batch
+    python eval_sweep.py --dataset=scratchpad_1_2digit --conds "cond_[CD]_s*" \
+        --csv results/tf_accuracy_scratchpad.csv --teacher_forced
+"""
+
+import argparse
+import glob
+import os
+import sys
+
+# Add nanoGPT directory to sys.path so we can import model.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../comp560-nanoGPT')))
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.results_store import ResultsStore
+from shared.sweep import EvalSet, find_checkpoints, sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate all checkpoint snapshots in one process.")
+    parser.add_argument('--dataset', type=str, required=True, help='Dataset name under data/ (for meta.pkl and the eval split)')
+    parser.add_argument('--conds', type=str, nargs='+', required=True, help='Run names under out/ (glob patterns allowed)')
+    parser.add_argument('--csv', type=str, required=True, help='Accuracy CSV to write (cond,iter,accuracy)')
+    parser.add_argument('--benchmark_target', type=str, default='val', help="Eval split: 'train' or 'val'")
+    parser.add_argument('--eval_max_samples', type=int, default=0, help='Max samples per eval (0 = all)')
+    parser.add_argument('--subset', type=str, default='stratified', choices=['stratified', 'first'], help='Which rows --eval_max_samples keeps: a seeded stratified subset (cached next to the split) or the first rows')
+    parser.add_argument('--batch_size', type=int, default=1000, help='Prompts decoded together')
+    parser.add_argument('--device', type=str, default='cuda')
+    parser.add_argument('--sep', type=str, default='=', help='Separator between input and output')
+    parser.add_argument('--stop_token', type=str, default='\n', help='Token indicating end of a sample (EOS)')
+    parser.add_argument('--db', type=str, default='results/results.db', help="Results store to append to ('' to skip)")
+    parser.add_argument('--no_resume', action='store_true', help='Overwrite the CSV instead of skipping snapshots already in it')
+    parser.add_argument('--teacher_forced', action='store_true', help='Score teacher-forced exact-match in one forward pass per batch (tf_accuracy) instead of AR decoding')
+    parser.add_argument('--analytics', type=str, default='', help='Directory to append per-checkpoint error breakdowns to (shared/analytics.py; AR mode only)')
+    parser.add_argument('--ci_width', type=float, default=0.0, help='Sequential eval: stop once the 95%% Wilson interval is this wide (fraction, e.g. 0.064 for +-3.2%%); 0 = score every sample')
+    parser.add_argument('--ci_step', type=int, default=200, help='Samples scored between interval checks in sequential eval')
+    parser.add_argument('--no_early_exit', action='store_true', help='Decode every row to the stop token or budget instead of stopping rows that diverge from the answer')
+    args = parser.parse_args()
+
+    conds = []
+    for pattern in args.conds:
+        matches = sorted(os.path.basename(p) for p in glob.glob(os.path.join('out', pattern)))
+        conds += [c for c in (matches or [pattern]) if c not in conds]
+
+    jobs = []
+    for cond in conds:
+        ckpts = find_checkpoints(os.path.join('out', cond))
+        if not ckpts:
+            print(f"Warning: no ckpt_*.pt snapshots in out/{cond}")
+        jobs += [(cond, it, path) for it, path in ckpts]
+    print(f"{len(jobs)} snapshots across {len(conds)} runs")
+
+    eval_set = EvalSet(os.path.join('data', args.dataset), args.benchmark_target, args.eval_max_samples,
+                       args.sep, args.stop_token, early_exit=not args.no_early_exit,
+                       subset=args.subset)
+    store = ResultsStore(args.db) if args.db else None
+    experiment = os.path.basename(os.path.dirname(os.path.abspath(__file__)))
+    sweep(jobs, eval_set, args.csv, args.device, args.batch_size, resume=not args.no_resume,
+          store=store, experiment=experiment, teacher_forced=args.teacher_forced,
+          analytics_dir=args.analytics or None, ci_width=args.ci_width, ci_step=args.ci_step)
+    print(f"Saved {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
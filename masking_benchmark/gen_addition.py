@@ -6,10 +6,26 @@ and writes them to data/addition_2digit/addition_2digit.jsonl.
 
 Run from masking_benchmark/:
     python gen_addition.py
+    python gen_addition.py --prepare   # also write train/val .bin, meta.pkl and JSONL splits
+                                       # (same as prepare.py --shuffle, no JSONL round trip)
+                                       # add --compact for uint8 .bin files (shared/token_bin.py)
+                                       # and --seed N for another split (default 1337);
+                                       # skipped when manifest.json is up to date (--force)
 """
 
+import argparse
 import json
 import os
+import sys
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.dataset_cache import detach
+from shared.manifest import VERSION, up_to_date, write_manifest
+from shared.pipeline import prepare_pairs
+
+
+PREPARED_FILES = ["meta.pkl", "train.bin", "val.bin", "train.idx", "val.idx", "train.jsonl", "val.jsonl"]
 
 
 def generate_addition_dataset(filename, num_digits=2):
@@ -30,5 +46,34 @@ def generate_addition_dataset(filename, num_digits=2):
     print(f"Saved {len(data)} samples to {filename}")
 
 
+def prepare_addition_dataset(out_dir, num_digits=2, seed=1337, compact=False, force=False):
+    """Fused generate + prepare for the exhaustive num_digits-digit dataset."""
+    record = {"version": VERSION, "generator": "masking_benchmark/gen_addition.py", "kind": "plain",
+              "num_digits": num_digits, "seed": seed, "compact": compact}
+    if not force and up_to_date(out_dir, record):
+        print(f"{out_dir} is up to date (manifest.json); use --force to re-prepare.")
+        return
+    limit = 10 ** num_digits
+    a = [a for a in range(limit) for _ in range(limit)]
+    b = [b for _ in range(limit) for b in range(limit)]
+    detach(out_dir, PREPARED_FILES)
+    prepare_pairs(a, b, out_dir, kind="plain", shuffle=True, seed=seed, compact=compact)
+    write_manifest(out_dir, record, PREPARED_FILES)
+
+
 if __name__ == '__main__':
-    generate_addition_dataset('data/addition_2digit/addition_2digit.jsonl', num_digits=2)
+    parser = argparse.ArgumentParser(description="Generate the 2-digit addition dataset.")
+    parser.add_argument('--prepare', action='store_true',
+                        help='Write train/val .bin, meta.pkl and JSONL splits directly instead of the JSONL file')
+    parser.add_argument('--seed', type=int, default=1337, help='Shuffle seed for --prepare')
+    parser.add_argument('--compact', action='store_true',
+                        help='With --prepare, write .bin files in the versioned uint8 format')
+    parser.add_argument('--force', action='store_true',
+                        help='With --prepare, re-prepare even when manifest.json shows the dataset is up to date')
+    args = parser.parse_args()
+
+    if args.prepare:
+        prepare_addition_dataset('data/addition_2digit', num_digits=2, seed=args.seed,
+                                 compact=args.compact, force=args.force)
+    else:
+        generate_addition_dataset('data/addition_2digit/addition_2digit.jsonl', num_digits=2)
@@ -10,46 +10,27 @@ Bracket structure: [dA+dB(+carry)=sum,Cnew_carry] processed right-to-left.
 
 Run from masking_benchmark/:
     python gen_scratchpad.py
+    python gen_scratchpad.py --prepare   # also write train/val .bin, meta.pkl and JSONL splits
+                                         # (same as prepare.py --shuffle, no JSONL round trip)
+                                         # add --compact for uint8 .bin files (shared/token_bin.py)
+                                         # and --seed N for another split (default 1337);
+                                         # skipped when manifest.json is up to date (--force)
 """
 
+import argparse
 import json
 import os
+import sys
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.dataset_cache import detach
+from shared.manifest import VERSION, up_to_date, write_manifest
+from shared.pipeline import prepare_pairs
+from shared.scratchpad import build_scratchpad
 
-def build_scratchpad(a: int, b: int) -> str:
-    """
-    Build the full scratchpad output string for a + b.
 
-    Examples:
-        build_scratchpad(15, 27) -> "[5+7=12,C1][1+2+1=4,C0]42"
-        build_scratchpad(99, 99) -> "[9+9=18,C1][9+9+1=19,C1][1]198"
-        build_scratchpad(3, 4)   -> "[3+4=7,C0]7"
-        build_scratchpad(0, 0)   -> "[0+0=0,C0]0"
-    """
-    a_str = str(a)
-    b_str = str(b)
-    max_len = max(len(a_str), len(b_str), 1)
-
-    a_digits = [int(c) for c in reversed(a_str.zfill(max_len))]
-    b_digits = [int(c) for c in reversed(b_str.zfill(max_len))]
-
-    brackets = []
-    carry = 0
-
-    for i in range(max_len):
-        da, db = a_digits[i], b_digits[i]
-        s = da + db + carry
-        new_carry = s // 10
-        if carry > 0:
-            brackets.append(f"[{da}+{db}+{carry}={s},C{new_carry}]")
-        else:
-            brackets.append(f"[{da}+{db}={s},C{new_carry}]")
-        carry = new_carry
-
-    if carry > 0:
-        brackets.append(f"[{carry}]")
-
-    return "".join(brackets) + str(a + b)
+PREPARED_FILES = ["meta.pkl", "train.bin", "val.bin", "train.idx", "val.idx", "train.jsonl", "val.jsonl"]
 
 
 def generate_scratchpad_dataset(out_dir: str, num_digits: int = 2) -> None:
@@ -68,5 +49,35 @@ def generate_scratchpad_dataset(out_dir: str, num_digits: int = 2) -> None:
     print(f"Saved {len(data)} samples to {fname}")
 
 
+def prepare_scratchpad_dataset(out_dir: str, num_digits: int = 2, seed: int = 1337,
+                               compact: bool = False, force: bool = False) -> None:
+    """Fused generate + prepare for the exhaustive num_digits-digit scratchpad dataset."""
+    record = {"version": VERSION, "generator": "masking_benchmark/gen_scratchpad.py", "kind": "scratchpad",
+              "num_digits": num_digits, "seed": seed, "compact": compact}
+    if not force and up_to_date(out_dir, record):
+        print(f"{out_dir} is up to date (manifest.json); use --force to re-prepare.")
+        return
+    limit = 10 ** num_digits
+    a = [a for a in range(limit) for _ in range(limit)]
+    b = [b for _ in range(limit) for b in range(limit)]
+    detach(out_dir, PREPARED_FILES)
+    prepare_pairs(a, b, out_dir, kind="scratchpad", shuffle=True, seed=seed, compact=compact)
+    write_manifest(out_dir, record, PREPARED_FILES)
+
+
 if __name__ == '__main__':
-    generate_scratchpad_dataset('data/scratchpad_1_2digit', num_digits=2)
+    parser = argparse.ArgumentParser(description="Generate the 2-digit scratchpad addition dataset.")
+    parser.add_argument('--prepare', action='store_true',
+                        help='Write train/val .bin, meta.pkl and JSONL splits directly instead of the JSONL file')
+    parser.add_argument('--seed', type=int, default=1337, help='Shuffle seed for --prepare')
+    parser.add_argument('--compact', action='store_true',
+                        help='With --prepare, write .bin files in the versioned uint8 format')
+    parser.add_argument('--force', action='store_true',
+                        help='With --prepare, re-prepare even when manifest.json shows the dataset is up to date')
+    args = parser.parse_args()
+
+    if args.prepare:
+        prepare_scratchpad_dataset('data/scratchpad_1_2digit', num_digits=2, seed=args.seed,
+                                   compact=args.compact, force=args.force)
+    else:
+        generate_scratchpad_dataset('data/scratchpad_1_2digit', num_digits=2)
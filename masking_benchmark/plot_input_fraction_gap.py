@@ -5,11 +5,19 @@ Bar chart of final autoregressive accuracy for plain (A/B) vs scratchpad (C/D),
 with mean +/- std over 3 seeds and gap annotations above each pair.
 
 Saves results/masking_gap_by_input_fraction.png. Run from masking_benchmark/.
+Accuracies are read from results/results.db (see build_results_db.py).
 """
 
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.results_store import ResultsStore
+
 COLOR_NOMASK = '#E05C5C'
 COLOR_MASKED = '#4C8EDA'
 
@@ -20,10 +28,11 @@ plt.rcParams.update({
 })
 
 # Per-seed final accuracies at iter 10,000.
-A = np.array([83.9, 82.5, 84.2])
-B = np.array([89.8, 90.2, 89.8])
-C = np.array([86.3, 87.7, 86.4])
-D = np.array([86.7, 84.8, 86.6])
+FINAL_ITER = 10000
+final = ResultsStore('results/results.db', read_only=True).query(
+    'ar_accuracy', experiment='masking_benchmark', conds=['A', 'B', 'C', 'D'], required=True)
+final = final[final['iter'] == FINAL_ITER].sort_values('seed')
+A, B, C, D = (final.loc[final['cond'] == c, 'value'].to_numpy() for c in 'ABCD')
 
 means = np.array([A.mean(), B.mean(), C.mean(), D.mean()])
 stds = np.array([A.std(ddof=0), B.std(ddof=0), C.std(ddof=0), D.std(ddof=0)])
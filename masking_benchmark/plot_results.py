@@ -5,15 +5,28 @@ Generates two figures saved to results/:
   - AR_accuracy_convergence_curve.png  (AR accuracy vs iterations)
   - val_loss_curve.png                 (Validation loss vs iterations)
 
+Data is read from results/results.db (see shared/results_store.py); run
+build_results_db.py first to import the CSVs exported before the store existed.
+
 Run from masking_benchmark/:
     python plot_results.py
 """
 
+import os
+import sys
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import numpy as np
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.results_store import ResultsStore
+
+EXPERIMENT = 'masking_benchmark'
+store = ResultsStore('results/results.db', read_only=True)
+
 # ── Style ─────────────────────────────────────────────────────────────────────
 COLOR_A = '#E05C5C'   # red    — Condition A (plain, no mask)
 COLOR_B = '#4C8EDA'   # blue   — Condition B (plain, target mask)
@@ -27,12 +40,11 @@ plt.rcParams.update({
 })
 
 
-def plot_accuracy(csv_path, conditions, out_path, title):
-    acc = pd.read_csv(csv_path)
-    acc['iter'] = acc['iter'].astype(int)
-    acc['cond_label'] = acc['cond'].str.extract(
-        r'(cond_[' + ''.join(c[0][-1] for c in conditions) + r'])'
-    )
+def plot_accuracy(dataset, conditions, out_path, title):
+    acc = store.query('ar_accuracy', experiment=EXPERIMENT, dataset=dataset,
+                      conds=[c[0][-1] for c in conditions], required=True)
+    acc['cond_label'] = 'cond_' + acc['cond']
+    acc = acc.rename(columns={'value': 'accuracy'})
 
     _, ax = plt.subplots(figsize=(8, 5))
     for cond_label, color, name in conditions:
@@ -62,22 +74,11 @@ def plot_accuracy(csv_path, conditions, out_path, title):
     print(f"Saved {out_path}")
 
 
-def plot_loss(csv_path, conditions, out_path, title):
-    loss_raw = pd.read_csv(csv_path)
-    mean_cols = [c for c in loss_raw.columns if 'val/loss' in c
-                 and '__MIN' not in c and '__MAX' not in c]
-    loss_raw['iter'] = loss_raw['Step'].astype(int) * 500
-
-    rows = []
-    for col in mean_cols:
-        run = col.split(' - ')[0].strip()
-        cond = run[:6]
-        tmp = loss_raw[['iter', col]].copy()
-        tmp.columns = ['iter', 'loss']
-        tmp['run']  = run
-        tmp['cond'] = cond
-        rows.append(tmp.dropna())
-    loss = pd.concat(rows, ignore_index=True)
+def plot_loss(dataset, conditions, out_path, title):
+    loss = store.query('loss', split='val', experiment=EXPERIMENT, dataset=dataset,
+                       conds=[c[0][-1] for c in conditions], required=True)
+    loss['cond'] = 'cond_' + loss['cond']
+    loss = loss.rename(columns={'value': 'loss'})
 
     _, ax = plt.subplots(figsize=(8, 5))
     for cond_label, color, name in conditions:
@@ -110,12 +111,12 @@ AB_CONDITIONS = [
 ]
 
 plot_accuracy(
-    'results/accuracy_ab.csv', AB_CONDITIONS,
+    'addition_2digit', AB_CONDITIONS,
     'results/AR_accuracy_convergence_curve_ab.png',
     'AR Accuracy vs. Iterations — Plain Addition\n(mean ± seed range, 3 seeds per condition)',
 )
 plot_loss(
-    'results/val_loss_ab.csv', AB_CONDITIONS,
+    'addition_2digit', AB_CONDITIONS,
     'results/val_loss_curve_ab.png',
     'Validation Loss vs. Iterations — Plain Addition\n(mean ± seed range, 3 seeds per condition)',
 )
@@ -127,12 +128,12 @@ CD_CONDITIONS = [
 ]
 
 plot_accuracy(
-    'results/accuracy_scratchpad.csv', CD_CONDITIONS,
+    'scratchpad_1_2digit', CD_CONDITIONS,
     'results/AR_accuracy_convergence_curve_cd.png',
     'AR Accuracy vs. Iterations — Scratchpad Addition\n(mean ± seed range, 3 seeds per condition)',
 )
 plot_loss(
-    'results/val_loss_cd.csv', CD_CONDITIONS,
+    'scratchpad_1_2digit', CD_CONDITIONS,
     'results/val_loss_curve_cd.png',
     'Validation Loss vs. Iterations — Scratchpad Addition\n(mean ± seed range, 3 seeds per condition)',
 )
@@ -0,0 +1,60 @@
+"""
+Train all seed replicates of one condition in a single process.
+
+Takes the same config files and --key=value overrides as train_benchmark.py, plus
+--seeds and --run_name. Replica k (counting from 1) trains with seeds[k-1] and
+writes its checkpoints to out/<run_name>_s<k>, exactly where the per-seed runs
+in COMMANDS.md would, so eval_sweep.py picks them up unchanged.
+See shared/ensemble.py for how the replicas are stacked.
+
+Usage (from masking_benchmark/):
+    python train_ensemble.py config/addition_2digit.py --target_mask=False \
+        --seeds="[1337,1338,1339]" --run_name=cond_A
+
+    python train_ensemble.py config/scratchpad_1_2digit.py --target_mask=True \
+        --seeds="[1337,1338,1339]" --run_name=cond_D
+
+W&B logging is not supported in this mode; losses are printed per replica.
+"""
+
+import os
+import sys
+from ast import literal_eval
+
+# Add nanoGPT directory to sys.path so we can import model.py
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../comp560-nanoGPT')))
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.ensemble import DEFAULTS, train_ensemble
+
+# -----------------------------------------------------------------------------
+# Defaults (shared/ensemble.py DEFAULTS) with this experiment's name for the results store
+config = dict(DEFAULTS, experiment=os.path.basename(os.path.dirname(os.path.abspath(__file__))))
+# -----------------------------------------------------------------------------
+# Config file(s) and --key=value overrides, as in nanoGPT's configurator.py
+for arg in sys.argv[1:]:
+    if '=' not in arg:
+        assert not arg.startswith('--')
+        print(f"Overriding config with {arg}:")
+        with open(arg) as f:
+            scope = {}
+            exec(f.read(), scope)
+        config.update({k: v for k, v in scope.items() if k in config})
+    else:
+        assert arg.startswith('--')
+        key, val = arg[2:].split('=', 1)
+        if key not in config:
+            raise ValueError(f"Unknown config key: {key}")
+        try:
+            val = literal_eval(val)
+        except (SyntaxError, ValueError):
+            pass  # keep as string
+        print(f"Overriding: {key} = {val}")
+        config[key] = val
+
+if not config['run_name']:
+    raise ValueError("--run_name is required (replica k writes to out/<run_name>_s<k>)")
+seeds = list(config['seeds'])
+out_dirs = [os.path.join('out', f"{config['run_name']}_s{k}") for k in range(1, len(seeds) + 1)]
+
+train_ensemble(config, seeds, out_dirs)
@@ -0,0 +1,64 @@
+"""
+Import the Exp 7 results gathered before the results store existed into
+results/results.db: the accuracy CSVs scraped from the eval logs and the W&B
+validation-loss exports in results/loss/. New results are appended by
+eval_sweep.py and train_ensemble.py directly.
+
+Files already imported (by name) are skipped, so this is safe to rerun.
+
+Run from masking_study/:
+    python build_results_db.py
+"""
+
+import os
+import sys
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.results_store import ResultsStore, import_accuracy_csv, import_wandb_csv
+
+EXPERIMENT = 'masking_study'
+RESULTS_DIR = 'results'
+
+ACCURACY = [
+    ('accuracy_plain3.csv',    'plain_3digit'),
+    ('accuracy_plain4.csv',    'plain_4digit'),
+    ('accuracy_scratch3.csv',  'scratchpad_3digit'),
+    ('accuracy_scratch4.csv',  'scratchpad_4digit'),
+    ('accuracy_phase2_1x.csv', 'phase2_1x'),
+    ('accuracy_phase2_2x.csv', 'phase2_2x'),
+    ('accuracy_phase2_3x.csv', 'phase2_3x'),
+    ('accuracy_phase2_4x.csv', 'phase2_4x'),
+    ('accuracy_phase2_5x.csv', 'phase2_5x'),
+]
+LOSS = [
+    ('loss/val_loss_EF.csv', 'plain_3digit'),
+    ('loss/val_loss_GH.csv', 'plain_4digit'),
+    ('loss/val_loss_IJ.csv', 'scratchpad_3digit'),
+    ('loss/val_loss_KL.csv', 'scratchpad_4digit'),
+    ('loss/val_loss_MN.csv', 'phase2_1x'),
+    ('loss/val_loss_OP.csv', 'phase2_2x'),
+    ('loss/val_loss_QR.csv', 'phase2_3x'),
+    ('loss/val_loss_ST.csv', 'phase2_4x'),
+    ('loss/val_loss_UV.csv', 'phase2_5x'),
+]
+
+
+def main():
+    store = ResultsStore(os.path.join(RESULTS_DIR, 'results.db'))
+    done = store.sources()
+    for name, dataset in ACCURACY + LOSS:
+        if os.path.basename(name) in done:
+            print(f"Skipping {name} (already imported)")
+            continue
+        path = os.path.join(RESULTS_DIR, name)
+        if name in dict(ACCURACY):
+            n = import_accuracy_csv(store, path, EXPERIMENT, dataset)
+        else:
+            n = import_wandb_csv(store, path, EXPERIMENT, dataset, step_scale=500)
+        print(f"Imported {n} rows from {path}")
+    print(f"Saved {store.path}")
+
+
+if __name__ == "__main__":
+    main()
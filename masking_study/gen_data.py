@@ -21,89 +21,127 @@ Each JSONL line: {"input": "<repeated_eq>", "output": "<scratchpad>"}
 Run from masking_study/:
     python gen_data.py           # Phase 1 only
     python gen_data.py --phase2  # Phase 2 only
+
+Add --workers=N to format variants and shards of large variants in N worker
+processes (0 = all cores). Output is byte-identical to the serial run.
+
+Add --prepare to skip the JSONL round trip: each variant's train.bin, val.bin,
+meta.pkl and train/val JSONL splits are written directly, with the same 90/10
+shuffled split as `prepare.py --shuffle` (--seed, default 1337, fixes the
+shuffle), plus a manifest.json so a rerun skips variants that are already up to
+date (--force re-prepares them). With --compact as well, the .bin files use the
+versioned uint8 format (shared/token_bin.py). With --cache, the prepared files
+are kept in the shared dataset cache (shared/dataset_cache.py), keyed by the
+generator parameters, and linked from data/<name>/.
 """
 
+import argparse
 import json
 import os
 import random
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.dataset_cache import detach, prepare_cached
+from shared.manifest import VERSION, up_to_date, write_manifest
+from shared.pipeline import prepare_pairs
+from shared.scratchpad import scratchpad_strings
+
 
 # ---------------------------------------------------------------------------
-# Scratchpad builder (adapted from masking_benchmark/gen_scratchpad.py)
+# Dataset generators
 # ---------------------------------------------------------------------------
 
-def build_scratchpad(a: int, b: int) -> str:
+def sample_pairs(lo: int, hi: int, n: int, seed: int = 42) -> list:
     """
-    Build the full scratchpad output string for a + b.
+    Sample min(n, (hi-lo+1)^2) distinct pairs from [lo, hi] x [lo, hi].
+
+    Draws linear indices i into the square without replacement and maps them to
+    (lo + i // width, lo + i % width), so memory is O(n) however wide the
+    operand range is (random.sample on a range never materializes it beyond a
+    small pool). Deterministic for a given seed; for squares small enough to
+    enumerate, the result equals rng.sample() over the row-major pair list.
+    Returns list of (a, b) tuples in draw order.
+    """
+    rng = random.Random(seed)
+    width = hi - lo + 1
+    total_pairs = width * width
+    return [(lo + i // width, lo + i % width) for i in rng.sample(range(total_pairs), min(n, total_pairs))]
 
-    Examples:
-        build_scratchpad(12, 34)  -> "[2+4=6,C0][1+3=4,C0]46"
-        build_scratchpad(58, 47)  -> "[8+7=15,C1][5+4+1=10,C1][1]105"
-        build_scratchpad(100, 200) -> "[0+0=0,C0][0+0=0,C0][1+2=3,C0]300"
+
+def _draw_pairs_rejection(lo: int, hi: int, n: int, seed: int = 42) -> list:
     """
-    a_str = str(a)
-    b_str = str(b)
-    max_len = max(len(a_str), len(b_str), 1)
-
-    a_digits = [int(c) for c in reversed(a_str.zfill(max_len))]
-    b_digits = [int(c) for c in reversed(b_str.zfill(max_len))]
-
-    brackets = []
-    carry = 0
-
-    for i in range(max_len):
-        da, db = a_digits[i], b_digits[i]
-        s = da + db + carry
-        new_carry = s // 10
-        if carry > 0:
-            brackets.append(f"[{da}+{db}+{carry}={s},C{new_carry}]")
-        else:
-            brackets.append(f"[{da}+{db}={s},C{new_carry}]")
-        carry = new_carry
+    The original large-space sampler: draw (a, b) with randint and reject repeats,
+    falling back to sampling with replacement after 3n attempts. Kept so the
+    committed Phase 1 datasets regenerate byte-identically.
+    """
+    rng = random.Random(seed)
+    seen = set()
+    chosen = []
+    attempts = 0
+    max_attempts = n * 3
+    while len(chosen) < n and attempts < max_attempts:
+        a = rng.randint(lo, hi)
+        b = rng.randint(lo, hi)
+        key = (a, b)
+        if key not in seen:
+            seen.add(key)
+            chosen.append(key)
+        attempts += 1
+    # Fill remaining with replacement if needed
+    while len(chosen) < n:
+        a = rng.randint(lo, hi)
+        b = rng.randint(lo, hi)
+        chosen.append((a, b))
+    return chosen
+
+
+def draw_pairs(lo: int, hi: int, n: int, seed: int = 42, sampler: str = "index") -> list:
+    """
+    Sample n pairs from [lo, hi] x [lo, hi] without replacement (if feasible).
+    Returns list of (a, b) tuples in draw order.
 
-    if carry > 0:
-        brackets.append(f"[{carry}]")
+    sampler="index":     linear-index sampling (sample_pairs); always distinct
+    sampler="rejection": the original randint-with-rejection draw for spaces
+                         larger than 10n (the Phase 1 variants were generated
+                         with it); smaller spaces use sample_pairs either way,
+                         which reproduces the old enumerate-and-sample path
+    """
+    if sampler not in ("index", "rejection"):
+        raise ValueError(f"unknown sampler: {sampler}")
+    if sampler == "rejection" and (hi - lo + 1) ** 2 > n * 10:
+        return _draw_pairs_rejection(lo, hi, n, seed)
+    return sample_pairs(lo, hi, n, seed)
 
-    return "".join(brackets) + str(a + b)
 
+def format_records(pairs: list, kind: str, multiplier: int = 1) -> list:
+    """
+    Turn (a, b) pairs into JSONL records.
+
+    kind="plain":      {"input": "a+b", "output": "sum"}
+    kind="scratchpad": {"input": "a+b", "output": "<scratchpad>"}
+    kind="repeated":   {"input": "a+b=a+b...", "output": "<scratchpad>"}, with the
+                       base equation repeated `multiplier` times
+    """
+    if kind == "plain":
+        return [{"input": f"{a}+{b}", "output": str(a + b)} for a, b in pairs]
+    if kind not in ("scratchpad", "repeated"):
+        raise ValueError(f"unknown record kind: {kind}")
+    # Scratchpads for the whole batch come from the vectorized builder
+    outputs = scratchpad_strings([a for a, _ in pairs], [b for _, b in pairs])
+    reps = multiplier if kind == "repeated" else 1
+    return [{"input": "=".join([f"{a}+{b}"] * reps), "output": out}
+            for (a, b), out in zip(pairs, outputs)]
 
-# ---------------------------------------------------------------------------
-# Dataset generators
-# ---------------------------------------------------------------------------
 
 def generate_plain(lo: int, hi: int, n: int, seed: int = 42) -> list:
     """
     Sample n pairs from [lo, hi] x [lo, hi] without replacement (if feasible).
     Returns list of {"input": "a+b", "output": "sum"} dicts.
     """
-    rng = random.Random(seed)
-    total_pairs = (hi - lo + 1) ** 2
-
-    if total_pairs <= n * 10:
-        # Small enough: enumerate all pairs and sample without replacement
-        pairs = [(a, b) for a in range(lo, hi + 1) for b in range(lo, hi + 1)]
-        chosen = rng.sample(pairs, min(n, len(pairs)))
-    else:
-        # Large space: sample with replacement (collision probability negligible)
-        seen = set()
-        chosen = []
-        attempts = 0
-        max_attempts = n * 3
-        while len(chosen) < n and attempts < max_attempts:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            key = (a, b)
-            if key not in seen:
-                seen.add(key)
-                chosen.append(key)
-            attempts += 1
-        # Fill remaining with replacement if needed
-        while len(chosen) < n:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            chosen.append((a, b))
-
-    return [{"input": f"{a}+{b}", "output": str(a + b)} for a, b in chosen]
+    return format_records(draw_pairs(lo, hi, n, seed), "plain")
 
 
 def generate_scratchpad(lo: int, hi: int, n: int, seed: int = 42) -> list:
@@ -111,31 +149,7 @@ def generate_scratchpad(lo: int, hi: int, n: int, seed: int = 42) -> list:
     Sample n pairs from [lo, hi] x [lo, hi] and build scratchpad sequences.
     Returns list of {"input": "a+b", "output": "<scratchpad>"} dicts.
     """
-    rng = random.Random(seed)
-    total_pairs = (hi - lo + 1) ** 2
-
-    if total_pairs <= n * 10:
-        pairs = [(a, b) for a in range(lo, hi + 1) for b in range(lo, hi + 1)]
-        chosen = rng.sample(pairs, min(n, len(pairs)))
-    else:
-        seen = set()
-        chosen = []
-        attempts = 0
-        max_attempts = n * 3
-        while len(chosen) < n and attempts < max_attempts:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            key = (a, b)
-            if key not in seen:
-                seen.add(key)
-                chosen.append(key)
-            attempts += 1
-        while len(chosen) < n:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            chosen.append((a, b))
-
-    return [{"input": f"{a}+{b}", "output": build_scratchpad(a, b)} for a, b in chosen]
+    return format_records(draw_pairs(lo, hi, n, seed), "scratchpad")
 
 
 def generate_scratchpad_repeated(n: int, multiplier: int, seed: int = 42) -> list:
@@ -154,38 +168,95 @@ def generate_scratchpad_repeated(n: int, multiplier: int, seed: int = 42) -> lis
 
     Returns list of {"input": "<repeated_eq>", "output": "<scratchpad>"} dicts.
     """
-    lo, hi = 10, 99
-    rng = random.Random(seed)
-    total_pairs = (hi - lo + 1) ** 2  # 8100 pairs
+    return format_records(draw_pairs(10, 99, n, seed), "repeated", multiplier)
 
-    if total_pairs <= n * 10:
-        pairs = [(a, b) for a in range(lo, hi + 1) for b in range(lo, hi + 1)]
-        chosen = rng.sample(pairs, min(n, len(pairs)))
-    else:
-        seen = set()
-        chosen = []
-        attempts = 0
-        max_attempts = n * 3
-        while len(chosen) < n and attempts < max_attempts:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            key = (a, b)
-            if key not in seen:
-                seen.add(key)
-                chosen.append(key)
-            attempts += 1
-        while len(chosen) < n:
-            a = rng.randint(lo, hi)
-            b = rng.randint(lo, hi)
-            chosen.append((a, b))
-
-    records = []
-    for a, b in chosen:
-        base_eq = f"{a}+{b}"
-        repeated_input = "=".join([base_eq] * multiplier)
-        output = build_scratchpad(a, b)
-        records.append({"input": repeated_input, "output": output})
-    return records
+
+# ---------------------------------------------------------------------------
+# Parallel writer
+# ---------------------------------------------------------------------------
+
+SHARD_SIZE = 50_000  # pairs formatted per worker task
+
+
+def _format_shard(pairs: list, kind: str, multiplier: int) -> tuple:
+    """Worker task: return (JSONL text, max sequence length) for one shard of pairs."""
+    records = format_records(pairs, kind, multiplier)
+    text = "".join(json.dumps(entry) + "\n" for entry in records)
+    # full sequence = input + "=" + output + "\n"
+    max_seq_len = max((len(d["input"]) + 1 + len(d["output"]) + 1 for d in records), default=0)
+    return text, max_seq_len
+
+
+PREPARED_FILES = ["meta.pkl", "train.bin", "val.bin", "train.idx", "val.idx", "train.jsonl", "val.jsonl"]
+
+
+def prepare_variants(jobs: list, seed: int = 1337, compact: bool = False, cache: bool = False,
+                     force: bool = False) -> None:
+    """
+    Write each job's prepared artifacts directly (fused generate + prepare).
+
+    Each variant's manifest.json records its generator parameters; a variant
+    whose manifest matches and whose outputs are intact is skipped unless force.
+    With cache=True the artifacts are built once per distinct set of generator
+    parameters in the shared dataset cache and linked from the variant's dir.
+    """
+    for job in jobs:
+        out_dir = os.path.dirname(job["out_path"])
+        record = {"version": VERSION, "generator": "masking_study/gen_data.py", **job["params"],
+                  "seed": seed, "compact": compact}
+        if not force and up_to_date(out_dir, record):
+            print(f"  {out_dir} is up to date (manifest.json); use --force to re-prepare.")
+            continue
+        a = [a for a, _ in job["pairs"]]
+        b = [b for _, b in job["pairs"]]
+
+        def build(target, a=a, b=b, job=job):
+            prepare_pairs(a, b, target, kind=job["kind"], multiplier=job["multiplier"],
+                          shuffle=True, seed=seed, compact=compact)
+
+        if cache:
+            prepare_cached(out_dir, record, PREPARED_FILES, build)
+        else:
+            detach(out_dir, PREPARED_FILES)
+            build(out_dir)
+            write_manifest(out_dir, record, PREPARED_FILES)
+
+
+def write_variants(jobs: list, workers: int = 1) -> None:
+    """
+    Write each job's JSONL file, formatting shards of SHARD_SIZE pairs in a process pool.
+
+    jobs: list of dicts with keys name, pairs, kind, multiplier, out_path.
+
+    Pairs are drawn up front in this process with the variant's own seeded RNG, and
+    shards are written back in submission order, so the files are byte-identical to
+    a serial run for any number of workers.
+    """
+    shards = [[job["pairs"][i:i + SHARD_SIZE] for i in range(0, len(job["pairs"]), SHARD_SIZE)]
+              for job in jobs]
+
+    if workers == 1:
+        results = [[_format_shard(chunk, job["kind"], job["multiplier"]) for chunk in job_shards]
+                   for job, job_shards in zip(jobs, shards)]
+        for job, job_results in zip(jobs, results):
+            _write_job(job, job_results)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers or None) as pool:
+        futures = [[pool.submit(_format_shard, chunk, job["kind"], job["multiplier"]) for chunk in job_shards]
+                   for job, job_shards in zip(jobs, shards)]
+        for job, job_futures in zip(jobs, futures):
+            _write_job(job, [f.result() for f in job_futures])
+
+
+def _write_job(job: dict, results: list) -> None:
+    with open(job["out_path"], "w", encoding="utf-8") as f:
+        for text, _ in results:
+            f.write(text)
+    print(f"  Saved {len(job['pairs'])} samples -> {job['out_path']}")
+    if job["kind"] == "repeated":
+        max_seq_len = max(m for _, m in results)
+        print(f"  Max sequence length (input=sep=output=newline): {max_seq_len}")
 
 
 # ---------------------------------------------------------------------------
@@ -199,6 +270,7 @@ PHASE1_VARIANTS = [
         "hi": 999,
         "n": 30_000,
         "generator": "plain",
+        "sampler": "rejection",
     },
     {
         "name": "plain_4digit",
@@ -206,6 +278,7 @@ PHASE1_VARIANTS = [
         "hi": 9999,
         "n": 30_000,
         "generator": "plain",
+        "sampler": "rejection",
     },
     {
         "name": "scratchpad_3digit",
@@ -213,6 +286,7 @@ PHASE1_VARIANTS = [
         "hi": 999,
         "n": 30_000,
         "generator": "scratchpad",
+        "sampler": "rejection",
     },
     {
         "name": "scratchpad_4digit",
@@ -220,6 +294,7 @@ PHASE1_VARIANTS = [
         "hi": 9999,
         "n": 30_000,
         "generator": "scratchpad",
+        "sampler": "rejection",
     },
 ]
 
@@ -234,7 +309,9 @@ PHASE2_VARIANTS = [
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 
-def run_phase1():
+def run_phase1(workers: int = 1, prepare: bool = False, seed: int = 1337, compact: bool = False,
+               cache: bool = False, force: bool = False):
+    jobs = []
     for v in PHASE1_VARIANTS:
         name = v["name"]
         lo, hi, n = v["lo"], v["hi"], v["n"]
@@ -244,21 +321,26 @@ def run_phase1():
 
         print(f"Generating {name}: {n} samples from [{lo}, {hi}] x [{lo}, {hi}]...")
 
-        if v["generator"] == "plain":
-            data = generate_plain(lo, hi, n)
-        else:
-            data = generate_scratchpad(lo, hi, n)
-
-        with open(out_path, "w", encoding="utf-8") as f:
-            for entry in data:
-                f.write(json.dumps(entry) + "\n")
-
-        print(f"  Saved {len(data)} samples -> {out_path}")
-
+        jobs.append({
+            "name": name,
+            "pairs": draw_pairs(lo, hi, n, sampler=v.get("sampler", "index")),
+            "kind": v["generator"],
+            "multiplier": 1,
+            "out_path": out_path,
+            "params": {"kind": v["generator"], "lo": lo, "hi": hi, "n": n,
+                       "sampler": v.get("sampler", "index"), "multiplier": 1},
+        })
+
+    if prepare:
+        prepare_variants(jobs, seed, compact, cache, force)
+    else:
+        write_variants(jobs, workers)
     print("\nPhase 1 variants generated.")
 
 
-def run_phase2():
+def run_phase2(workers: int = 1, prepare: bool = False, seed: int = 1337, compact: bool = False,
+               cache: bool = False, force: bool = False):
+    jobs = []
     for v in PHASE2_VARIANTS:
         name = v["name"]
         multiplier = v["multiplier"]
@@ -269,28 +351,47 @@ def run_phase2():
 
         print(f"Generating {name}: {n} samples, multiplier={multiplier}, range=[10, 99]...")
 
-        data = generate_scratchpad_repeated(n, multiplier)
-
-        with open(out_path, "w", encoding="utf-8") as f:
-            for entry in data:
-                f.write(json.dumps(entry) + "\n")
-
-        # Compute and report max sequence length:
-        # full sequence = input + "=" + output + "\n"
-        max_seq_len = max(len(d["input"]) + 1 + len(d["output"]) + 1 for d in data)
-        print(f"  Saved {len(data)} samples -> {out_path}")
-        print(f"  Max sequence length (input=sep=output=newline): {max_seq_len}")
-
+        jobs.append({
+            "name": name,
+            "pairs": draw_pairs(10, 99, n),
+            "kind": "repeated",
+            "multiplier": multiplier,
+            "out_path": out_path,
+            "params": {"kind": "repeated", "lo": 10, "hi": 99, "n": n,
+                       "sampler": "index", "multiplier": multiplier},
+        })
+
+    if prepare:
+        prepare_variants(jobs, seed, compact, cache, force)
+    else:
+        write_variants(jobs, workers)
     print("\nPhase 2 variants generated.")
 
 
 def main():
-    phase2_flag = "--phase2" in sys.argv
-
-    if phase2_flag:
-        run_phase2()
+    parser = argparse.ArgumentParser(description="Generate Exp 7 datasets.")
+    parser.add_argument("--phase2", action="store_true", help="Generate Phase 2 variants instead of Phase 1")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for formatting (1 = serial, 0 = all cores)")
+    parser.add_argument("--prepare", action="store_true",
+                        help="Write train/val .bin, meta.pkl and JSONL splits directly instead of <name>.jsonl")
+    parser.add_argument("--seed", type=int, default=1337, help="Shuffle seed for --prepare")
+    parser.add_argument("--compact", action="store_true",
+                        help="With --prepare, write .bin files in the versioned uint8 format")
+    parser.add_argument("--cache", action="store_true",
+                        help="With --prepare, build in the shared dataset cache and link from data/<name>/")
+    parser.add_argument("--force", action="store_true",
+                        help="With --prepare, re-prepare even when manifest.json shows a variant is up to date")
+    args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must be >= 0 (0 = all cores)")
+    if args.cache and not args.prepare:
+        parser.error("--cache needs --prepare")
+
+    if args.phase2:
+        run_phase2(args.workers, args.prepare, args.seed, args.compact, args.cache, args.force)
     else:
-        run_phase1()
+        run_phase1(args.workers, args.prepare, args.seed, args.compact, args.cache, args.force)
 
 
 if __name__ == "__main__":
@@ -2,15 +2,28 @@
 Phase 2 analysis and plotting script — Exp 7, Input Fraction Manipulation.
 
 Generates four plots and a summary table for conditions M–V.
-Run from masking_study/:
-    python plot_phase2.py
+Data is read from results/results.db (see build_results_db.py).
+
+Plotting is incremental (see shared/plot_cache.py): per-multiplier aggregates
+are cached in results/.plot_cache/, and only figures whose inputs (or this
+script) changed are redrawn, in parallel worker processes.
+
+Run from anywhere:
+    python plot_phase2.py              # redraw stale figures only
+    python plot_phase2.py --force      # redraw everything
 """
 
-import pandas as pd
+import argparse
 import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
 import os
+import sys
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.plot_cache import PlotCache, file_fingerprint, slice_fingerprint
+from shared.results_store import ResultsStore
 
 # ── Style ─────────────────────────────────────────────────────────────────────
 COLOR_NOMASK  = '#4C8EDA'   # blue
@@ -22,63 +35,40 @@ plt.rcParams.update({
     'axes.spines.right': False,
 })
 
-RESULTS_DIR = 'D:/03_Coding/comp560-aaronshin43/masking_study/results'
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
 PLOTS_DIR   = os.path.join(RESULTS_DIR, 'plots')
-os.makedirs(PLOTS_DIR, exist_ok=True)
+CACHE_DIR   = os.path.join(RESULTS_DIR, '.plot_cache')
+
+EXPERIMENT = 'masking_study'
 
 # ── Multiplier metadata ───────────────────────────────────────────────────────
 MULTS = [
-    {'label': '1x',  'frac': '~19%', 'no_cond': 'M', 'mask_cond': 'N', 'file': 'accuracy_phase2_1x.csv', 'loss_file': 'val_loss_MN.csv'},
-    {'label': '2x',  'frac': '~32%', 'no_cond': 'O', 'mask_cond': 'P', 'file': 'accuracy_phase2_2x.csv', 'loss_file': 'val_loss_OP.csv'},
-    {'label': '3x',  'frac': '~41%', 'no_cond': 'Q', 'mask_cond': 'R', 'file': 'accuracy_phase2_3x.csv', 'loss_file': 'val_loss_QR.csv'},
-    {'label': '4x',  'frac': '~48%', 'no_cond': 'S', 'mask_cond': 'T', 'file': 'accuracy_phase2_4x.csv', 'loss_file': 'val_loss_ST.csv'},
-    {'label': '5x',  'frac': '~54%', 'no_cond': 'U', 'mask_cond': 'V', 'file': 'accuracy_phase2_5x.csv', 'loss_file': 'val_loss_UV.csv'},
+    {'label': '1x',  'frac': '~19%', 'no_cond': 'M', 'mask_cond': 'N', 'dataset': 'phase2_1x'},
+    {'label': '2x',  'frac': '~32%', 'no_cond': 'O', 'mask_cond': 'P', 'dataset': 'phase2_2x'},
+    {'label': '3x',  'frac': '~41%', 'no_cond': 'Q', 'mask_cond': 'R', 'dataset': 'phase2_3x'},
+    {'label': '4x',  'frac': '~48%', 'no_cond': 'S', 'mask_cond': 'T', 'dataset': 'phase2_4x'},
+    {'label': '5x',  'frac': '~54%', 'no_cond': 'U', 'mask_cond': 'V', 'dataset': 'phase2_5x'},
 ]
 
-# ── Load accuracy data ────────────────────────────────────────────────────────
-def load_acc(mult):
-    path = os.path.join(RESULTS_DIR, mult['file'])
-    df = pd.read_csv(path)
-    df['iter'] = df['iter'].astype(int)
-    # extract the single-letter condition identifier
-    df['base_cond'] = df['cond'].str.extract(r'cond_([A-Z])_s\d')
-    return df
-
-# ── Load loss data ────────────────────────────────────────────────────────────
-def load_loss(mult):
-    path = os.path.join(RESULTS_DIR, 'loss', mult['loss_file'])
-    raw = pd.read_csv(path)
-    raw['iter'] = raw['Step'].astype(int) * 500
-    # keep only plain val/loss cols (no __MIN / __MAX)
-    mean_cols = [c for c in raw.columns
-                 if 'val/loss' in c and '__MIN' not in c and '__MAX' not in c]
-    rows = []
-    for col in mean_cols:
-        run = col.split(' - ')[0].strip()      # e.g. "cond_M_s1"
-        base = run[5]                           # single letter
-        tmp = raw[['iter', col]].copy()
-        tmp.columns = ['iter', 'loss']
-        tmp['base_cond'] = base
-        rows.append(tmp.dropna())
-    return pd.concat(rows, ignore_index=True)
+# ── Load and aggregate accuracy data (cached per multiplier) ─────────────────
+def aggregate_acc(store, mult):
+    """curves: mean/std per (base_cond, iter); peaks: per-seed peak per (base_cond, run)."""
+    df = store.query('ar_accuracy', experiment=EXPERIMENT, dataset=mult['dataset'], required=True)
+    # base_cond is the single-letter condition identifier
+    curves = df.groupby(['cond', 'iter'])['value'].agg(['mean', 'std'])
+    peaks = df.groupby(['cond', 'run'])['value'].max()
+    return {'curves': curves, 'peaks': peaks}
 
-# ── Helper: mean ± std band ───────────────────────────────────────────────────
-def plot_band(ax, df, cond_letter, color, label):
-    sub = df[df['base_cond'] == cond_letter]
-    grp = sub.groupby('iter')['accuracy']
-    mean = grp.mean()
-    std  = grp.std(ddof=1).fillna(0)
-    ax.plot(mean.index, mean.values, color=color, linewidth=2, label=label)
-    ax.fill_between(mean.index,
-                    (mean - std).values,
-                    (mean + std).values,
-                    color=color, alpha=0.15, linewidth=0)
+# ── Load and aggregate loss data ──────────────────────────────────────────────
+def aggregate_loss(store, mult):
+    df = store.query('loss', split='val', experiment=EXPERIMENT, dataset=mult['dataset'], required=True)
+    return {'curves': df.groupby(['cond', 'iter'])['value'].agg(['mean', 'std'])}
 
-def plot_loss_band(ax, df, cond_letter, color, label):
-    sub = df[df['base_cond'] == cond_letter]
-    grp = sub.groupby('iter')['loss']
-    mean = grp.mean()
-    std  = grp.std(ddof=1).fillna(0)
+# ── Helper: mean ± std band ───────────────────────────────────────────────────
+def plot_band(ax, curves, cond_letter, color, label):
+    c = curves.loc[cond_letter]
+    mean = c['mean']
+    std  = c['std'].fillna(0)
     ax.plot(mean.index, mean.values, color=color, linewidth=2, label=label)
     ax.fill_between(mean.index,
                     (mean - std).values,
@@ -88,184 +78,211 @@ def plot_loss_band(ax, df, cond_letter, color, label):
 # ─────────────────────────────────────────────────────────────────────────────
 # PLOT 1: Accuracy convergence curves (1×5 grid)
 # ─────────────────────────────────────────────────────────────────────────────
-fig, axes = plt.subplots(1, 5, figsize=(22, 5), sharey=True)
-
-for ax, m in zip(axes, MULTS):
-    df = load_acc(m)
-    plot_band(ax, df, m['no_cond'],   COLOR_NOMASK, 'No mask')
-    plot_band(ax, df, m['mask_cond'], COLOR_MASKED,  'Target mask')
-
-    for level, alpha in [(90, 0.6), (85, 0.4)]:
-        ax.axhline(level, color='gray', linestyle=':', linewidth=1, alpha=alpha)
-
-    ax.set_title(f"{m['label']} ({m['frac']} input)", fontsize=11)
-    ax.set_xlabel('Iteration', fontsize=10)
-    ax.set_xlim(0, 10000)
-    ax.set_ylim(0, 103)
-    ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x/1000)}k'))
-    ax.xaxis.set_major_locator(ticker.MultipleLocator(2500))
-    ax.grid(axis='y', linestyle='--', alpha=0.3)
-    ax.legend(fontsize=9, loc='lower right')
-
-axes[0].set_ylabel('AR Accuracy (%)', fontsize=11)
-
-fig.suptitle(
-    'Accuracy vs. Iterations — Phase 2 Input Fraction Manipulation\n'
-    '(mean ± std across 3 seeds)',
-    fontsize=13, y=1.01
-)
-plt.tight_layout()
-out1 = os.path.join(PLOTS_DIR, 'accuracy_phase2_curves.png')
-plt.savefig(out1, dpi=150, bbox_inches='tight')
-plt.close()
-print(f"Saved {out1}")
+def plot_accuracy_curves(acc_curves, out_path):
+    fig, axes = plt.subplots(1, 5, figsize=(22, 5), sharey=True)
+
+    for ax, m, curves in zip(axes, MULTS, acc_curves):
+        plot_band(ax, curves, m['no_cond'],   COLOR_NOMASK, 'No mask')
+        plot_band(ax, curves, m['mask_cond'], COLOR_MASKED,  'Target mask')
+
+        for level, alpha in [(90, 0.6), (85, 0.4)]:
+            ax.axhline(level, color='gray', linestyle=':', linewidth=1, alpha=alpha)
+
+        ax.set_title(f"{m['label']} ({m['frac']} input)", fontsize=11)
+        ax.set_xlabel('Iteration', fontsize=10)
+        ax.set_xlim(0, 10000)
+        ax.set_ylim(0, 103)
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x/1000)}k'))
+        ax.xaxis.set_major_locator(ticker.MultipleLocator(2500))
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+        ax.legend(fontsize=9, loc='lower right')
+
+    axes[0].set_ylabel('AR Accuracy (%)', fontsize=11)
+
+    fig.suptitle(
+        'Accuracy vs. Iterations — Phase 2 Input Fraction Manipulation\n'
+        '(mean ± std across 3 seeds)',
+        fontsize=13, y=1.01
+    )
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"Saved {out_path}")
 
 # ─────────────────────────────────────────────────────────────────────────────
 # PLOT 2: Masking gap bar chart
 # ─────────────────────────────────────────────────────────────────────────────
-gap_vals, gap_errs = [], []
-no_peaks_all, mask_peaks_all = [], []
-
-for m in MULTS:
-    df = load_acc(m)
-
-    no_df   = df[df['base_cond'] == m['no_cond']]
-    mask_df = df[df['base_cond'] == m['mask_cond']]
-
-    # per-seed peak
-    no_peaks   = no_df.groupby('cond')['accuracy'].max().values
-    mask_peaks = mask_df.groupby('cond')['accuracy'].max().values
-
-    no_peaks_all.append(no_peaks)
-    mask_peaks_all.append(mask_peaks)
-
-    gap_per_seed = mask_peaks - no_peaks          # same seed order within cond
-    # If seeds aren't guaranteed paired we use mean difference
-    gap = mask_peaks.mean() - no_peaks.mean()
-    # std of per-seed gaps as error bar
-    err = np.std(gap_per_seed, ddof=1)
-    gap_vals.append(gap)
-    gap_errs.append(err)
-
-x = np.arange(len(MULTS))
-labels = [m['label'] for m in MULTS]
-
-fig, ax = plt.subplots(figsize=(8, 5))
-bars = ax.bar(x, gap_vals, yerr=gap_errs, capsize=5,
-              color=[COLOR_MASKED if g >= 0 else '#E05C5C' for g in gap_vals],
-              alpha=0.85, width=0.5, error_kw={'ecolor': 'black', 'linewidth': 1.5})
-ax.axhline(0, color='black', linewidth=1.2, linestyle='--')
-ax.set_xticks(x)
-ax.set_xticklabels([f"{m['label']}\n({m['frac']})" for m in MULTS], fontsize=11)
-ax.set_xlabel('Input Repetition Multiplier (input fraction)', fontsize=12)
-ax.set_ylabel('Masking gap (pp)\n[masked peak − no-mask peak]', fontsize=11)
-ax.set_title(
-    'Peak Accuracy Masking Gap vs. Input Fraction\n'
-    '(positive = masking helps; error bars = std across seeds)',
-    fontsize=12
-)
-ax.grid(axis='y', linestyle='--', alpha=0.3)
-
-for bar, val, err in zip(bars, gap_vals, gap_errs):
-    ypos = val + err + 0.05 if val >= 0 else val - err - 0.1
-    ax.text(bar.get_x() + bar.get_width() / 2, ypos,
-            f'{val:+.2f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
-
-plt.tight_layout()
-out2 = os.path.join(PLOTS_DIR, 'accuracy_phase2_gap.png')
-plt.savefig(out2, dpi=150)
-plt.close()
-print(f"Saved {out2}")
-
-# ─────────────────────────────────────────────────────────────────────────────
-# PLOT 3: Val loss convergence curves (1×5 grid)
-# ─────────────────────────────────────────────────────────────────────────────
-fig, axes = plt.subplots(1, 5, figsize=(22, 5), sharey=True)
-
-for ax, m in zip(axes, MULTS):
-    df_loss = load_loss(m)
-    plot_loss_band(ax, df_loss, m['no_cond'],   COLOR_NOMASK, 'No mask')
-    plot_loss_band(ax, df_loss, m['mask_cond'], COLOR_MASKED,  'Target mask')
-
-    ax.set_title(f"{m['label']} ({m['frac']} input)", fontsize=11)
-    ax.set_xlabel('Iteration', fontsize=10)
-    ax.set_xlim(0, 10000)
-    ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x/1000)}k'))
-    ax.xaxis.set_major_locator(ticker.MultipleLocator(2500))
+def plot_gap(gap_vals, gap_errs, out_path):
+    x = np.arange(len(MULTS))
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    bars = ax.bar(x, gap_vals, yerr=gap_errs, capsize=5,
+                  color=[COLOR_MASKED if g >= 0 else '#E05C5C' for g in gap_vals],
+                  alpha=0.85, width=0.5, error_kw={'ecolor': 'black', 'linewidth': 1.5})
+    ax.axhline(0, color='black', linewidth=1.2, linestyle='--')
+    ax.set_xticks(x)
+    ax.set_xticklabels([f"{m['label']}\n({m['frac']})" for m in MULTS], fontsize=11)
+    ax.set_xlabel('Input Repetition Multiplier (input fraction)', fontsize=12)
+    ax.set_ylabel('Masking gap (pp)\n[masked peak − no-mask peak]', fontsize=11)
+    ax.set_title(
+        'Peak Accuracy Masking Gap vs. Input Fraction\n'
+        '(positive = masking helps; error bars = std across seeds)',
+        fontsize=12
+    )
     ax.grid(axis='y', linestyle='--', alpha=0.3)
-    ax.legend(fontsize=9, loc='upper right')
 
-axes[0].set_ylabel('Validation Loss', fontsize=11)
+    for bar, val, err in zip(bars, gap_vals, gap_errs):
+        ypos = val + err + 0.05 if val >= 0 else val - err - 0.1
+        ax.text(bar.get_x() + bar.get_width() / 2, ypos,
+                f'{val:+.2f}', ha='center', va='bottom', fontsize=10, fontweight='bold')
 
-fig.suptitle(
-    'Validation Loss vs. Iterations — Phase 2 Input Fraction Manipulation\n'
-    '(mean ± std across 3 seeds)',
-    fontsize=13, y=1.01
-)
-plt.tight_layout()
-out3 = os.path.join(PLOTS_DIR, 'val_loss_phase2_curves.png')
-plt.savefig(out3, dpi=150, bbox_inches='tight')
-plt.close()
-print(f"Saved {out3}")
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150)
+    plt.close()
+    print(f"Saved {out_path}")
 
 # ─────────────────────────────────────────────────────────────────────────────
-# PLOT 4: Summary line plot — peak accuracy vs multiplier
+# PLOT 3: Val loss convergence curves (1×5 grid)
 # ─────────────────────────────────────────────────────────────────────────────
-no_means   = [p.mean() for p in no_peaks_all]
-no_stds    = [p.std(ddof=1) for p in no_peaks_all]
-mask_means = [p.mean() for p in mask_peaks_all]
-mask_stds  = [p.std(ddof=1) for p in mask_peaks_all]
-
-x_pos = np.arange(1, 6)
-
-fig, ax = plt.subplots(figsize=(8, 5))
-ax.errorbar(x_pos, no_means,   yerr=no_stds,   fmt='o-', color=COLOR_NOMASK,
-            linewidth=2, markersize=7, capsize=4, label='No mask')
-ax.errorbar(x_pos, mask_means, yerr=mask_stds, fmt='s-', color=COLOR_MASKED,
-            linewidth=2, markersize=7, capsize=4, label='Target mask')
-
-ax.set_xticks(x_pos)
-ax.set_xticklabels([f"{m['label']}\n({m['frac']})" for m in MULTS], fontsize=11)
-ax.set_xlabel('Input Repetition Multiplier (input fraction)', fontsize=12)
-ax.set_ylabel('Mean Peak AR Accuracy (%)', fontsize=12)
-ax.set_title(
-    'Peak Accuracy vs. Input Fraction — Phase 2\n'
-    '(mean ± std across 3 seeds)',
-    fontsize=12
-)
-ax.set_ylim(95, 101)
-ax.grid(axis='y', linestyle='--', alpha=0.3)
-ax.legend(fontsize=11)
-plt.tight_layout()
-out4 = os.path.join(PLOTS_DIR, 'accuracy_phase2_summary.png')
-plt.savefig(out4, dpi=150)
-plt.close()
-print(f"Saved {out4}")
+def plot_loss_curves(loss_curves, out_path):
+    fig, axes = plt.subplots(1, 5, figsize=(22, 5), sharey=True)
+
+    for ax, m, curves in zip(axes, MULTS, loss_curves):
+        plot_band(ax, curves, m['no_cond'],   COLOR_NOMASK, 'No mask')
+        plot_band(ax, curves, m['mask_cond'], COLOR_MASKED,  'Target mask')
+
+        ax.set_title(f"{m['label']} ({m['frac']} input)", fontsize=11)
+        ax.set_xlabel('Iteration', fontsize=10)
+        ax.set_xlim(0, 10000)
+        ax.xaxis.set_major_formatter(ticker.FuncFormatter(lambda x, _: f'{int(x/1000)}k'))
+        ax.xaxis.set_major_locator(ticker.MultipleLocator(2500))
+        ax.grid(axis='y', linestyle='--', alpha=0.3)
+        ax.legend(fontsize=9, loc='upper right')
+
+    axes[0].set_ylabel('Validation Loss', fontsize=11)
+
+    fig.suptitle(
+        'Validation Loss vs. Iterations — Phase 2 Input Fraction Manipulation\n'
+        '(mean ± std across 3 seeds)',
+        fontsize=13, y=1.01
+    )
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150, bbox_inches='tight')
+    plt.close()
+    print(f"Saved {out_path}")
 
 # ─────────────────────────────────────────────────────────────────────────────
-# Summary table
+# PLOT 4: Summary line plot — peak accuracy vs multiplier
 # ─────────────────────────────────────────────────────────────────────────────
-header = (
-    "| Multiplier | Input fraction | No-mask mean peak | No-mask std "
-    "| Masked mean peak | Masked std | Gap (masked − no-mask) |"
-)
-sep = (
-    "|---|---|---|---|---|---|---|"
-)
-rows_md = [header, sep]
-for i, m in enumerate(MULTS):
-    nm = no_means[i];  ns = no_stds[i]
-    mm = mask_means[i]; ms = mask_stds[i]
-    gap = mm - nm
-    rows_md.append(
-        f"| {m['label']} | {m['frac']} | {nm:.2f}% | ±{ns:.2f} | {mm:.2f}% | ±{ms:.2f} | {gap:+.2f} pp |"
+def plot_summary(no_means, no_stds, mask_means, mask_stds, out_path):
+    x_pos = np.arange(1, 6)
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.errorbar(x_pos, no_means,   yerr=no_stds,   fmt='o-', color=COLOR_NOMASK,
+                linewidth=2, markersize=7, capsize=4, label='No mask')
+    ax.errorbar(x_pos, mask_means, yerr=mask_stds, fmt='s-', color=COLOR_MASKED,
+                linewidth=2, markersize=7, capsize=4, label='Target mask')
+
+    ax.set_xticks(x_pos)
+    ax.set_xticklabels([f"{m['label']}\n({m['frac']})" for m in MULTS], fontsize=11)
+    ax.set_xlabel('Input Repetition Multiplier (input fraction)', fontsize=12)
+    ax.set_ylabel('Mean Peak AR Accuracy (%)', fontsize=12)
+    ax.set_title(
+        'Peak Accuracy vs. Input Fraction — Phase 2\n'
+        '(mean ± std across 3 seeds)',
+        fontsize=12
     )
-
-table_str = "\n".join(rows_md)
-print("\n" + table_str)
-
-summary_path = os.path.join(RESULTS_DIR, 'phase2_summary.txt')
-with open(summary_path, 'w') as f:
-    f.write(table_str + "\n")
-print(f"\nSummary written to {summary_path}")
-print(f"\nPlots:\n  {out1}\n  {out2}\n  {out3}\n  {out4}")
+    ax.set_ylim(95, 101)
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    ax.legend(fontsize=11)
+    plt.tight_layout()
+    plt.savefig(out_path, dpi=150)
+    plt.close()
+    print(f"Saved {out_path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plot Exp 7 Phase 2 results (incremental).")
+    parser.add_argument('--force', action='store_true', help='Ignore the cache and redraw every figure')
+    parser.add_argument('--jobs', type=int, default=0, help='Worker processes for drawing (0 = one per CPU)')
+    args = parser.parse_args()
+
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    store = ResultsStore(os.path.join(RESULTS_DIR, 'results.db'), read_only=True)
+    cache = PlotCache(CACHE_DIR, salt=file_fingerprint(os.path.abspath(__file__)), force=args.force)
+
+    acc_fps, loss_fps, acc_aggs, loss_aggs = [], [], [], []
+    for m in MULTS:
+        fp = slice_fingerprint(store, 'ar_accuracy', experiment=EXPERIMENT, dataset=m['dataset'])
+        acc_aggs.append(cache.aggregate(f"accuracy_{m['dataset']}", fp, lambda: aggregate_acc(store, m)))
+        acc_fps.append(fp)
+        fp = slice_fingerprint(store, 'loss', experiment=EXPERIMENT, dataset=m['dataset'])
+        loss_aggs.append(cache.aggregate(f"loss_{m['dataset']}", fp, lambda: aggregate_loss(store, m)))
+        loss_fps.append(fp)
+
+    gap_vals, gap_errs = [], []
+    no_peaks_all, mask_peaks_all = [], []
+    for m, agg in zip(MULTS, acc_aggs):
+        # per-seed peak
+        no_peaks   = agg['peaks'].loc[m['no_cond']].values
+        mask_peaks = agg['peaks'].loc[m['mask_cond']].values
+
+        no_peaks_all.append(no_peaks)
+        mask_peaks_all.append(mask_peaks)
+
+        gap_per_seed = mask_peaks - no_peaks          # same seed order within cond
+        # If seeds aren't guaranteed paired we use mean difference
+        gap = mask_peaks.mean() - no_peaks.mean()
+        # std of per-seed gaps as error bar
+        err = np.std(gap_per_seed, ddof=1)
+        gap_vals.append(gap)
+        gap_errs.append(err)
+
+    no_means   = [p.mean() for p in no_peaks_all]
+    no_stds    = [p.std(ddof=1) for p in no_peaks_all]
+    mask_means = [p.mean() for p in mask_peaks_all]
+    mask_stds  = [p.std(ddof=1) for p in mask_peaks_all]
+
+    out1 = os.path.join(PLOTS_DIR, 'accuracy_phase2_curves.png')
+    out2 = os.path.join(PLOTS_DIR, 'accuracy_phase2_gap.png')
+    out3 = os.path.join(PLOTS_DIR, 'val_loss_phase2_curves.png')
+    out4 = os.path.join(PLOTS_DIR, 'accuracy_phase2_summary.png')
+    acc_fp = cache.figure_fingerprint(*acc_fps)
+    cache.render([
+        (out1, acc_fp, plot_accuracy_curves, ([a['curves'] for a in acc_aggs],)),
+        (out2, acc_fp, plot_gap, (gap_vals, gap_errs)),
+        (out3, cache.figure_fingerprint(*loss_fps), plot_loss_curves, ([a['curves'] for a in loss_aggs],)),
+        (out4, acc_fp, plot_summary, (no_means, no_stds, mask_means, mask_stds)),
+    ], workers=args.jobs)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # Summary table
+    # ─────────────────────────────────────────────────────────────────────────
+    header = (
+        "| Multiplier | Input fraction | No-mask mean peak | No-mask std "
+        "| Masked mean peak | Masked std | Gap (masked − no-mask) |"
+    )
+    sep = (
+        "|---|---|---|---|---|---|---|"
+    )
+    rows_md = [header, sep]
+    for i, m in enumerate(MULTS):
+        nm = no_means[i];  ns = no_stds[i]
+        mm = mask_means[i]; ms = mask_stds[i]
+        gap = mm - nm
+        rows_md.append(
+            f"| {m['label']} | {m['frac']} | {nm:.2f}% | ±{ns:.2f} | {mm:.2f}% | ±{ms:.2f} | {gap:+.2f} pp |"
+        )
+
+    table_str = "\n".join(rows_md)
+    print("\n" + table_str)
+
+    summary_path = os.path.join(RESULTS_DIR, 'phase2_summary.txt')
+    with open(summary_path, 'w') as f:
+        f.write(table_str + "\n")
+    print(f"\nSummary written to {summary_path}")
+    print(f"\nPlots:\n  {out1}\n  {out2}\n  {out3}\n  {out4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Run a training grid (config x target_mask x seed) with several jobs at once.
+
+The grids in grids/ list the same runs as run_training.sh (Phase 1, 40 runs) and
+run_phase2.sh (Phase 2, 30 runs). Runs whose out_dir already holds the final
+checkpoint are skipped, so the grid can be restarted after an interruption.
+Each run logs to logs/<run>.log.
+
+Usage (from masking_study/):
+    python run_grid.py grids/phase1.json --jobs=4                   # 4 runs share one GPU
+    python run_grid.py grids/phase1.json --jobs=8 --devices cuda:0 cuda:1 --per_device=4
+    python run_grid.py grids/phase2.json --jobs=6 --devices cpu --threads=2
+    python run_grid.py grids/phase2.json --dry_run                  # print the commands only
+"""
+
+import argparse
+import os
+import sys
+
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.scheduler import load_grid, run_grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a training grid concurrently.")
+    parser.add_argument('grid', type=str, help='Grid JSON file (see grids/)')
+    parser.add_argument('--jobs', type=int, default=1, help='Trainings running at once')
+    parser.add_argument('--devices', type=str, nargs='+', default=None,
+                        help="Devices to spread jobs over (default: each config's own device)")
+    parser.add_argument('--per_device', type=int, default=0, help='Max concurrent jobs per device (0 = no cap)')
+    parser.add_argument('--threads', type=int, default=0, help='CPU threads per job (0 = environment default)')
+    parser.add_argument('--retries', type=int, default=1, help='Extra attempts for a failed run')
+    parser.add_argument('--log_dir', type=str, default='logs', help='Directory for per-run logs')
+    parser.add_argument('--dry_run', action='store_true', help='Print the training commands without running them')
+    args = parser.parse_args()
+
+    failed = run_grid(load_grid(args.grid), args.jobs, args.devices, args.per_device, args.threads,
+                      args.retries, args.log_dir, args.dry_run)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
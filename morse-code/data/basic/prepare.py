@@ -6,8 +6,12 @@ encoder and decoder and some other related info.
 import os
 import pickle
 import random
+import sys
 import numpy as np
 
+# Add repo root so we can import the shared helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from shared.encoding import CharTokenizer
 
 building_blocks = [
     'HELP: .... . .-.. .--.',
@@ -56,15 +60,9 @@ print(f"vocab size: {vocab_size:,}")
 stoi = {ch: i for i, ch in enumerate(chars)}
 itos = {i: ch for i, ch in enumerate(chars)}
 
-
-def encode(s):
-    # encoder: take a string, output a list of integers
-    return [stoi[c] for c in s]
-
-
-def decode(l):
-    # decoder: take a list of integers, output a string
-    return ''.join([itos[i] for i in l])
+# encoder / decoder: string <-> list of integers
+tok = CharTokenizer(stoi, itos)
+encode, decode = tok.encode, tok.decode
 
 
 # jmac: For this experimental example, training and validation data are the same.
@@ -0,0 +1,10 @@
+"""
+Shared utilities used across the experiment directories.
+
+Scripts in this repo run from their own experiment directory (e.g. addition/,
+masking_study/), so they reach these modules by appending the repo root to
+sys.path, the same way they reach comp560-nanoGPT:
+
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    from shared.generation import generate_batch
+"""
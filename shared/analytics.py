@@ -0,0 +1,149 @@
+"""
+Error breakdowns for addition predictions, computed over all samples at once.
+
+Overall exact-match says how often a checkpoint is right, not where it fails.
+addition_tables() splits the same predictions by
+
+    operand_len   digits of the longer operand
+    carries       number of columns that produce a carry
+    carry_chain   longest run of consecutive carrying columns
+    answer_len    digits of a + b
+    digit_pos     position of a digit of the final answer (0 = units); accuracy
+                  here is per digit, over the samples whose sum has that digit
+
+Predictions are the model's output text before the stop token. The final
+answer is the text after the last ']' (the whole text for plain outputs), so
+the same tables work for plain and scratchpad datasets; the other tables count
+a sample as correct when the whole output matched (pass `correct`) or, by
+default, when the final answer equals a + b.
+
+Tables are pandas DataFrames (columns: group value, n, correct, accuracy);
+write_tables() appends them to one CSV per table, tagged with the checkpoint.
+"""
+
+import csv
+import os
+
+import numpy as np
+
+from shared.scratchpad import num_digits
+
+TABLES = ('operand_len', 'carries', 'carry_chain', 'answer_len', 'digit_pos')
+
+
+def parse_operands(inputs):
+    """(a, b) int arrays from inputs like "12+34" (or the repeated "12+34=12+34")."""
+    pairs = [s.split('=', 1)[0].split('+') for s in inputs]
+    a = np.array([int(p[0]) for p in pairs], dtype=np.int64)
+    b = np.array([int(p[1]) for p in pairs], dtype=np.int64)
+    return a, b
+
+
+def final_answers(outputs):
+    """The answer part of each output: the text after the last ']'."""
+    return [s.rsplit(']', 1)[-1].strip() for s in outputs]
+
+
+def carry_stats(a, b):
+    """(number of carries, longest carry chain) of column addition a + b."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    carry = np.zeros(len(a), dtype=np.int64)
+    count = np.zeros(len(a), dtype=np.int64)
+    run = np.zeros(len(a), dtype=np.int64)
+    longest = np.zeros(len(a), dtype=np.int64)
+    width = int(np.maximum(num_digits(a), num_digits(b)).max()) if len(a) else 0
+    for j in range(width):
+        carry = ((a // 10 ** j) % 10 + (b // 10 ** j) % 10 + carry) // 10
+        count += carry
+        run = (run + 1) * carry
+        longest = np.maximum(longest, run)
+    return count, longest
+
+
+def digit_hits(answers, target):
+    """
+    (hits, has_digit), both (N, D) bool with column p = 10**p digit of target:
+    whether the predicted answer has the right character there, and whether
+    the target has a digit at p at all.
+    """
+    target = np.asarray(target, dtype=np.int64)
+    width = int(num_digits(target).max()) if len(target) else 0
+    p = np.arange(width)
+    has_digit = p[None, :] < num_digits(target)[:, None]
+    truth = (target[:, None] // 10 ** p[None, :]) % 10 + ord('0')
+
+    # predicted characters right-aligned: code of the p-th character from the end
+    pw = max([len(s) for s in answers] + [1])
+    codes = np.array(answers, dtype=f'<U{pw}').view(np.uint32).reshape(len(answers), pw)
+    lengths = np.array([len(s) for s in answers], dtype=np.int64)
+    col = lengths[:, None] - 1 - p[None, :]
+    pred = np.take_along_axis(codes, np.clip(col, 0, pw - 1), axis=1)
+    hits = (col >= 0) & (pred == truth) & has_digit
+    return hits, has_digit
+
+
+def _grouped(name, values, correct):
+    import pandas as pd
+
+    df = pd.DataFrame({name: values, 'correct': correct.astype(np.int64)})
+    table = df.groupby(name)['correct'].agg(n='size', correct='sum').reset_index()
+    table['accuracy'] = 100.0 * table['correct'] / table['n']
+    return table
+
+
+def addition_tables(a, b, outputs, correct=None) -> dict:
+    """{table name: DataFrame} breakdown of predictions `outputs` for operands a, b."""
+    import pandas as pd
+
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    answers = final_answers(outputs)
+    target = a + b
+    if correct is None:
+        correct = np.array(answers) == target.astype(str)
+    correct = np.asarray(correct, dtype=bool)
+
+    carries, chain = carry_stats(a, b)
+    tables = {
+        'operand_len': _grouped('operand_len', np.maximum(num_digits(a), num_digits(b)), correct),
+        'carries': _grouped('carries', carries, correct),
+        'carry_chain': _grouped('carry_chain', chain, correct),
+        'answer_len': _grouped('answer_len', num_digits(target), correct),
+    }
+    hits, has_digit = digit_hits(answers, target)
+    n = has_digit.sum(axis=0)
+    right = hits.sum(axis=0)
+    tables['digit_pos'] = pd.DataFrame({'digit_pos': np.arange(len(n)), 'n': n, 'correct': right,
+                                        'accuracy': 100.0 * right / np.maximum(n, 1)})
+    return tables
+
+
+def format_tables(tables) -> str:
+    """Plain-text rendering of addition_tables() output for logs."""
+    blocks = []
+    for name in TABLES:
+        table = tables[name]
+        lines = [f"{name:>12} {'n':>7} {'acc %':>7}"]
+        lines += [f"{int(r[name]):>12} {int(r['n']):>7} {r['accuracy']:>7.1f}" for _, r in table.iterrows()]
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks)
+
+
+def write_tables(tables, out_dir: str, **tags):
+    """
+    Append every table to <out_dir>/<name>.csv, with the tags (e.g. cond, iter)
+    as leading columns, so one file accumulates a whole sweep.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    for name in TABLES:
+        path = os.path.join(out_dir, f'{name}.csv')
+        new_file = not os.path.exists(path)
+        table = tables[name]
+        with open(path, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(list(tags) + [name, 'n', 'correct', 'accuracy'])
+            for _, r in table.iterrows():
+                writer.writerow(list(tags.values()) + [int(r[name]), int(r['n']), int(r['correct']),
+                                                       f"{r['accuracy']:.1f}"])
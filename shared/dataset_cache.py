@@ -0,0 +1,142 @@
+"""
+Content-addressed cache of prepared datasets, shared by every experiment directory.
+
+The experiment directories prepare overlapping corpora (exhaustive 2-digit
+addition is in framework/, validation/ and masking_benchmark/), each through
+its own prepare.py entry point, so identical train.bin / val.bin / meta.pkl /
+*.idx / *.jsonl files are generated and stored once per directory. With the
+cache, a dataset is prepared once per distinct input record (see
+shared/manifest.py: the source sha256 and every prepare option, or the
+generator parameters for gen_data.py --prepare), and data/<name>/ only holds
+links into the cache:
+
+    <repo>/.dataset_cache/objects/<sha[:2]>/<sha>   output files, stored by content
+    <repo>/.dataset_cache/entries/<key>.json        manifest of one prepared dataset
+    <repo>/.dataset_cache/tmp/                      staging for datasets being built
+
+Files are stored by their own sha256, so outputs that coincide across entries
+(the .bin files of a prepare.py run with and without JSONL splits, say) are
+kept once. Stored files are read-only and linked with relative symlinks, or
+copied where symlinks are unavailable (never hard-linked: a later non-cached
+run would truncate the stored file through the link). Outputs that git tracks
+in out_dir, such as committed train.jsonl / val.jsonl splits, are always
+written as regular copies, so the repo never records links into the untracked
+cache. Non-cached prepare runs replace the links instead of writing through
+them. Deleting the cache only breaks the links: the next prepare run sees stale
+outputs in its manifest check and rebuilds them.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+
+from shared.manifest import save_manifest, write_manifest
+
+DEFAULT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '.dataset_cache'))
+
+
+def cache_key(inputs: dict, outputs) -> str:
+    """Entry key: sha256 of the input record and the set of output names."""
+    blob = json.dumps({'inputs': inputs, 'outputs': sorted(outputs)}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def object_path(root: str, digest: str) -> str:
+    return os.path.join(root, 'objects', digest[:2], digest)
+
+
+def read_entry(root: str, key: str):
+    """Manifest of a complete cache entry, or None if missing or any stored file is gone."""
+    path = os.path.join(root, 'entries', f'{key}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        entry = json.load(f)
+    if not all(os.path.exists(object_path(root, d)) for d in entry['outputs'].values()):
+        return None
+    return entry
+
+
+def tracked(out_dir: str, names) -> set:
+    """Names among out_dir/<name> that git tracks (empty outside a work tree or without git)."""
+    if not os.path.isdir(out_dir):
+        return set()
+    try:
+        listed = subprocess.run(['git', 'ls-files', '-z', '--', *names], cwd=out_dir,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return set()
+    return {os.path.basename(p) for p in listed.split('\0') if p}
+
+
+def detach(out_dir: str, names) -> None:
+    """Remove cache links (and any hard-linked files) among out_dir/<name> so a non-cached run writes fresh files."""
+    for name in names:
+        path = os.path.join(out_dir, name)
+        if os.path.islink(path) or (os.path.exists(path) and os.stat(path).st_nlink > 1):
+            os.remove(path)
+
+
+def is_linked(out_dir: str, names, root: str = DEFAULT_ROOT) -> bool:
+    """True when every untracked out_dir/<name> is a link into the cache at root."""
+    objects = os.path.realpath(os.path.join(root, 'objects'))
+    keep = tracked(out_dir, names)
+    return all(os.path.islink(os.path.join(out_dir, name))
+               and os.path.realpath(os.path.join(out_dir, name)).startswith(objects + os.sep)
+               for name in names if name not in keep)
+
+
+def _store(root: str, path: str, digest: str) -> None:
+    target = object_path(root, digest)
+    if os.path.exists(target):
+        return
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.chmod(path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+    os.replace(path, target)
+
+
+def _link(target: str, path: str, copy: bool = False) -> None:
+    if os.path.lexists(path):
+        os.remove(path)
+    if not copy:
+        try:
+            os.symlink(os.path.relpath(target, os.path.dirname(os.path.abspath(path))), path)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(target, path)
+
+
+def prepare_cached(out_dir: str, inputs: dict, outputs, build, root: str = DEFAULT_ROOT) -> bool:
+    """
+    Link out_dir/<output> to the cached dataset for `inputs`, building it first
+    with build(staging_dir) on a miss, and write out_dir/manifest.json. Outputs
+    tracked by git are copied rather than linked. Returns True on a cache hit.
+    """
+    key = cache_key(inputs, outputs)
+    entry = read_entry(root, key)
+    hit = entry is not None
+    if not hit:
+        os.makedirs(os.path.join(root, 'tmp'), exist_ok=True)
+        staging = tempfile.mkdtemp(dir=os.path.join(root, 'tmp'))
+        try:
+            build(staging)
+            entry = write_manifest(staging, inputs, outputs)
+            for name, digest in entry['outputs'].items():
+                _store(root, os.path.join(staging, name), digest)
+            os.makedirs(os.path.join(root, 'entries'), exist_ok=True)
+            os.replace(os.path.join(staging, 'manifest.json'), os.path.join(root, 'entries', f'{key}.json'))
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    os.makedirs(out_dir, exist_ok=True)
+    keep = tracked(out_dir, entry['outputs'])
+    for name, digest in entry['outputs'].items():
+        _link(object_path(root, digest), os.path.join(out_dir, name), copy=name in keep)
+    save_manifest(out_dir, entry)
+    print(f"{'Linked' if hit else 'Cached and linked'} {out_dir} -> dataset cache entry {key[:12]}")
+    return hit
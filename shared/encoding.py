@@ -0,0 +1,111 @@
+"""
+Character-level encoding through a NumPy lookup table.
+
+The prepare scripts encode with [stoi[c] for c in text], one dict lookup per
+character. Here a string is viewed as an array of code points (UTF-32) and mapped
+through a dense table indexed by code point, so a whole chunk encodes in one
+vectorized gather.
+"""
+
+import numpy as np
+
+UNKNOWN = np.iinfo(np.uint32).max
+
+
+def build_lut(stoi):
+    """Build a code point -> token id table covering every character in stoi."""
+    size = max(ord(c) for c in stoi) + 1
+    lut = np.full(size, UNKNOWN, dtype=np.uint32)
+    for ch, i in stoi.items():
+        lut[ord(ch)] = i
+    return lut
+
+
+def encode_text(text, lut, dtype=np.uint16):
+    """
+    Encode text to a token id array of the given dtype using a table from build_lut().
+
+    Raises KeyError on characters that are not in the vocabulary, like stoi[c] would.
+    """
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    in_range = codes < len(lut)
+    ids = np.full(len(codes), UNKNOWN, dtype=np.uint32)
+    ids[in_range] = lut[codes[in_range]]
+    bad = ids == UNKNOWN
+    if bad.any():
+        raise KeyError(text[int(np.argmax(bad))])
+    return ids.astype(dtype)
+
+
+class CharTokenizer:
+    """
+    Character-level tokenizer built from a dataset's stoi / itos (meta.pkl).
+
+    Replaces the per-script encode = lambda s: [stoi[c] for c in s] and
+    decode = lambda l: ''.join([itos[i] for i in l]). Encoding gathers code points
+    through the build_lut() table; decoding indexes a character array. The batch methods work on 2-D arrays, so a whole
+    eval set encodes or decodes in one call.
+    """
+
+    def __init__(self, stoi, itos=None):
+        self.stoi = stoi
+        self.itos = itos if itos is not None else {i: ch for ch, i in stoi.items()}
+        self.vocab_size = len(self.stoi)
+        self.lut = build_lut(stoi)
+        # id -> character, plus a trailing '\0' that decode_batch uses for padding
+        self.chars = np.array([self.itos[i] for i in range(self.vocab_size)] + ['\0'], dtype='<U1')
+
+    @classmethod
+    def from_meta(cls, path):
+        """Load from a meta.pkl file, or a dataset directory containing one."""
+        import os
+        import pickle
+
+        if os.path.isdir(path):
+            path = os.path.join(path, 'meta.pkl')
+        with open(path, 'rb') as f:
+            meta = pickle.load(f)
+        return cls(meta['stoi'], meta['itos'])
+
+    def encode_array(self, text, dtype=np.int64):
+        """Token ids of text as a 1-D array. Raises KeyError on unknown characters."""
+        return encode_text(text, self.lut, dtype)
+
+    def encode(self, text):
+        """Token ids of text as a list, like [stoi[c] for c in text]."""
+        return self.encode_array(text).tolist()
+
+    def decode(self, ids):
+        """Text of a sequence of token ids, like ''.join([itos[i] for i in ids])."""
+        return ''.join(self.chars[np.asarray(ids, dtype=np.int64)].tolist())
+
+    def encode_batch(self, texts, pad_id: int = 0, dtype=np.int64):
+        """
+        Encode a list of strings into a right-padded (N, max_len) array.
+
+        Returns (ids, lengths); positions at or past lengths[i] hold pad_id.
+        """
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        flat = self.encode_array(''.join(texts), dtype)
+        width = int(lengths.max()) if len(texts) else 0
+        ids = np.full((len(texts), width), pad_id, dtype=dtype)
+        ids[np.arange(width)[None, :] < lengths[:, None]] = flat
+        return ids, lengths
+
+    def decode_batch(self, ids, lengths=None):
+        """
+        Decode each row of a 2-D id array to a string, keeping the first
+        lengths[i] tokens of row i (the whole row when lengths is None).
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.ndim != 2:
+            raise ValueError("decode_batch expects a 2-D array of token ids")
+        if lengths is not None:
+            pad = np.arange(ids.shape[1])[None, :] >= np.asarray(lengths)[:, None]
+            ids = np.where(pad, self.vocab_size, ids)
+        if ids.shape[1] == 0:
+            return [''] * len(ids)
+        # rows of '<U1' characters viewed as one fixed-width string each;
+        # numpy drops the trailing '\0' padding
+        rows = np.ascontiguousarray(self.chars[ids]).view(f'<U{ids.shape[1]}')[:, 0]
+        return rows.tolist()
@@ -0,0 +1,366 @@
+"""
+Train K seed replicas of one nanoGPT configuration together, stacked along a
+leading model dimension.
+
+The seed replicates of a condition (cond_A_s1..s3, cond_E_s1..s5) share the
+architecture and dataset, and one ~1M-parameter model leaves most of a device
+idle. Here the K replicas are built separately (each under its own seed), their
+parameters stacked with torch.func.stack_module_state(), and one functional
+forward pass runs all of them: linear layers become batched matmuls over the
+model dimension and attention folds it into the batch dimension, so each kernel
+launch carries K models. (torch.func.vmap over GPT.forward gives the same
+result but falls back to a per-replica loop for scaled_dot_product_attention.)
+
+Every replica still trains exactly as a separate run would:
+
+  - initialization from torch.manual_seed(seed), then its data batches drawn
+    from a generator continuing that same RNG stream;
+  - its own loss, AdamW moments (Adam is elementwise, so one optimizer over the
+    stacked tensors equals K optimizers), and gradient-norm clipping;
+  - no shared loss scale: float16 would need a GradScaler, whose single scale
+    and inf check would tie the replicas together (an overflow in one skips
+    the step for all), so ensemble mode runs in bfloat16 or float32 only;
+  - its own out_dir with ckpt.pt and a ckpt_<iter>.pt snapshot at every eval
+    interval in the nanoGPT format, so eval_sweep.py / eval_generation.py read
+    them unchanged, and its own train/val loss rows in the results store
+    (cfg['results_db']).
+
+Target masking uses the separator / stop tokens in the label window: a label is
+kept when the most recent marker before it is a separator. With
+cfg['sample_aligned'] the batches come from shared.loader.SampleLoader instead
+(one per replica and split, seeded from the replica's seed): every window
+starts at a sample boundary from the .idx offsets index written by prepare.py,
+and the target mask is taken from the recorded separator offsets, which stays
+correct when the separator also occurs inside the input (the Phase 2
+"12+34=12+34" repeats).
+"""
+
+import math
+import os
+import pickle
+import time
+from contextlib import nullcontext
+
+import numpy as np
+import torch
+from torch.func import stack_module_state
+from torch.nn import functional as F
+
+from shared.loader import SampleLoader
+from shared.results_store import ResultsStore
+from shared.token_bin import open_bin
+
+
+# nanoGPT train.py / train_benchmark.py defaults, plus the ensemble options
+DEFAULTS = dict(
+    out_dir='out', eval_interval=2000, log_interval=1, eval_iters=200, always_save_checkpoint=True,
+    wandb_log=False, wandb_project='owt', wandb_run_name='gpt2',
+    dataset='openwebtext', gradient_accumulation_steps=1, batch_size=12, block_size=1024,
+    n_layer=12, n_head=12, n_embd=768, dropout=0.0, bias=False,
+    learning_rate=6e-4, max_iters=600000, weight_decay=1e-1, beta1=0.9, beta2=0.95, grad_clip=1.0,
+    decay_lr=True, warmup_iters=2000, lr_decay_iters=600000, min_lr=6e-5,
+    device='cuda', dtype='bfloat16' if torch.cuda.is_available() and torch.cuda.is_bf16_supported() else 'float32',
+    compile=False,
+    separator_token='=', stop_token='\n', enable_tf_eval=False, target_mask=False, max_new_tokens=10,
+    sample_aligned=False,  # draw windows at sample starts from the .idx index (shared/loader.py)
+    seed=1337, seeds=[1337, 1338, 1339], run_name='',
+    results_db='results/results.db',  # eval losses are appended here ('' to skip)
+)
+
+
+# ---------------------------------------------------------------------------
+# Stacked forward pass
+# ---------------------------------------------------------------------------
+
+def _linear(x, params, name):
+    """x (K, ..., in) through the stacked Linear `name` -> (K, ..., out)."""
+    K = x.size(0)
+    y = torch.bmm(x.reshape(K, -1, x.size(-1)), params[f'{name}.weight'].transpose(1, 2))
+    y = y.view(*x.shape[:-1], y.size(-1))
+    bias = params.get(f'{name}.bias')
+    if bias is not None:
+        y = y + bias.view(K, *([1] * (x.dim() - 2)), -1)
+    return y
+
+
+def _layer_norm(x, params, name):
+    K = x.size(0)
+    shape = (K,) + (1,) * (x.dim() - 2) + (-1,)
+    y = F.layer_norm(x, x.shape[-1:], eps=1e-5) * params[f'{name}.weight'].view(shape)
+    bias = params.get(f'{name}.bias')
+    return y if bias is None else y + bias.view(shape)
+
+
+def ensemble_forward(params, idx, config, targets=None, dropout=0.0):
+    """
+    GPT.forward() for K stacked replicas.
+
+    idx (K, B, T) token ids, targets (K, B, T) labels or None.
+    Returns logits (K, B, T, vocab_size) and the per-replica mean loss (K,)
+    over labels != -1 (None when targets is None).
+    """
+    K, B, T = idx.size()
+    nh, C = config.n_head, config.n_embd
+    models = torch.arange(K, device=idx.device)[:, None, None]
+    wte = params['transformer.wte.weight']
+    x = wte[models, idx] + params['transformer.wpe.weight'][:, None, :T]
+    x = F.dropout(x, dropout)
+    for i in range(config.n_layer):
+        h = f'transformer.h.{i}'
+        q, k, v = _linear(_layer_norm(x, params, f'{h}.ln_1'), params, f'{h}.attn.c_attn').split(C, dim=-1)
+        q, k, v = [t.reshape(K * B, T, nh, C // nh).transpose(1, 2) for t in (q, k, v)]
+        y = F.scaled_dot_product_attention(q, k, v, dropout_p=dropout, is_causal=True)
+        y = y.transpose(1, 2).reshape(K, B, T, C)
+        x = x + F.dropout(_linear(y, params, f'{h}.attn.c_proj'), dropout)
+        m = F.gelu(_linear(_layer_norm(x, params, f'{h}.ln_2'), params, f'{h}.mlp.c_fc'))
+        x = x + F.dropout(_linear(m, params, f'{h}.mlp.c_proj'), dropout)
+    x = _layer_norm(x, params, 'transformer.ln_f')
+    logits = torch.bmm(x.view(K, B * T, C), wte.transpose(1, 2)).view(K, B, T, -1)  # tied lm_head
+    if targets is None:
+        return logits, None
+    nll = F.cross_entropy(logits.reshape(-1, logits.size(-1)).float(), targets.reshape(-1),
+                          ignore_index=-1, reduction='none').view(K, -1)
+    loss = nll.sum(1) / (targets.view(K, -1) != -1).sum(1)
+    return logits, loss
+
+
+# ---------------------------------------------------------------------------
+# Optimizer, clipping and per-replica checkpoints
+# ---------------------------------------------------------------------------
+
+def configure_optimizer(params, weight_decay, learning_rate, betas, device_type):
+    """AdamW over the stacked tensors, grouped like GPT.configure_optimizers()."""
+    decay = [p for p in params.values() if p.dim() - 1 >= 2]
+    nodecay = [p for p in params.values() if p.dim() - 1 < 2]
+    groups = [{'params': decay, 'weight_decay': weight_decay},
+              {'params': nodecay, 'weight_decay': 0.0}]
+    extra = dict(fused=True) if device_type == 'cuda' else dict()
+    return torch.optim.AdamW(groups, lr=learning_rate, betas=betas, **extra)
+
+
+def clip_grad_norm_per_replica(params, max_norm):
+    """torch.nn.utils.clip_grad_norm_ applied to each replica's gradients separately."""
+    grads = [p.grad for p in params.values() if p.grad is not None]
+    norms = torch.stack([g.float().pow(2).flatten(1).sum(1) for g in grads]).sum(0).sqrt()
+    scale = (max_norm / (norms + 1e-6)).clamp(max=1.0)
+    for g in grads:
+        g.mul_(scale.view(-1, *([1] * (g.dim() - 1))).to(g.dtype))
+    return norms
+
+
+def replica_state_dict(params, k, template):
+    """State dict of replica k in the layout of a single GPT (template)."""
+    with torch.no_grad():
+        for name, p in template.named_parameters():
+            p.copy_(params[name][k])
+    return {name: t.detach().clone() for name, t in template.state_dict().items()}
+
+
+def replica_optimizer_state(optimizer, k):
+    """
+    Slice replica k out of the stacked AdamW state, in the layout a single-model
+    optimizer from GPT.configure_optimizers() would save (decay group first).
+    """
+    full = optimizer.state_dict()
+    state = {}
+    for i, s in full['state'].items():
+        state[i] = {key: (v if key == 'step' else v[k].clone()) for key, v in s.items()}
+    return {'state': state, 'param_groups': full['param_groups']}
+
+
+# ---------------------------------------------------------------------------
+# Data
+# ---------------------------------------------------------------------------
+
+def target_mask(y, sep_id, stop_id):
+    """Set labels outside an output region to -1 (most recent marker before each label decides)."""
+    T = y.size(-1)
+    pos = torch.arange(T, device=y.device).expand_as(y)
+    last_sep = torch.where(y == sep_id, pos, -1).cummax(-1).values
+    last_stop = torch.where(y == stop_id, pos, -1).cummax(-1).values
+    # markers strictly before each position
+    last_sep = F.pad(last_sep[..., :-1], (1, 0), value=-1)
+    last_stop = F.pad(last_stop[..., :-1], (1, 0), value=-1)
+    return torch.where(last_sep > last_stop, y, -1)
+
+
+def get_batch(data_dir, split, generators, batch_size, block_size, device):
+    """Random windows as in nanoGPT's get_batch(), one generator per replica -> (K, B, T)."""
+    data = open_bin(os.path.join(data_dir, f'{split}.bin'))
+    xs, ys = [], []
+    for g in generators:
+        ix = torch.randint(len(data) - block_size, (batch_size,), generator=g)
+        xs.append(torch.stack([torch.from_numpy(data[i:i + block_size].astype(np.int64)) for i in ix]))
+        ys.append(torch.stack([torch.from_numpy(data[i + 1:i + 1 + block_size].astype(np.int64)) for i in ix]))
+    return _to_device(torch.stack(xs), torch.stack(ys), device)
+
+
+def get_sample_batch(loaders, batch_size, device):
+    """Sample-aligned windows, one SampleLoader per replica -> (K, B, T) (labels masked by the loader)."""
+    xs, ys = zip(*(loader.get_batch(batch_size) for loader in loaders))
+    return _to_device(torch.stack(xs), torch.stack(ys), device)
+
+
+def _to_device(x, y, device):
+    if 'cuda' in str(device):
+        return x.pin_memory().to(device, non_blocking=True), y.pin_memory().to(device, non_blocking=True)
+    return x.to(device), y.to(device)
+
+
+# ---------------------------------------------------------------------------
+# Training loop
+# ---------------------------------------------------------------------------
+
+def get_lr(it, cfg):
+    """nanoGPT's linear warmup + cosine decay schedule."""
+    if it < cfg['warmup_iters']:
+        return cfg['learning_rate'] * (it + 1) / (cfg['warmup_iters'] + 1)
+    if it > cfg['lr_decay_iters']:
+        return cfg['min_lr']
+    decay_ratio = (it - cfg['warmup_iters']) / (cfg['lr_decay_iters'] - cfg['warmup_iters'])
+    coeff = 0.5 * (1.0 + math.cos(math.pi * decay_ratio))
+    return cfg['min_lr'] + coeff * (cfg['learning_rate'] - cfg['min_lr'])
+
+
+def train_ensemble(cfg: dict, seeds, out_dirs):
+    """
+    Train one replica per seed with the nanoGPT config dict cfg.
+
+    cfg holds the usual train.py keys (dataset, batch_size, block_size, n_layer,
+    learning_rate, max_iters, eval_interval, ...) plus target_mask,
+    separator_token, stop_token, sample_aligned, and optionally results_db /
+    experiment for logging eval losses to a ResultsStore.
+    """
+    from model import GPT, GPTConfig  # comp560-nanoGPT, put on sys.path by the caller
+
+    device = cfg['device']
+    device_type = 'cuda' if 'cuda' in device else 'cpu'
+    dtype = cfg['dtype']
+    if dtype == 'float16':
+        raise ValueError("float16 needs a GradScaler, which would share one loss scale across the replicas; "
+                         "use --dtype=bfloat16 or --dtype=float32")
+    ptdtype = {'float32': torch.float32, 'bfloat16': torch.bfloat16}[dtype]
+    ctx = nullcontext() if device_type == 'cpu' else torch.amp.autocast(device_type=device_type, dtype=ptdtype)
+    if device_type == 'cuda':
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.backends.cudnn.allow_tf32 = True
+
+    data_dir = os.path.join('data', cfg['dataset'])
+    with open(os.path.join(data_dir, 'meta.pkl'), 'rb') as f:
+        meta = pickle.load(f)
+    sep_id, stop_id = meta['stoi'][cfg['separator_token']], meta['stoi'][cfg['stop_token']]
+
+    model_args = dict(n_layer=cfg['n_layer'], n_head=cfg['n_head'], n_embd=cfg['n_embd'],
+                      block_size=cfg['block_size'], bias=cfg['bias'], vocab_size=meta['vocab_size'],
+                      dropout=cfg['dropout'])
+    gptconf = GPTConfig(**model_args)
+
+    # Each replica: seeded init, then a data generator continuing the same RNG stream
+    models, generators = [], []
+    for seed in seeds:
+        torch.manual_seed(seed)
+        models.append(GPT(gptconf))
+        g = torch.Generator()
+        g.set_state(torch.get_rng_state())
+        generators.append(g)
+    template = models[0]
+    params, _ = stack_module_state(models)
+    params = {name: p.detach().to(device).requires_grad_() for name, p in params.items()}
+    K = len(seeds)
+    print(f"Training {K} replicas of {sum(p[0].numel() for p in params.values()) / 1e6:.2f}M parameters "
+          f"(seeds {', '.join(map(str, seeds))})")
+
+    optimizer = configure_optimizer(params, cfg['weight_decay'], cfg['learning_rate'],
+                                    (cfg['beta1'], cfg['beta2']), device_type)
+    for d in out_dirs:
+        os.makedirs(d, exist_ok=True)
+    store = ResultsStore(cfg['results_db']) if cfg.get('results_db') else None
+    runs = [os.path.basename(os.path.normpath(d)) for d in out_dirs]
+
+    loaders = None
+    if cfg.get('sample_aligned'):
+        loaders = {split: [SampleLoader(data_dir, split, cfg['block_size'], cfg['target_mask'], seed=[seed, i])
+                           for seed in seeds]
+                   for i, split in enumerate(('train', 'val'))}
+
+    def batch(split):
+        if loaders is not None:
+            return get_sample_batch(loaders[split], cfg['batch_size'], device)
+        x, y = get_batch(data_dir, split, generators, cfg['batch_size'], cfg['block_size'], device)
+        if cfg['target_mask']:
+            y = target_mask(y, sep_id, stop_id)
+        return x, y
+
+    @torch.no_grad()
+    def estimate_loss():
+        out = {}
+        for split in ['train', 'val']:
+            losses = torch.zeros(cfg['eval_iters'], K)
+            for i in range(cfg['eval_iters']):
+                x, y = batch(split)
+                with ctx:
+                    _, loss = ensemble_forward(params, x, gptconf, y)
+                losses[i] = loss.float().cpu()
+            out[split] = losses.mean(0)
+        return out
+
+    def fmt(v):
+        return ' '.join(f'{x:.4f}' for x in v.tolist())
+
+    best_val_loss = torch.full((K,), 1e9)
+    iter_num = 0
+    X, Y = batch('train')
+    t0 = time.time()
+    while True:
+        lr = get_lr(iter_num, cfg) if cfg['decay_lr'] else cfg['learning_rate']
+        for group in optimizer.param_groups:
+            group['lr'] = lr
+
+        if iter_num % cfg['eval_interval'] == 0:
+            losses = estimate_loss()
+            print(f"step {iter_num}: train loss [{fmt(losses['train'])}], val loss [{fmt(losses['val'])}]")
+            if store is not None:
+                store.append_many([(cfg.get('experiment'), run, iter_num, split, 'loss', losses[split][k].item(),
+                                    None, cfg['dataset'], 'train_ensemble')
+                                   for k, run in enumerate(runs) for split in ('train', 'val')])
+            for k, out_dir in enumerate(out_dirs):
+                improved = losses['val'][k] < best_val_loss[k]
+                if improved:
+                    best_val_loss[k] = losses['val'][k]
+                if iter_num == 0:
+                    continue
+                checkpoint = {
+                    'model': replica_state_dict(params, k, template),
+                    'optimizer': replica_optimizer_state(optimizer, k),
+                    'model_args': model_args,
+                    'iter_num': iter_num,
+                    'best_val_loss': best_val_loss[k].item(),
+                    'config': dict(cfg, seed=seeds[k], out_dir=out_dir),
+                }
+                # A snapshot at every eval, as train_benchmark.py writes, for eval_sweep.py
+                torch.save(checkpoint, os.path.join(out_dir, f'ckpt_{iter_num:05d}.pt'))
+                if improved or cfg['always_save_checkpoint']:
+                    torch.save(checkpoint, os.path.join(out_dir, 'ckpt.pt'))
+            if iter_num > 0:
+                print(f"saved checkpoints to {', '.join(out_dirs)}")
+
+        if iter_num >= cfg['max_iters']:
+            break
+
+        for _ in range(cfg['gradient_accumulation_steps']):
+            with ctx:
+                _, loss = ensemble_forward(params, X, gptconf, Y, cfg['dropout'])
+                loss = loss.sum() / cfg['gradient_accumulation_steps']
+            X, Y = batch('train')
+            loss.backward()
+        if cfg['grad_clip'] != 0.0:
+            clip_grad_norm_per_replica(params, cfg['grad_clip'])
+        optimizer.step()
+        optimizer.zero_grad(set_to_none=True)
+
+        t1 = time.time()
+        dt, t0 = t1 - t0, t1
+        if iter_num % cfg['log_interval'] == 0:
+            lossf = loss.item() * cfg['gradient_accumulation_steps'] / K
+            print(f"iter {iter_num}: mean loss {lossf:.4f}, time {dt * 1000:.2f}ms ({K} replicas)")
+        iter_num += 1
@@ -0,0 +1,211 @@
+"""
+Batched autoregressive decoding for nanoGPT character models.
+
+model.generate() decodes one prompt at a time. generate_batch() packs prompts of
+different lengths into one right-padded tensor and decodes them together, retiring
+each row once it emits the stop token.
+
+Right padding keeps the padded batch equivalent to running each prompt alone:
+attention is causal, so the pad slots after a prompt never influence the logits
+at its last real position, and every token keeps its absolute position embedding.
+
+With kv_cache=True the prompts are run once (prefill) and every later step feeds
+only the newest token per row, attending over per-layer key/value buffers. Rows
+write their keys at their own position, so different prompt lengths need only a
+per-row key mask. check_kv_parity() compares the two paths under greedy decoding.
+
+When the expected continuation is known (exact-match evaluation), generate_batch()
+can also retire a row the moment it diverges from it. Scratchpad outputs are a
+deterministic function of the operands (shared.scratchpad.build_scratchpad), so
+a partial output is well-formed and on track exactly when it is a prefix of the
+expected one; comparing one token per row per step on the device is the
+structure check. Rows that will fail exact-match stop paying for the rest of
+their scratchpad, and the exact-match verdict is unchanged.
+"""
+
+import torch
+from torch.nn import functional as F
+
+
+def forward_hidden(model, idx):
+    """
+    Run the nanoGPT trunk (embeddings -> blocks -> ln_f) on idx.
+
+    Unlike GPT.forward() without targets, this returns the hidden state of every
+    position, so callers can read logits at a different position per row.
+    """
+    t = idx.size(1)
+    pos = torch.arange(0, t, dtype=torch.long, device=idx.device)
+    x = model.transformer.drop(model.transformer.wte(idx) + model.transformer.wpe(pos))
+    for block in model.transformer.h:
+        x = block(x)
+    return model.transformer.ln_f(x)
+
+
+def _qkv(attn, x):
+    """Project x through a CausalSelfAttention block into (B, n_head, T, head_size) q, k, v."""
+    B, T, C = x.size()
+    q, k, v = attn.c_attn(x).split(attn.n_embd, dim=2)
+    return [t.view(B, T, attn.n_head, C // attn.n_head).transpose(1, 2) for t in (q, k, v)]
+
+
+def _merge_heads(attn, y):
+    """Inverse of _qkv for the attention output, followed by the output projection."""
+    B, nh, T, hs = y.size()
+    y = y.transpose(1, 2).contiguous().view(B, T, nh * hs)
+    return attn.resid_dropout(attn.c_proj(y))
+
+
+def prefill_kv(model, idx, width):
+    """
+    Run the prompts in idx (B, T) through the trunk and build the key/value cache.
+
+    Returns the final hidden states (B, T, n_embd) and one (k, v) pair of buffers per
+    layer, each (B, n_head, width, head_size) with positions [0, T) filled in.
+    """
+    B, t = idx.size()
+    pos = torch.arange(0, t, dtype=torch.long, device=idx.device)
+    x = model.transformer.drop(model.transformer.wte(idx) + model.transformer.wpe(pos))
+    cache = []
+    for block in model.transformer.h:
+        q, k, v = _qkv(block.attn, block.ln_1(x))
+        y = F.scaled_dot_product_attention(q, k, v, is_causal=True)
+        x = x + _merge_heads(block.attn, y)
+        x = x + block.mlp(block.ln_2(x))
+
+        k_buf = k.new_zeros(B, k.size(1), width, k.size(3))
+        v_buf = v.new_zeros(B, v.size(1), width, v.size(3))
+        k_buf[:, :, :t] = k
+        v_buf[:, :, :t] = v
+        cache.append((k_buf, v_buf))
+    return model.transformer.ln_f(x), cache
+
+
+def decode_step_kv(model, tokens, pos, cache, rows):
+    """
+    Feed one new token per row and return next-token logits (len(rows), vocab_size).
+
+    tokens[i] sits at position pos[i] of cache row rows[i]; its key/value are written
+    there before attending, and keys past pos[i] are masked out.
+    """
+    x = model.transformer.wte(tokens) + model.transformer.wpe(pos)
+    x = model.transformer.drop(x)[:, None, :]
+    width = int(pos.max()) + 1
+    key_pos = torch.arange(width, device=pos.device)
+    mask = (key_pos[None, :] <= pos[:, None])[:, None, None, :]
+    for block, (k_buf, v_buf) in zip(model.transformer.h, cache):
+        q, k, v = _qkv(block.attn, block.ln_1(x))
+        k_buf[rows, :, pos] = k[:, :, 0]
+        v_buf[rows, :, pos] = v[:, :, 0]
+        y = F.scaled_dot_product_attention(q, k_buf[rows, :, :width], v_buf[rows, :, :width], attn_mask=mask)
+        x = x + _merge_heads(block.attn, y)
+        x = x + block.mlp(block.ln_2(x))
+    return model.lm_head(model.transformer.ln_f(x)[:, -1])
+
+
+def sample_next(logits, temperature=1.0, top_k=None):
+    """
+    Pick the next token for each row of logits (B, vocab_size).
+
+    temperature <= 0 means greedy argmax. Otherwise this mirrors model.generate():
+    scale by temperature, keep the top_k logits, and sample from the softmax.
+    """
+    if temperature <= 0:
+        return torch.argmax(logits, dim=-1)
+    logits = logits / temperature
+    if top_k is not None:
+        v, _ = torch.topk(logits, min(top_k, logits.size(-1)))
+        logits = logits.masked_fill(logits < v[:, [-1]], -float('Inf'))
+    probs = F.softmax(logits, dim=-1)
+    return torch.multinomial(probs, num_samples=1).squeeze(1)
+
+
+@torch.no_grad()
+def generate_batch(model, prompts, max_new_tokens, stop_token, temperature=1.0, top_k=None,
+                   kv_cache=False, lengths=None, expected=None):
+    """
+    Decode a batch of prompts together.
+
+    Args:
+        model:          nanoGPT GPT model (already in eval mode, on its device).
+        prompts:        List of token id lists, one per prompt (lengths may differ), or a
+                        right-padded (B, T) LongTensor of prompts when lengths is given.
+        max_new_tokens: Generation budget per row.
+        stop_token:     Token id that retires a row (it is kept in the output).
+        temperature:    Sampling temperature; <= 0 for greedy decoding.
+        top_k:          Optional top-k filter, as in model.generate().
+        kv_cache:       Reuse per-layer keys/values and process only the newest token per step.
+        lengths:        Prompt lengths (B,) for a padded prompts tensor.
+        expected:       Optional (B, E) LongTensor of expected continuations (answer, stop
+                        token, then stop-token padding). A row is retired as soon as its
+                        latest token differs from the expected one; its output then ends
+                        with that diverging token.
+
+    Returns:
+        List of generated token id lists (prompt excluded), in prompt order.
+    """
+    device = next(model.parameters()).device
+    B = len(prompts)
+    if lengths is None:
+        lengths = torch.tensor([len(p) for p in prompts], dtype=torch.long, device=device)
+    else:
+        lengths = torch.as_tensor(lengths, dtype=torch.long, device=device)
+    width = int(lengths.max()) + max_new_tokens
+    if width > model.config.block_size:
+        raise ValueError(
+            f"longest prompt + max_new_tokens = {width} exceeds block_size={model.config.block_size}"
+        )
+
+    # Right-padded token buffer; pad slots are overwritten as rows grow.
+    buf = torch.full((B, width), stop_token, dtype=torch.long, device=device)
+    if torch.is_tensor(prompts):
+        t = int(lengths.max())
+        real = torch.arange(t, device=device)[None, :] < lengths[:, None]
+        buf[:, :t] = torch.where(real, prompts[:, :t].to(device=device, dtype=torch.long), stop_token)
+    else:
+        for i, p in enumerate(prompts):
+            buf[i, :len(p)] = torch.tensor(p, dtype=torch.long, device=device)
+
+    cur = lengths.clone()  # next write position per row
+    rows = torch.arange(B, device=device)
+
+    if expected is not None:
+        expected = expected.to(device=device, dtype=torch.long)
+
+    if kv_cache:
+        h, cache = prefill_kv(model, buf[:, :int(lengths.max())], width)
+        logits = model.lm_head(h[rows, lengths - 1])
+
+    for step in range(max_new_tokens):
+        pos = cur[rows]
+        if not kv_cache:
+            h = forward_hidden(model, buf[rows, :int(pos.max())])
+            logits = model.lm_head(h[torch.arange(rows.numel(), device=device), pos - 1])
+        idx_next = sample_next(logits, temperature, top_k)
+
+        buf[rows, pos] = idx_next
+        cur[rows] = pos + 1
+
+        keep = idx_next != stop_token
+        if expected is not None:
+            on_track = idx_next == expected[rows, step] if step < expected.size(1) else torch.zeros_like(keep)
+            keep &= on_track
+        rows, idx_next, pos = rows[keep], idx_next[keep], pos[keep]
+        if rows.numel() == 0 or step == max_new_tokens - 1:
+            break
+        if kv_cache:
+            logits = decode_step_kv(model, idx_next, pos, cache, rows)
+
+    return [buf[i, lengths[i]:cur[i]].tolist() for i in range(B)]
+
+
+@torch.no_grad()
+def check_kv_parity(model, prompts, max_new_tokens, stop_token):
+    """
+    Greedy-decode prompts with and without the KV cache.
+
+    Returns the indices of prompts whose generated tokens differ (empty when in parity).
+    """
+    plain = generate_batch(model, prompts, max_new_tokens, stop_token, temperature=0)
+    cached = generate_batch(model, prompts, max_new_tokens, stop_token, temperature=0, kv_cache=True)
+    return [i for i, (a, b) in enumerate(zip(plain, cached)) if a != b]
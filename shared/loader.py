@@ -0,0 +1,66 @@
+"""
+Sample-aligned batch loader over memory-mapped .bin/.idx files.
+
+nanoGPT's get_batch() draws windows at random token offsets, so a window can open
+in the middle of a sample and target masking has to rediscover the separator and
+stop tokens at runtime (the block_size=16 edge case from Exp 4). SampleLoader
+starts every window at a sample boundary taken from the offsets index, and builds
+the loss mask from the recorded separator offsets instead of scanning tokens.
+
+Windows are gathered from a strided view of the memmapped stream, so the only
+copy is the batch itself.
+"""
+
+import os
+
+import numpy as np
+import torch
+
+from shared.sample_index import read_index
+from shared.token_bin import open_bin
+
+
+class SampleLoader:
+    """
+    Serve (x, y) batches of block_size tokens, each window starting at a sample start.
+
+    With target_mask=True, labels outside every sample's output region (input and
+    separator tokens) are set to -1, the ignore_index of nanoGPT's cross-entropy,
+    matching the target_mask option of the comp560-nanoGPT train.py.
+    """
+
+    def __init__(self, data_dir: str, split: str, block_size: int, target_mask: bool = False,
+                 device: str = 'cpu', seed=None):
+        self.data = open_bin(os.path.join(data_dir, f'{split}.bin'))  # legacy uint16 or versioned
+        self.index = read_index(os.path.join(data_dir, f'{split}.idx'))
+        self.block_size = block_size
+        self.target_mask = target_mask
+        self.device = device
+        self.rng = np.random.default_rng(seed)
+
+        if len(self.data) < block_size + 1:
+            raise ValueError(f"{split}.bin has {len(self.data)} tokens, fewer than block_size + 1")
+        self.windows = np.lib.stride_tricks.sliding_window_view(self.data, block_size + 1)
+        # only samples whose whole window fits in the stream can start a window
+        self.num_starts = int(np.searchsorted(self.index[:, 0], len(self.data) - block_size - 1, side='right'))
+
+    def loss_mask(self, starts: np.ndarray) -> np.ndarray:
+        """(B, block_size) bool mask of label positions inside an output region."""
+        pos = starts[:, None] + 1 + np.arange(self.block_size)[None, :]
+        sample = np.searchsorted(self.index[:, 0], pos, side='right') - 1
+        return pos > self.index[sample, 1]
+
+    def get_batch(self, batch_size: int):
+        rows = self.rng.integers(0, self.num_starts, batch_size)
+        starts = np.asarray(self.index[rows, 0])
+        window = self.windows[starts].astype(np.int64)
+        x = torch.from_numpy(window[:, :-1])
+        y = window[:, 1:]
+        if self.target_mask:
+            y = np.where(self.loss_mask(starts), y, -1)
+        y = torch.from_numpy(np.ascontiguousarray(y))
+        if 'cuda' in str(self.device):
+            x, y = x.pin_memory().to(self.device, non_blocking=True), y.pin_memory().to(self.device, non_blocking=True)
+        else:
+            x, y = x.to(self.device), y.to(self.device)
+        return x, y
@@ -0,0 +1,74 @@
+"""
+Content-hash manifest for prepared datasets.
+
+prepare.py writes <out_dir>/manifest.json next to the artifacts it produces:
+
+    inputs    sha256 of the source JSONL plus every option that changes the output
+              (seed, sep, stop_token, test_size, shuffle, stream, compact, ...)
+    vocab     the vocabulary in id order
+    outputs   {file name: sha256} of meta.pkl, *.bin, *.idx and *.jsonl
+
+Before preparing, up_to_date() compares the manifest with the current inputs
+and re-hashes the recorded outputs; when everything matches the dataset is left
+as it is, so pipelines can call prepare.py unconditionally. The split is
+seeded, so re-preparing the same inputs reproduces the same files.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+MANIFEST = 'manifest.json'
+VERSION = 1
+
+
+def file_sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def input_record(source: str, **options) -> dict:
+    """What a prepared dataset is a function of: the source file's hash and the prepare options."""
+    return {'version': VERSION, 'source_sha256': file_sha256(source), **options}
+
+
+def read_manifest(out_dir: str):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def up_to_date(out_dir: str, inputs: dict) -> bool:
+    """True when out_dir was prepared from exactly these inputs and its outputs are unmodified."""
+    manifest = read_manifest(out_dir)
+    if manifest is None or manifest.get('inputs') != inputs:
+        return False
+    for name, digest in manifest.get('outputs', {}).items():
+        path = os.path.join(out_dir, name)
+        if not os.path.exists(path) or file_sha256(path) != digest:
+            return False
+    return True
+
+
+def write_manifest(out_dir: str, inputs: dict, outputs) -> dict:
+    """Record inputs, the vocabulary (from meta.pkl) and the sha256 of every output file (names relative to out_dir)."""
+    with open(os.path.join(out_dir, 'meta.pkl'), 'rb') as f:
+        itos = pickle.load(f)['itos']
+    manifest = {
+        'inputs': inputs,
+        'vocab': ''.join(itos[i] for i in range(len(itos))),
+        'outputs': {name: file_sha256(os.path.join(out_dir, name)) for name in sorted(outputs)},
+    }
+    save_manifest(out_dir, manifest)
+    return manifest
+
+
+def save_manifest(out_dir: str, manifest: dict) -> None:
+    with open(os.path.join(out_dir, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
@@ -0,0 +1,131 @@
+"""
+Length-bucketed evaluation of several eval files with one resident model.
+
+The length-generalization report used to be one eval_scratchpad.py run per
+file (val.jsonl, 3digit.jsonl, 4digit.jsonl, 5digit.jsonl), each reloading the
+model and padding every batch to its longest prompt. Here all files are loaded
+once and their samples grouped into buckets of identical (prompt length,
+expected output length). Every batch of a bucket is a dense (B, T) tensor
+with no padding, and every bucket reports its own accuracy.
+
+The bucket key is the expected output, not what the model generates. On files
+in the model's own output format (val.jsonl) a correct model stops every row
+of a bucket at the same step. A scratchpad model scored on the plain-answer
+OOD files writes a scratchpad whose length depends on the operands and carries,
+not on the plain answer's length, so those rows stop at different steps and
+each batch decodes until its longest row stops (or the token budget runs out).
+
+Two scores per sample:
+
+    exact    the output before the stop token equals the expected output
+    answer   the final answer (text after the last ']') equals the expected
+             final answer, which is how scratchpad models are scored on the
+             plain-answer OOD files
+"""
+
+import csv
+import json
+import os
+from collections import defaultdict
+
+import numpy as np
+import torch
+
+from shared.analytics import final_answers
+from shared.generation import generate_batch
+
+
+def read_samples(path: str):
+    """(inputs, outputs) of a JSONL eval file."""
+    inputs, outputs = [], []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                sample = json.loads(line)
+                inputs.append(sample['input'])
+                outputs.append(sample['output'])
+    return inputs, outputs
+
+
+class BucketedEval:
+    """
+    Samples of several eval files, tokenized once and grouped by (file,
+    prompt_len, output_len), where output_len is the expected output's length.
+    """
+
+    def __init__(self, files, tok, sep: str = '=', stop_token: str = '\n', max_samples: int = 0):
+        self.tok = tok
+        self.stop_id = tok.stoi[stop_token]
+        self.buckets = {}  # (file, prompt_len, output_len) -> (prompt ids (B, T), expected outputs)
+        for path in files:
+            inputs, outputs = read_samples(path)
+            if max_samples:
+                inputs, outputs = inputs[:max_samples], outputs[:max_samples]
+            groups = defaultdict(list)
+            for i, (x, y) in enumerate(zip(inputs, outputs)):
+                groups[(len(x) + len(sep), len(y))].append(i)
+            for (prompt_len, output_len), idx in sorted(groups.items()):
+                ids, _ = tok.encode_batch([inputs[i] + sep for i in idx])
+                self.buckets[(path, prompt_len, output_len)] = (torch.from_numpy(ids), [outputs[i] for i in idx])
+        n = sum(len(v[1]) for v in self.buckets.values())
+        print(f"Eval buckets ready ({n} samples from {len(files)} files in {len(self.buckets)} buckets)")
+
+    @torch.no_grad()
+    def evaluate(self, model, max_new_tokens: int, batch_size: int = 1000):
+        """
+        Greedy decode every bucket -> list of dicts with file, prompt_len,
+        output_len, n, exact and answer (correct counts).
+        """
+        device = next(model.parameters()).device
+        rows = []
+        for (path, prompt_len, output_len), (ids, outputs) in self.buckets.items():
+            budget = min(max_new_tokens, model.config.block_size - prompt_len)
+            exact = answer = 0
+            for start in range(0, len(outputs), batch_size):
+                chunk = ids[start:start + batch_size].to(device)
+                lengths = torch.full((len(chunk),), prompt_len, dtype=torch.long, device=device)
+                outs = generate_batch(model, chunk, budget, self.stop_id, temperature=0, kv_cache=True,
+                                      lengths=lengths)
+                texts = [self.tok.decode(o[:o.index(self.stop_id)] if self.stop_id in o else o) for o in outs]
+                expected = outputs[start:start + batch_size]
+                exact += sum(t == y for t, y in zip(texts, expected))
+                answer += int(np.sum(np.array(final_answers(texts)) == np.array(final_answers(expected))))
+            rows.append({'file': path, 'prompt_len': prompt_len, 'output_len': output_len,
+                         'n': len(outputs), 'exact': exact, 'answer': answer})
+        return rows
+
+
+def summarize(rows):
+    """Per-file totals of evaluate() rows, in file order."""
+    totals = {}
+    for r in rows:
+        t = totals.setdefault(r['file'], {'file': r['file'], 'n': 0, 'exact': 0, 'answer': 0})
+        for key in ('n', 'exact', 'answer'):
+            t[key] += r[key]
+    return list(totals.values())
+
+
+def format_report(rows) -> str:
+    """Plain-text per-bucket and per-file accuracy table."""
+    lines = [f"{'file':<40} {'prompt':>6} {'output':>6} {'n':>6} {'exact %':>8} {'answer %':>9}"]
+    for r in rows:
+        lines.append(f"{r['file']:<40} {r['prompt_len']:>6} {r['output_len']:>6} {r['n']:>6} "
+                     f"{100.0 * r['exact'] / r['n']:>8.1f} {100.0 * r['answer'] / r['n']:>9.1f}")
+    lines.append('')
+    for t in summarize(rows):
+        lines.append(f"{t['file']:<40} {'all':>6} {'':>6} {t['n']:>6} "
+                     f"{100.0 * t['exact'] / t['n']:>8.1f} {100.0 * t['answer'] / t['n']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def write_report(rows, path: str, **tags):
+    """Append the per-bucket rows to a CSV (tags, e.g. out_dir, as leading columns)."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    new_file = not os.path.exists(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(list(tags) + ['file', 'prompt_len', 'output_len', 'n', 'exact', 'answer'])
+        for r in rows:
+            writer.writerow(list(tags.values()) + [r['file'], r['prompt_len'], r['output_len'],
+                                                   r['n'], r['exact'], r['answer']])
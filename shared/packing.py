@@ -0,0 +1,146 @@
+"""
+Packed-sequence batching: whole samples per block, isolated from each other.
+
+The addition samples are 10-50 tokens but block_size is 64-128, so random windows
+(and even the sample-aligned windows of SampleLoader) spend part of every block on
+a sample cut at the window edge, whose labels are trained without their prompt.
+PackedLoader instead fills each row of a batch with as many complete samples as
+fit, and returns two extra (B, block_size) tensors describing the layout:
+
+    pos   position of each token within its own sample (resets to 0 per sample)
+    seg   sample id of each token (-1 for padding at the end of a row)
+
+forward_packed() runs the nanoGPT model with position embeddings taken from pos
+and a block-diagonal causal attention mask built from seg, so every token only
+sees earlier tokens of its own sample. Each packed sample therefore trains
+exactly as if it were alone at the start of a block, which is also how it is
+seen at evaluation time (prompt at position 0).
+
+Each sample contributes its tokens minus the stop token as inputs and its tokens
+minus the first as labels, so no label crosses a sample boundary. Samples longer
+than block_size + 1 tokens cannot be packed whole and are skipped.
+"""
+
+import numpy as np
+import torch
+from torch.nn import functional as F
+
+from shared.generation import _merge_heads, _qkv
+from shared.loader import SampleLoader
+
+
+class PackedLoader(SampleLoader):
+    """
+    Serve packed (x, y, pos, seg) batches of block_size tokens.
+
+    Samples are visited in a fresh random order every epoch and packed greedily:
+    a row is closed as soon as the next sample does not fit. With target_mask=True
+    only output-region labels are kept, as in SampleLoader.
+    """
+
+    def __init__(self, data_dir: str, split: str, block_size: int, target_mask: bool = False,
+                 device: str = 'cpu', seed=None):
+        super().__init__(data_dir, split, block_size, target_mask, device, seed)
+        index = np.asarray(self.index)
+        self.starts, self.seps = index[:, 0], index[:, 1]
+        self.lens = index[:, 2] - index[:, 0] - 1     # input positions per sample
+        self.eligible = np.flatnonzero((self.lens > 0) & (self.lens <= block_size))
+        if len(self.eligible) == 0:
+            raise ValueError(f"no {split} sample fits in block_size={block_size}")
+        skipped = len(index) - len(self.eligible)
+        if skipped:
+            print(f"PackedLoader: skipping {skipped} {split} samples longer than block_size + 1")
+        self.order = self.rng.permutation(self.eligible)
+        self.cursor = 0
+        self.epoch = 0
+        self.slots_used = 0
+        self.slots_total = 0
+
+    def _next_sample(self):
+        if self.cursor == len(self.order):
+            self.order = self.rng.permutation(self.eligible)
+            self.cursor = 0
+            self.epoch += 1
+        return self.order[self.cursor]
+
+    def plan(self, batch_size: int):
+        """Pick the samples for one batch: (sample ids, row of each, column offset of each)."""
+        picks, rows, cols = [], [], []
+        for r in range(batch_size):
+            col = 0
+            while True:
+                s = self._next_sample()
+                n = int(self.lens[s])
+                if col + n > self.block_size:
+                    break
+                picks.append(s)
+                rows.append(r)
+                cols.append(col)
+                col += n
+                self.cursor += 1
+        return np.array(picks), np.array(rows), np.array(cols)
+
+    def get_batch(self, batch_size: int):
+        picks, rows, cols = self.plan(batch_size)
+        lens = self.lens[picks]
+        total = int(lens.sum())
+        first = np.cumsum(lens) - lens
+        within = np.arange(total) - np.repeat(first, lens)
+        r = np.repeat(rows, lens)
+        c = np.repeat(cols, lens) + within
+        src = np.repeat(self.starts[picks], lens) + within
+
+        x = np.zeros((batch_size, self.block_size), dtype=np.int64)
+        y = np.full((batch_size, self.block_size), -1, dtype=np.int64)
+        pos = np.zeros((batch_size, self.block_size), dtype=np.int64)
+        seg = np.full((batch_size, self.block_size), -1, dtype=np.int64)
+        x[r, c] = self.data[src]
+        labels = self.data[src + 1].astype(np.int64)
+        if self.target_mask:
+            labels = np.where(src + 1 > np.repeat(self.seps[picks], lens), labels, -1)
+        y[r, c] = labels
+        pos[r, c] = within
+        seg[r, c] = np.repeat(np.arange(len(picks)), lens)
+
+        self.slots_used += total
+        self.slots_total += batch_size * self.block_size
+
+        out = [torch.from_numpy(t) for t in (x, y, pos, seg)]
+        if 'cuda' in str(self.device):
+            return [t.pin_memory().to(self.device, non_blocking=True) for t in out]
+        return [t.to(self.device) for t in out]
+
+    @property
+    def utilization(self) -> float:
+        """Fraction of batch slots filled with sample tokens so far."""
+        return self.slots_used / max(self.slots_total, 1)
+
+
+def packed_attention_mask(seg):
+    """(B, T, T) bool mask: causal, and only within the same segment."""
+    T = seg.size(1)
+    causal = torch.ones(T, T, dtype=torch.bool, device=seg.device).tril()
+    return (seg[:, :, None] == seg[:, None, :]) & causal
+
+
+def forward_packed(model, idx, pos, seg, targets=None):
+    """
+    GPT.forward() for packed rows: per-sample positions and attention isolation.
+
+    Returns (logits, loss) like GPT.forward(), with logits for every position and
+    loss averaged over labels != -1 (None when targets is None).
+    """
+    x = model.transformer.drop(model.transformer.wte(idx) + model.transformer.wpe(pos))
+    mask = packed_attention_mask(seg)[:, None]
+    for block in model.transformer.h:
+        attn = block.attn
+        q, k, v = _qkv(attn, block.ln_1(x))
+        y = F.scaled_dot_product_attention(q, k, v, attn_mask=mask,
+                                           dropout_p=attn.dropout if model.training else 0)
+        x = x + _merge_heads(attn, y)
+        x = x + block.mlp(block.ln_2(x))
+    logits = model.lm_head(model.transformer.ln_f(x))
+    loss = None
+    if targets is not None:
+        loss = F.cross_entropy(logits.view(-1, logits.size(-1)), targets.view(-1), ignore_index=-1)
+    return logits, loss
@@ -0,0 +1,124 @@
+"""
+Fused generate + prepare for addition datasets.
+
+The two-stage pipeline writes {name}.jsonl with json.dumps, then prepare.py parses
+it back, re-formats "{input}{sep}{output}{stop_token}" and re-encodes it.
+prepare_pairs() goes straight from operand arrays to the prepared artifacts:
+
+    train.bin / val.bin   token ids (uint16, or shared.token_bin's versioned format
+                          with compact=True)
+    train.idx / val.idx   per-sample offsets index (see shared.sample_index)
+    meta.pkl              {'vocab_size', 'itos', 'stoi'}
+    train.jsonl / val.jsonl  eval splits, same records prepare.py would write
+
+Split and shuffle follow masking_benchmark/prepare.py: shuffle the samples (as
+random.shuffle would with the same seed), then hold out the last test_size
+fraction, forcing one validation sample for tiny datasets; test_size=0 uses the
+full dataset for both splits.
+
+The vocabulary is only known once every sample has been seen, so the single
+generation pass stores ASCII character codes (one byte per token) in temporary
+files, and a final linear pass remaps them to token ids.
+"""
+
+import json
+import os
+import pickle
+import random
+
+import numpy as np
+
+from shared.sample_index import append_index, build_index
+from shared.token_bin import BinWriter, meta_fields
+from shared.scratchpad import grid_strings, sample_grid
+
+
+def split_order(n: int, test_size: float, shuffle: bool, seed=None) -> dict:
+    """Sample indices for the train and val splits, as prepare.py assigns them."""
+    order = list(range(n))
+    if shuffle:
+        random.Random(seed).shuffle(order)
+    order = np.array(order, dtype=np.int64)
+
+    if test_size <= 0:
+        print(f"Split: Using full dataset ({n} samples) for both Train and Val (Memorization).")
+        return {'train': order, 'val': order}
+
+    num_val = int(n * test_size)
+    if num_val == 0 and n > 1:
+        num_val = 1
+        print("Warning: Dataset is very small. Forcing 1 validation sample.")
+    print(f"Split: {n - num_val} training samples, {num_val} validation samples.")
+    return {'train': order[:n - num_val], 'val': order[n - num_val:]}
+
+
+def prepare_pairs(a, b, out_dir: str, kind: str = "scratchpad", multiplier: int = 1,
+                  sep: str = "=", stop_token: str = "\n", test_size: float = 0.1,
+                  shuffle: bool = True, seed=None, chunk_size: int = 500_000, compact: bool = False) -> None:
+    """
+    Generate and prepare the samples for operand arrays a, b in one pass.
+
+    kind and multiplier select the record format (see shared.scratchpad.sample_grid).
+    """
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    print(f"Preparing {len(a)} {kind} samples -> {out_dir}")
+    splits = split_order(len(a), test_size, shuffle, seed)
+    reps = multiplier if kind == "repeated" else 1
+
+    os.makedirs(out_dir, exist_ok=True)
+    seen = np.zeros(256, dtype=bool)
+
+    # 1. Generation pass: character codes to <split>.bin.tmp, offsets to <split>.idx,
+    #    records to <split>.jsonl
+    for name, idx in splits.items():
+        tmp_path = os.path.join(out_dir, f'{name}.bin.tmp')
+        written = 0
+        with open(tmp_path, 'wb') as fb, open(os.path.join(out_dir, f'{name}.idx'), 'wb') as fi, \
+                open(os.path.join(out_dir, f'{name}.jsonl'), 'w', encoding='utf-8') as fj:
+            for start in range(0, len(idx), chunk_size):
+                ca, cb = a[idx[start:start + chunk_size]], b[idx[start:start + chunk_size]]
+                codes, valid = sample_grid(ca, cb, kind, reps, sep, stop_token)
+                flat = codes[valid]
+                flat.tofile(fb)
+                seen[np.unique(flat)] = True
+
+                lines = []
+                input_lens = []
+                for x, y, row in zip(ca.tolist(), cb.tolist(), grid_strings(codes, valid)):
+                    inp = "=".join([f"{x}+{y}"] * reps)
+                    out = row[len(inp) + len(sep):len(row) - len(stop_token)]
+                    lines.append(json.dumps({"input": inp, "output": out}) + '\n')
+                    input_lens.append(len(inp))
+                fj.write(''.join(lines))
+                append_index(fi, build_index(input_lens, valid.sum(axis=1), len(sep), written))
+                written += len(flat)
+
+    # 2. Vocabulary (character-level, sorted like prepare.py)
+    chars = [chr(c) for c in np.flatnonzero(seen)]
+    vocab_size = len(chars)
+    print(f"Unique characters: {vocab_size}")
+    print(f"Vocab: {''.join(chars)}")
+    stoi = {ch: i for i, ch in enumerate(chars)}
+    itos = {i: ch for i, ch in enumerate(chars)}
+    lut = np.zeros(256, dtype=np.uint16)
+    for ch, i in stoi.items():
+        lut[ord(ch)] = i
+
+    meta = {'vocab_size': vocab_size, 'itos': itos, 'stoi': stoi, **meta_fields(vocab_size, compact)}
+    with open(os.path.join(out_dir, 'meta.pkl'), 'wb') as f:
+        pickle.dump(meta, f)
+
+    # 3. Remap pass: character codes -> token ids
+    for name in splits:
+        tmp_path = os.path.join(out_dir, f'{name}.bin.tmp')
+        codes = np.memmap(tmp_path, dtype=np.uint8, mode='r')
+        with BinWriter(os.path.join(out_dir, f'{name}.bin'), itos, name, compact) as w:
+            for start in range(0, len(codes), chunk_size * 64):
+                w.write(lut[codes[start:start + chunk_size * 64]])
+            w.num_samples = len(splits[name])
+        print(f"{name.capitalize()} tokens: {len(codes)}")
+        del codes
+        os.remove(tmp_path)
+
+    print(f"Saved meta.pkl, train.bin, val.bin, train.idx, val.idx, train.jsonl and val.jsonl to {out_dir}")
@@ -0,0 +1,123 @@
+"""
+Incremental plotting: fingerprint the inputs, cache aggregates, redraw only stale figures.
+
+The plot scripts used to reload every result, re-run the same groupby
+aggregations and redraw every figure on each invocation. Here:
+
+  - Inputs are fingerprinted per (experiment, dataset, metric, split) slice of the
+    results store. The table is append-only, so (row count, max id) of a slice
+    changes exactly when new rows for it land, and costs one indexed query.
+  - Aggregated frames (per-iter mean/std curves, per-run peaks, ...) are pickled
+    under the cache dir keyed by that fingerprint and only recomputed when it
+    changes.
+  - Each figure's fingerprint combines its input fingerprints with a hash of
+    the plotting script, so editing the script also redraws. Figures whose
+    fingerprint matches the manifest (and whose file exists) are skipped; the
+    rest are drawn in parallel worker processes.
+
+Figure functions run in worker processes, so they must be module-level
+functions taking picklable arguments (the cached frames), and the calling
+script must keep its work under `if __name__ == "__main__":`.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+
+def slice_fingerprint(store, metric, split='val', experiment=None, dataset=None) -> str:
+    """'<count>:<max id>' of the results rows for one experiment/dataset/metric/split."""
+    sql = "SELECT COUNT(*), MAX(id) FROM results WHERE metric = ? AND split = ?"
+    params = [metric, split]
+    for column, value in (('experiment', experiment), ('dataset', dataset)):
+        if value is not None:
+            sql += f" AND {column} = ?"
+            params.append(value)
+    count, max_id = store.conn.execute(sql, params).fetchone()
+    return f"{count}:{max_id}"
+
+
+def combine(*parts) -> str:
+    """Short stable hash of several fingerprints / strings."""
+    return hashlib.sha1('|'.join(map(str, parts)).encode()).hexdigest()[:16]
+
+
+def file_fingerprint(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:16]
+
+
+class PlotCache:
+    """
+    Aggregate cache and figure manifest under `cache_dir`.
+
+    `salt` (typically file_fingerprint(__file__) of the plot script) is mixed
+    into every figure fingerprint so code changes invalidate the figures.
+    """
+
+    def __init__(self, cache_dir: str, salt: str = '', force: bool = False):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.salt = salt
+        self.force = force
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self.manifest = {}
+        if os.path.exists(self.manifest_path) and not force:
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def aggregate(self, key: str, fingerprint: str, compute):
+        """compute() once per fingerprint; the result is pickled as <key>.pkl."""
+        path = os.path.join(self.cache_dir, f'{key}.pkl')
+        if os.path.exists(path) and not self.force:
+            with open(path, 'rb') as f:
+                cached_fp, value = pickle.load(f)
+            if cached_fp == fingerprint:
+                return value
+        value = compute()
+        with open(path, 'wb') as f:
+            pickle.dump((fingerprint, value), f)
+        return value
+
+    def figure_fingerprint(self, *inputs) -> str:
+        return combine(self.salt, *inputs)
+
+    def _key(self, out_path: str) -> str:
+        return os.path.relpath(out_path, self.cache_dir).replace(os.sep, '/')
+
+    def stale(self, out_path: str, fingerprint: str) -> bool:
+        return self.force or self.manifest.get(self._key(out_path)) != fingerprint or not os.path.exists(out_path)
+
+    def render(self, figures, workers: int = 0):
+        """
+        Draw the stale figures. `figures` is a list of
+        (out_path, fingerprint, fn, args); fn(*args, out_path) draws and saves.
+
+        Stale figures run in a process pool of `workers` processes (0 = one per
+        CPU, capped at the number of stale figures); a single stale figure is
+        drawn inline. Returns the list of out_paths drawn.
+        """
+        todo = [f for f in figures if self.stale(f[0], f[1])]
+        for out_path, _, _, _ in figures:
+            if all(out_path != t[0] for t in todo):
+                print(f"Up to date {out_path}")
+        if not todo:
+            return []
+
+        workers = min(workers or os.cpu_count() or 1, len(todo))
+        if workers == 1:
+            for out_path, _, fn, args in todo:
+                fn(*args, out_path)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(fn, *args, out_path) for out_path, _, fn, args in todo]
+                for fut in futures:
+                    fut.result()
+
+        for out_path, fingerprint, _, _ in todo:
+            self.manifest[self._key(out_path)] = fingerprint
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        return [t[0] for t in todo]
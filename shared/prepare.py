@@ -0,0 +1,198 @@
+"""
+JSONL-to-bin data preparation shared by every experiment's prepare.py.
+
+framework/, validation/, addition_scratchpad/, masking_benchmark/ and
+masking_study/ each keep a prepare.py entry point (so the commands in their
+READMEs are unchanged) that calls main() here. The only difference between
+them is whether the train/val JSONL splits used by the evaluators are written
+(write_jsonl; framework/ does not write them).
+
+Outputs in out_dir:
+
+    train.bin / val.bin       token ids (uint16, or shared.token_bin's versioned
+                              format with --compact)
+    train.idx / val.idx       per-sample offsets index (see shared.sample_index)
+    meta.pkl                  {'vocab_size', 'itos', 'stoi'}
+    train.jsonl / val.jsonl   raw splits for evaluation (write_jsonl only)
+    manifest.json             input and output hashes (see shared.manifest)
+
+A run whose manifest matches the source file and options is skipped (--force
+re-prepares); --stream bounds memory (shared.streaming) and --cache prepares
+into the shared dataset cache (shared.dataset_cache).
+"""
+
+import argparse
+import json
+import os
+import pickle
+import random
+
+from shared.dataset_cache import detach, is_linked, prepare_cached
+from shared.encoding import CharTokenizer
+from shared.manifest import input_record, up_to_date, write_manifest
+from shared.sample_index import build_index, write_index
+from shared.streaming import stream_prepare
+from shared.token_bin import meta_fields, write_bin
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Prepare data for NanoGPT.")
+    parser.add_argument('--file', type=str, required=True, help='Path to input JSONL file')
+    parser.add_argument('--out_dir', type=str, help='Output directory for bin files (default: same as input file directory)')
+    parser.add_argument('--sep', type=str, default='=', help='Separator between input and output')
+    parser.add_argument('--stop_token', type=str, default='\n', help='Token indicating end of a sample (EOS)')
+    parser.add_argument('--test_size', type=float, default=0.1, help='Fraction of data to use for validation (0.0 for no split/memorization)')
+    parser.add_argument('--shuffle', action='store_true', help='Shuffle data before splitting')
+    parser.add_argument('--seed', type=int, default=1337, help='Shuffle seed (the same seed and inputs give the same split)')
+    parser.add_argument('--stream', action='store_true', help='Stream the JSONL in chunks with bounded memory (for very large datasets)')
+    parser.add_argument('--chunk_size', type=int, default=100_000, help='Samples per chunk in --stream mode')
+    parser.add_argument('--compact', action='store_true', help='Write .bin files in the versioned format (uint8 ids for vocabularies <= 256; read by the shared loaders, not nanoGPT train.py)')
+    parser.add_argument('--force', action='store_true', help='Re-prepare even when manifest.json shows the inputs are unchanged')
+    parser.add_argument('--cache', action='store_true', help='Prepare into the shared dataset cache (.dataset_cache/ at the repo root) and link the outputs from out_dir')
+    return parser
+
+
+def main(write_jsonl: bool = True, argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Determine output directory if not provided
+    if args.out_dir is None:
+        args.out_dir = os.path.dirname(args.file)
+        if args.out_dir == '':
+            args.out_dir = '.'
+
+    outputs = ['meta.pkl', 'train.bin', 'val.bin', 'train.idx', 'val.idx']
+    if write_jsonl:
+        outputs += ['train.jsonl', 'val.jsonl']
+
+    # Skip when out_dir was already prepared from the same file and options
+    # (and, with --cache, already links into the cache)
+    inputs = input_record(args.file, seed=args.seed, sep=args.sep, stop_token=args.stop_token,
+                          test_size=args.test_size, shuffle=args.shuffle, stream=args.stream,
+                          compact=args.compact)
+    if not args.force and up_to_date(args.out_dir, inputs) and (not args.cache or is_linked(args.out_dir, outputs)):
+        print(f"{args.out_dir} is up to date with {args.file} (manifest.json); use --force to re-prepare.")
+        return
+
+    if args.cache:
+        prepare_cached(args.out_dir, inputs, outputs, lambda out_dir: prepare(args, out_dir, write_jsonl))
+        return
+    detach(args.out_dir, outputs)
+    prepare(args, args.out_dir, write_jsonl)
+    write_manifest(args.out_dir, inputs, outputs)
+    print(f"Saved manifest.json to {args.out_dir}")
+
+
+def prepare(args, out_dir: str, write_jsonl: bool = True):
+    """Read args.file and write the outputs to out_dir."""
+    if args.stream:
+        stream_prepare(args.file, out_dir, sep=args.sep, stop_token=args.stop_token,
+                       test_size=args.test_size, shuffle=args.shuffle,
+                       chunk_size=args.chunk_size, write_jsonl=write_jsonl, compact=args.compact, seed=args.seed)
+        return
+
+    # 1. Read Input Data
+    print(f"Reading data from {args.file}...")
+    dataset = []
+    with open(args.file, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+                if 'input' not in obj or 'output' not in obj:
+                    print(f"Skipping invalid line (missing keys): {line.strip()}")
+                    continue
+                dataset.append(obj)
+            except json.JSONDecodeError:
+                print(f"Skipping invalid JSON: {line.strip()}")
+
+    print(f"Loaded {len(dataset)} samples.")
+
+    # 2. Format Data
+    samples_str = [f"{s['input']}{args.sep}{s['output']}{args.stop_token}" for s in dataset]
+    raw_data = "".join(samples_str)
+    print(f"Total characters in dataset: {len(raw_data)}")
+
+    # 3. Build Vocabulary (Character-level)
+    chars = sorted(list(set(raw_data)))
+    vocab_size = len(chars)
+    print(f"Unique characters: {vocab_size}")
+    print(f"Vocab: {''.join(chars)}")
+
+    stoi = {ch: i for i, ch in enumerate(chars)}
+    itos = {i: ch for i, ch in enumerate(chars)}
+
+    # 4. Shuffle Data
+    if args.shuffle:
+        combined = list(zip(dataset, samples_str))
+        random.Random(args.seed).shuffle(combined)
+        dataset, samples_str = zip(*combined)
+        dataset = list(dataset)
+        samples_str = list(samples_str)
+
+    # 5. Split Train/Val
+    if args.test_size > 0:
+        num_val = int(len(samples_str) * args.test_size)
+        if num_val == 0 and len(samples_str) > 1:
+            num_val = 1
+            print("Warning: Dataset is very small. Forcing 1 validation sample.")
+
+        if num_val == 0:
+            train_samples, val_samples = samples_str, []
+            train_dataset, val_dataset = dataset, []
+        else:
+            train_samples = samples_str[:-num_val]
+            val_samples   = samples_str[-num_val:]
+            train_dataset = dataset[:-num_val]
+            val_dataset   = dataset[-num_val:]
+
+        print(f"Split: {len(train_samples)} training samples, {len(val_samples)} validation samples.")
+    else:
+        train_samples = val_samples = samples_str
+        train_dataset = val_dataset = dataset
+        print(f"Split: Using full dataset ({len(train_samples)} samples) for both Train and Val (Memorization).")
+
+    train_data = "".join(train_samples)
+    val_data   = "".join(val_samples)
+
+    tok = CharTokenizer(stoi, itos)
+    train_ids = tok.encode_array(train_data)
+    val_ids   = tok.encode_array(val_data)
+
+    print(f"Train tokens: {len(train_ids)}")
+    print(f"Val tokens:   {len(val_ids)}")
+
+    # 6. Save Artifacts
+    os.makedirs(out_dir, exist_ok=True)
+
+    meta = {'vocab_size': vocab_size, 'itos': itos, 'stoi': stoi, **meta_fields(vocab_size, args.compact)}
+    meta_path = os.path.join(out_dir, 'meta.pkl')
+    with open(meta_path, 'wb') as f:
+        pickle.dump(meta, f)
+    print(f"Saved meta.pkl to {meta_path}")
+
+    write_bin(os.path.join(out_dir, 'train.bin'), train_ids, itos, 'train', len(train_samples), args.compact)
+    write_bin(os.path.join(out_dir, 'val.bin'),   val_ids,   itos, 'val',   len(val_samples),   args.compact)
+    print(f"Saved train.bin and val.bin to {out_dir}")
+
+    # Per-sample offsets index: [start, separator, end) for each sample in the bins
+    write_index(os.path.join(out_dir, 'train.idx'),
+                build_index([len(s['input']) for s in train_dataset], [len(s) for s in train_samples], len(args.sep)))
+    write_index(os.path.join(out_dir, 'val.idx'),
+                build_index([len(s['input']) for s in val_dataset], [len(s) for s in val_samples], len(args.sep)))
+    print(f"Saved train.idx and val.idx to {out_dir}")
+
+    if not write_jsonl:
+        return
+
+    # Save raw JSONL splits for evaluation
+    with open(os.path.join(out_dir, 'train.jsonl'), 'w', encoding='utf-8') as f:
+        for item in train_dataset:
+            f.write(json.dumps(item) + '\n')
+
+    with open(os.path.join(out_dir, 'val.jsonl'), 'w', encoding='utf-8') as f:
+        for item in val_dataset:
+            f.write(json.dumps(item) + '\n')
+
+    print(f"Saved train.jsonl and val.jsonl to {out_dir}")
@@ -0,0 +1,73 @@
+"""
+Pre-tokenized eval prompts cached next to a dataset's meta.pkl.
+
+Every AR evaluation used to re-read <split>.jsonl, re-tokenize each prompt and
+rebuild a tensor. build_prompt_cache() does that once per (dataset, split,
+separator, stop token) and writes data/<dataset>/<split>_prompts.npz:
+
+    prompts         (N, max prompt len)  input + sep, right-padded with the stop token id
+    prompt_lengths  (N,)
+    answers         (N, max answer len)  expected output, right-padded with the stop token id
+    answer_lengths  (N,)
+    key             what the cache was built from (see _cache_key)
+
+load_prompt_cache() returns the arrays, rebuilding the file first when it is
+missing or its key no longer matches (the split or meta.pkl was rewritten, or a
+different separator / stop token was asked for).
+"""
+
+import json
+import os
+
+import numpy as np
+
+from shared.encoding import CharTokenizer
+from shared.token_bin import token_dtype
+
+CACHE_VERSION = 1
+ARRAYS = ('prompts', 'prompt_lengths', 'answers', 'answer_lengths')
+
+
+def cache_path(data_dir: str, split: str) -> str:
+    return os.path.join(data_dir, f'{split}_prompts.npz')
+
+
+def _cache_key(data_dir: str, split: str, sep: str, stop_token: str) -> str:
+    stamp = {}
+    for name in (f'{split}.jsonl', 'meta.pkl'):
+        st = os.stat(os.path.join(data_dir, name))
+        stamp[name] = [st.st_size, st.st_mtime_ns]
+    return json.dumps({'version': CACHE_VERSION, 'sep': sep, 'stop_token': stop_token, 'files': stamp},
+                      sort_keys=True)
+
+
+def build_prompt_cache(data_dir: str, split: str = 'val', sep: str = '=', stop_token: str = '\n') -> dict:
+    """Tokenize <split>.jsonl and write <split>_prompts.npz; returns the arrays."""
+    tok = CharTokenizer.from_meta(data_dir)
+    stop_id = tok.stoi[stop_token]
+    inputs, outputs = [], []
+    with open(os.path.join(data_dir, f'{split}.jsonl'), 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                sample = json.loads(line)
+                inputs.append(sample['input'] + sep)
+                outputs.append(sample['output'])
+
+    dtype = token_dtype(tok.vocab_size)
+    prompts, prompt_lengths = tok.encode_batch(inputs, pad_id=stop_id, dtype=dtype)
+    answers, answer_lengths = tok.encode_batch(outputs, pad_id=stop_id, dtype=dtype)
+    arrays = {'prompts': prompts, 'prompt_lengths': prompt_lengths,
+              'answers': answers, 'answer_lengths': answer_lengths}
+    np.savez(cache_path(data_dir, split), key=np.array(_cache_key(data_dir, split, sep, stop_token)), **arrays)
+    return arrays
+
+
+def load_prompt_cache(data_dir: str, split: str = 'val', sep: str = '=', stop_token: str = '\n') -> dict:
+    """The cached prompt/answer arrays of one split, (re)building the cache if it is stale."""
+    path = cache_path(data_dir, split)
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            if str(cached['key']) == _cache_key(data_dir, split, sep, stop_token):
+                return {name: cached[name] for name in ARRAYS}
+    print(f"Building prompt cache {path}")
+    return build_prompt_cache(data_dir, split, sep, stop_token)
@@ -0,0 +1,159 @@
+"""
+Append-only results store (SQLite) for evaluation and training metrics.
+
+Accuracy used to reach the plots by tee-ing evaluator stdout into eval_log.txt,
+scraping "Exact-match: ..." lines into accuracy_*.csv, and exporting loss curves
+from W&B. Evaluators now append rows here directly, and the plot scripts query
+the table.
+
+One row per measurement:
+
+    experiment   'masking_benchmark', 'masking_study', ...
+    run          run name, e.g. 'cond_E_s1'
+    cond         condition letter parsed from the run name ('E')
+    seed         replicate number parsed from the run name (1 for _s1)
+    iter         training iteration of the checkpoint
+    split        'train' or 'val'
+    metric       'ar_accuracy' (exact-match %, n = samples scored), 'loss', ...
+    value, n, dataset, source, recorded_at
+
+Rows are never updated in place. Re-evaluating a checkpoint appends a new row,
+and the `latest` view keeps only the newest row per (experiment, dataset, run,
+iter, split, metric); query() reads from that view.
+
+The .db files are not tracked: the accuracy CSVs under results/ are the source
+of truth, and build_results_db.py rebuilds a store from them. The plot scripts
+open the store read_only and query with required=True, so a checkout without
+the store fails with that instruction instead of drawing empty figures.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id          INTEGER PRIMARY KEY,
+    experiment  TEXT NOT NULL,
+    run         TEXT NOT NULL,
+    cond        TEXT,
+    seed        INTEGER,
+    iter        INTEGER NOT NULL,
+    split       TEXT NOT NULL,
+    metric      TEXT NOT NULL,
+    value       REAL NOT NULL,
+    n           INTEGER,
+    dataset     TEXT,
+    source      TEXT,
+    recorded_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS results_key ON results (experiment, metric, split, cond, run, iter);
+DROP VIEW IF EXISTS latest;
+CREATE VIEW latest AS
+    SELECT * FROM results WHERE id IN (
+        SELECT MAX(id) FROM results GROUP BY experiment, dataset, run, iter, split, metric
+    );
+"""
+
+RUN_PATTERN = re.compile(r'cond_([A-Za-z]+)_s(\d+)')
+COLUMNS = ('experiment', 'run', 'cond', 'seed', 'iter', 'split', 'metric', 'value', 'n', 'dataset', 'source')
+
+
+def parse_run(run: str):
+    """('E', 1) for 'cond_E_s1'; (None, None) when the name has no condition/seed."""
+    m = RUN_PATTERN.search(run)
+    return (m.group(1), int(m.group(2))) if m else (None, None)
+
+
+class ResultsStore:
+    def __init__(self, path: str, read_only: bool = False):
+        """Open (or create) the store at path; read_only opens an existing store without creating or changing it."""
+        self.path = path
+        if read_only:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"{path} does not exist; run build_results_db.py first "
+                                        f"to import the tracked results CSVs")
+            self.conn = sqlite3.connect(f'file:{os.path.abspath(path)}?mode=ro', uri=True)
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def append(self, experiment, run, iter, split, metric, value, n=None, dataset=None, source=None):
+        self.append_many([(experiment, run, iter, split, metric, value, n, dataset, source)])
+
+    def append_many(self, rows):
+        """Append (experiment, run, iter, split, metric, value, n, dataset, source) tuples."""
+        records = []
+        for experiment, run, it, split, metric, value, n, dataset, source in rows:
+            cond, seed = parse_run(run)
+            records.append((experiment, run, cond, seed, int(it), split, metric, float(value), n, dataset, source))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", records)
+
+    def query(self, metric, split='val', experiment=None, dataset=None, conds=None, required=False):
+        """
+        Latest rows for one metric as a pandas DataFrame with columns
+        run, cond, seed, iter, value, n, dataset (sorted by run, iter).
+        With required=True an empty result raises ValueError.
+        """
+        import pandas as pd
+
+        sql = "SELECT run, cond, seed, iter, value, n, dataset FROM latest WHERE metric = ? AND split = ?"
+        params = [metric, split]
+        for column, value in (('experiment', experiment), ('dataset', dataset)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if conds:
+            sql += f" AND cond IN ({', '.join('?' * len(conds))})"
+            params += list(conds)
+        df = pd.read_sql_query(sql + " ORDER BY run, iter", self.conn, params=params)
+        if required and df.empty:
+            raise ValueError(f"{self.path} has no {split}/{metric} rows for experiment={experiment}, "
+                             f"dataset={dataset}; run build_results_db.py first to import the tracked results CSVs")
+        return df
+
+    def sources(self) -> set:
+        """Distinct source values already in the store (used to skip repeated imports)."""
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT source FROM results")}
+
+    def close(self):
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Importers for results produced before the store existed
+# ---------------------------------------------------------------------------
+
+def import_accuracy_csv(store: ResultsStore, path: str, experiment: str, dataset: str, split: str = 'val'):
+    """Import a cond,iter,accuracy[,n] CSV (scraped from eval logs or written by sweep()) as ar_accuracy rows."""
+    with open(path, newline='') as f:
+        rows = [(experiment, r['cond'], int(r['iter']), split, 'ar_accuracy', float(r['accuracy']),
+                 int(r['n']) if r.get('n') else None, dataset, os.path.basename(path)) for r in csv.DictReader(f)]
+    store.append_many(rows)
+    return len(rows)
+
+
+def import_wandb_csv(store: ResultsStore, path: str, experiment: str, dataset: str = None,
+                     step_scale: int = 500):
+    """
+    Import a W&B panel export ("Step", "<run> - <split>/<metric>", ...__MIN, ...__MAX).
+
+    Step counts logged evaluations, so iter = Step * step_scale (eval_interval).
+    """
+    rows = []
+    with open(path, newline='') as f:
+        for r in csv.DictReader(f):
+            it = int(r['Step']) * step_scale
+            for col, value in r.items():
+                if ' - ' not in col or col.endswith(('__MIN', '__MAX')) or value == '':
+                    continue
+                run, key = [s.strip() for s in col.split(' - ', 1)]
+                split, metric = key.split('/', 1)
+                rows.append((experiment, run, it, split, metric, float(value), None, dataset,
+                             os.path.basename(path)))
+    store.append_many(rows)
+    return len(rows)
@@ -0,0 +1,51 @@
+"""
+Per-sample offsets index for the flat train.bin / val.bin token streams.
+
+prepare.py writes each split as one stream of "{input}{sep}{output}{stop_token}"
+samples with no record of where a sample starts. The companion <split>.idx file
+stores one row per sample, as raw little-endian int64 triples:
+
+    start   offset of the sample's first input token
+    sep     offset of its separator token
+    end     one past its stop token (the next sample's start)
+
+so output tokens (including the stop token) occupy [sep + 1, end).
+"""
+
+import os
+
+import numpy as np
+
+INDEX_DTYPE = np.int64
+
+
+def build_index(input_lens, sample_lens, sep_len: int = 1, base: int = 0) -> np.ndarray:
+    """
+    Build the (N, 3) index for consecutive samples.
+
+    input_lens:  token length of each sample's input field
+    sample_lens: token length of each full sample (input + sep + output + stop)
+    sep_len:     token length of the separator (its last token is recorded)
+    base:        offset of the first sample in the stream
+    """
+    sample_lens = np.asarray(sample_lens, dtype=INDEX_DTYPE)
+    ends = base + np.cumsum(sample_lens)
+    starts = ends - sample_lens
+    seps = starts + np.asarray(input_lens, dtype=INDEX_DTYPE) + sep_len - 1
+    return np.stack([starts, seps, ends], axis=1)
+
+
+def write_index(path: str, index: np.ndarray) -> None:
+    np.ascontiguousarray(index, dtype=INDEX_DTYPE).tofile(path)
+
+
+def append_index(f, index: np.ndarray) -> None:
+    """Append rows to an open binary index file."""
+    np.ascontiguousarray(index, dtype=INDEX_DTYPE).tofile(f)
+
+
+def read_index(path: str) -> np.ndarray:
+    """Memory-map an index file as an (N, 3) array."""
+    if os.path.getsize(path) == 0:
+        return np.zeros((0, 3), dtype=INDEX_DTYPE)
+    return np.memmap(path, dtype=INDEX_DTYPE, mode='r').reshape(-1, 3)
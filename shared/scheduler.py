@@ -0,0 +1,143 @@
+"""
+Concurrent training scheduler for (config x target_mask x seed) grids.
+
+A grid file is JSON:
+
+    {
+      "train_script": "../../comp560-nanoGPT/train_benchmark.py",
+      "seeds": [1337, 1338, 1339],
+      "conditions": [
+        {"name": "M", "config": "config/phase2_1x.py", "target_mask": false},
+        {"name": "N", "config": "config/phase2_1x.py", "target_mask": true}
+      ]
+    }
+
+and expands to one run per (condition, seed), named cond_<name>_s<k> (k counts
+seeds from 1), trained with --out_dir=out/<run> and --wandb_run_name=<run> as in
+run_training.sh. A condition may add "overrides": {"key": value} for extra
+--key=value flags.
+
+run_grid() keeps up to `jobs` trainings running at once. Each job holds one
+slot on one device; `per_device` caps the concurrent jobs per device and
+`threads` caps the intra-op CPU threads of each job (OMP/MKL), so several small
+models can share a GPU or the CPU cores without oversubscribing them. A run is
+skipped when its out_dir already holds the final snapshot ckpt_<max_iters>.pt,
+and a failed run is retried up to `retries` more times.
+"""
+
+import json
+import os
+import queue
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_grid(path: str) -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def config_value(config_path: str, key: str, overrides: dict):
+    """Value of key as train.py would see it: grid override, else the config file."""
+    if key in overrides:
+        return overrides[key]
+    scope = {}
+    with open(config_path, 'r', encoding='utf-8') as f:
+        exec(f.read(), scope)
+    return scope[key]
+
+
+def expand_grid(grid: dict) -> list:
+    """One run dict per (condition, seed), in grid order."""
+    runs = []
+    for cond in grid['conditions']:
+        for k, seed in enumerate(grid['seeds'], start=1):
+            name = f"cond_{cond['name']}_s{k}"
+            overrides = dict(cond.get('overrides', {}))
+            overrides.update(target_mask=cond['target_mask'], seed=seed,
+                             out_dir=f'out/{name}', wandb_run_name=name)
+            max_iters = config_value(cond['config'], 'max_iters', overrides)
+            runs.append({
+                'name': name,
+                'config': cond['config'],
+                'overrides': overrides,
+                'final_ckpt': os.path.join(overrides['out_dir'], f'ckpt_{int(max_iters):05d}.pt'),
+            })
+    return runs
+
+
+def train_command(train_script: str, run: dict, device=None) -> list:
+    """The train.py command line for a run; --device is only added for an explicit device."""
+    args = [sys.executable, train_script, run['config']]
+    args += [f'--{k}={v}' for k, v in run['overrides'].items()]
+    if device is not None:
+        args.append(f'--device={device}')
+    return args
+
+
+def run_grid(grid: dict, jobs: int = 1, devices=None, per_device: int = 0, threads: int = 0,
+             retries: int = 1, log_dir: str = 'logs', dry_run: bool = False) -> list:
+    """
+    Train every run of the grid, at most `jobs` at a time.
+
+    devices:    devices to spread jobs over (None = the configs' own device)
+    per_device: max concurrent jobs per device (0 = no cap beyond `jobs`)
+    threads:    OMP/MKL threads per job (0 = leave the environment alone)
+    dry_run:    print the commands in grid order instead of running them
+
+    Returns the names of runs that still failed after all retries.
+    """
+    runs = expand_grid(grid)
+    todo = [r for r in runs if not os.path.exists(r['final_ckpt'])]
+    print(f"{len(runs)} runs in grid, {len(runs) - len(todo)} already complete, {len(todo)} to train")
+
+    if dry_run:
+        # Print in grid order from this thread; devices are shown round-robin
+        devices = devices or [None]
+        for i, run in enumerate(todo):
+            print(' '.join(train_command(grid['train_script'], run, devices[i % len(devices)])))
+        return []
+
+    # One token per concurrent slot: per_device slots on each device, capped at jobs
+    slots = queue.Queue()
+    devices = devices or [None]
+    per_device = per_device or jobs
+    for _ in range(per_device):
+        for device in devices:
+            slots.put(device)
+    jobs = min(jobs, per_device * len(devices))
+    if threads and jobs * threads > (os.cpu_count() or 1):
+        print(f"Warning: {jobs} jobs x {threads} threads exceeds {os.cpu_count()} CPU cores")
+
+    env = dict(os.environ)
+    env.setdefault('NANOGPT_CONFIG', os.path.join(os.path.dirname(grid['train_script']), 'configurator.py'))
+    if threads:
+        env['OMP_NUM_THREADS'] = env['MKL_NUM_THREADS'] = str(threads)
+    os.makedirs(log_dir, exist_ok=True)
+
+    def run_one(run):
+        device = slots.get()
+        try:
+            cmd = train_command(grid['train_script'], run, device)
+            for attempt in range(1 + retries):
+                start = time.time()
+                print(f"[start] {run['name']} on {device or 'config device'} (attempt {attempt + 1})", flush=True)
+                with open(os.path.join(log_dir, f"{run['name']}.log"), 'a') as log:
+                    code = subprocess.call(cmd, stdout=log, stderr=subprocess.STDOUT, env=env)
+                minutes = (time.time() - start) / 60
+                if code == 0:
+                    print(f"[done]  {run['name']} in {minutes:.1f} min", flush=True)
+                    return True
+                print(f"[fail]  {run['name']} (exit {code}) after {minutes:.1f} min", flush=True)
+            return False
+        finally:
+            slots.put(device)
+
+    with ThreadPoolExecutor(max(jobs, 1)) as pool:
+        ok = list(pool.map(run_one, todo))
+    failed = [r['name'] for r, good in zip(todo, ok) if not good]
+    if failed:
+        print(f"{len(failed)} runs failed: {', '.join(failed)}")
+    return failed
@@ -0,0 +1,210 @@
+"""
+Scratchpad addition format, scalar and batched.
+
+build_scratchpad() is the reference per-pair builder that the generators used to
+carry their own copies of. The batched builders compute digits, carries and sums
+for whole arrays of operands with NumPy and lay the characters out in a 2-D grid:
+
+    codes: (N, W) uint8 character codes
+    valid: (N, W) bool, which cells belong to the sample
+
+Each row reads left to right over its valid cells, so codes[valid] is the whole
+batch as one flat character stream, sample after sample. encode_samples() maps
+that stream through the vocabulary straight to token ids, with no per-sample
+Python strings in between.
+
+Scratchpad format: {"input": "15+27", "output": "[5+7=12,C1][1+2+1=4,C0]42"}
+Bracket structure: [dA+dB(+carry)=sum,Cnew_carry] processed right-to-left,
+with a final [carry] bracket on overflow.
+"""
+
+import numpy as np
+
+from shared.encoding import UNKNOWN, build_lut
+
+
+def build_scratchpad(a: int, b: int) -> str:
+    """
+    Build the full scratchpad output string for a + b.
+
+    Examples:
+        build_scratchpad(15, 27) -> "[5+7=12,C1][1+2+1=4,C0]42"
+        build_scratchpad(99, 99) -> "[9+9=18,C1][9+9+1=19,C1][1]198"
+        build_scratchpad(3, 4)   -> "[3+4=7,C0]7"
+        build_scratchpad(0, 0)   -> "[0+0=0,C0]0"
+    """
+    a_str = str(a)
+    b_str = str(b)
+    max_len = max(len(a_str), len(b_str), 1)
+
+    a_digits = [int(c) for c in reversed(a_str.zfill(max_len))]
+    b_digits = [int(c) for c in reversed(b_str.zfill(max_len))]
+
+    brackets = []
+    carry = 0
+
+    for i in range(max_len):
+        da, db = a_digits[i], b_digits[i]
+        s = da + db + carry
+        new_carry = s // 10
+        if carry > 0:
+            brackets.append(f"[{da}+{db}+{carry}={s},C{new_carry}]")
+        else:
+            brackets.append(f"[{da}+{db}={s},C{new_carry}]")
+        carry = new_carry
+
+    if carry > 0:
+        brackets.append(f"[{carry}]")
+
+    return "".join(brackets) + str(a + b)
+
+
+# ---------------------------------------------------------------------------
+# Batched builders
+# ---------------------------------------------------------------------------
+
+def num_digits(x: np.ndarray) -> np.ndarray:
+    """Decimal digit count of each non-negative integer (0 has one digit)."""
+    x = np.asarray(x, dtype=np.int64)
+    n = np.ones(x.shape, dtype=np.int64)
+    rest = x // 10
+    while rest.any():
+        n += rest > 0
+        rest //= 10
+    return n
+
+
+class _Grid:
+    """Accumulates column segments of a character grid for N rows."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.codes = []
+        self.valid = []
+
+    def lit(self, text: str, mask=None):
+        """Append a literal string to every row (or only rows where mask is True)."""
+        for ch in text:
+            self.codes.append(np.full((self.n, 1), ord(ch), dtype=np.uint8))
+            self.valid.append(np.ones((self.n, 1), dtype=bool) if mask is None else mask[:, None].copy())
+
+    def num(self, x: np.ndarray, mask=None):
+        """Append the decimal representation of x, right-aligned in a fixed-width block."""
+        x = np.asarray(x, dtype=np.int64)
+        nd = num_digits(x)
+        width = int(nd.max()) if self.n else 1
+        powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+        digits = (x[:, None] // powers[None, :]) % 10
+        valid = np.arange(width)[None, :] >= (width - nd)[:, None]
+        if mask is not None:
+            valid &= mask[:, None]
+        self.codes.append((digits + ord('0')).astype(np.uint8))
+        self.valid.append(valid)
+
+    def build(self):
+        return np.concatenate(self.codes, axis=1), np.concatenate(self.valid, axis=1)
+
+
+def _scratchpad_into(grid: _Grid, a: np.ndarray, b: np.ndarray):
+    """Append the scratchpad output for a + b to grid."""
+    n_brackets = np.maximum(num_digits(a), num_digits(b))
+    carry = np.zeros(len(a), dtype=np.int64)
+    final_carry = np.zeros(len(a), dtype=np.int64)
+    for j in range(int(n_brackets.max()) if len(a) else 0):
+        active = j < n_brackets
+        da = (a // 10 ** j) % 10
+        db = (b // 10 ** j) % 10
+        s = da + db + carry
+        new_carry = s // 10
+
+        grid.lit("[", active)
+        grid.num(da, active)
+        grid.lit("+", active)
+        grid.num(db, active)
+        has_carry = active & (carry > 0)
+        grid.lit("+", has_carry)
+        grid.num(carry, has_carry)
+        grid.lit("=", active)
+        grid.num(s, active)
+        grid.lit(",C", active)
+        grid.num(new_carry, active)
+        grid.lit("]", active)
+
+        final_carry = np.where(j == n_brackets - 1, new_carry, final_carry)
+        carry = new_carry
+
+    overflow = final_carry > 0
+    grid.lit("[", overflow)
+    grid.num(final_carry, overflow)
+    grid.lit("]", overflow)
+    grid.num(a + b)
+
+
+def sample_grid(a, b, kind: str = "scratchpad", multiplier: int = 1,
+                sep: str = "=", stop_token: str = "\n", output_only: bool = False):
+    """
+    Character grid for a batch of addition samples.
+
+    Rows are "{input}{sep}{output}{stop_token}" as prepare.py formats them, or just
+    the output field when output_only=True.
+
+    kind="plain":      input "a+b", output "sum"
+    kind="scratchpad": input "a+b", output build_scratchpad(a, b)
+    kind="repeated":   input "a+b" repeated `multiplier` times joined by "=",
+                       output build_scratchpad(a, b)
+    """
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    if kind not in ("plain", "scratchpad", "repeated"):
+        raise ValueError(f"unknown record kind: {kind}")
+    grid = _Grid(len(a))
+
+    if not output_only:
+        for k in range(multiplier if kind == "repeated" else 1):
+            if k:
+                grid.lit("=")
+            grid.num(a)
+            grid.lit("+")
+            grid.num(b)
+        grid.lit(sep)
+
+    if kind == "plain":
+        grid.num(a + b)
+    else:
+        _scratchpad_into(grid, a, b)
+
+    if not output_only:
+        grid.lit(stop_token)
+    return grid.build()
+
+
+def grid_strings(codes: np.ndarray, valid: np.ndarray) -> list:
+    """Render each row of a character grid as a Python string."""
+    lengths = valid.sum(axis=1)
+    flat = codes[valid].tobytes().decode("ascii")
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    return [flat[s:e] for s, e in zip(starts.tolist(), ends.tolist())]
+
+
+def scratchpad_strings(a, b) -> list:
+    """Batched build_scratchpad(): scratchpad output strings for arrays a, b."""
+    return grid_strings(*sample_grid(a, b, output_only=True))
+
+
+def encode_samples(a, b, stoi: dict, kind: str = "scratchpad", multiplier: int = 1,
+                   sep: str = "=", stop_token: str = "\n", dtype=np.uint16):
+    """
+    Encode a batch of samples straight to token ids.
+
+    Returns (ids, lengths): the flat token stream for all samples in order, ready to
+    append to a .bin file, and the token count of each sample.
+    """
+    codes, valid = sample_grid(a, b, kind, multiplier, sep, stop_token)
+    lut = build_lut(stoi)
+    flat = codes[valid]
+    ids = lut[np.minimum(flat, len(lut) - 1)]
+    bad = (flat >= len(lut)) | (ids == UNKNOWN)
+    if bad.any():
+        raise KeyError(chr(int(flat[np.argmax(bad)])))
+    return ids.astype(dtype), valid.sum(axis=1)
@@ -0,0 +1,146 @@
+"""
+Streaming JSONL -> train.bin / val.bin preparation with bounded memory.
+
+The regular prepare.py holds the whole dataset as a list, one joined string and a
+Python list of token ids at the same time. stream_prepare() instead reads the
+JSONL twice:
+
+  1. Vocabulary pass: collect the character set and count valid samples.
+  2. Encoding pass:   format chunk_size samples at a time, encode each chunk
+                      through a NumPy lookup table and append it to the .bin files,
+                      their .idx offsets indexes (and the train/val JSONL splits).
+
+Only one chunk is resident at a time, so memory no longer grows with the dataset.
+With compact=True the .bin files use the versioned format of shared.token_bin.
+The split rule matches prepare.py (last test_size fraction is validation, at
+least one sample when possible, test_size=0 puts everything in both splits).
+With shuffle=True the validation samples are drawn at random, but both splits
+keep file order; a full shuffle would need the whole dataset in memory.
+"""
+
+import json
+import os
+import pickle
+
+import numpy as np
+
+from shared.encoding import build_lut, encode_text
+from shared.sample_index import append_index, build_index
+from shared.token_bin import BinWriter, meta_fields
+
+
+def iter_samples(path, verbose=False):
+    """Yield valid {'input', 'output'} records from a JSONL file, skipping bad lines."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError:
+                if verbose:
+                    print(f"Skipping invalid JSON: {line.strip()}")
+                continue
+            if 'input' not in obj or 'output' not in obj:
+                if verbose:
+                    print(f"Skipping invalid line (missing keys): {line.strip()}")
+                continue
+            yield obj
+
+
+def val_mask(n, test_size, shuffle, seed=None):
+    """Boolean array marking which of n samples go to the validation split."""
+    mask = np.zeros(n, dtype=bool)
+    num_val = int(n * test_size)
+    if num_val == 0 and n > 1:
+        num_val = 1
+        print("Warning: Dataset is very small. Forcing 1 validation sample.")
+    if num_val == 0:
+        return mask
+    if shuffle:
+        mask[np.random.default_rng(seed).choice(n, num_val, replace=False)] = True
+    else:
+        mask[n - num_val:] = True
+    return mask
+
+
+def stream_prepare(path, out_dir, sep='=', stop_token='\n', test_size=0.1, shuffle=False,
+                   chunk_size=100_000, write_jsonl=True, seed=None, compact=False):
+    """
+    Prepare train.bin, val.bin, their .idx offsets indexes and meta.pkl (plus train.jsonl/val.jsonl if write_jsonl)
+    from the JSONL file at path, streaming it in chunks of chunk_size samples.
+    """
+    # 1. Vocabulary pass
+    print(f"Scanning {path} for vocabulary...")
+    chars = set()
+    n = 0
+    for s in iter_samples(path, verbose=True):
+        chars.update(f"{s['input']}{sep}{s['output']}{stop_token}")
+        n += 1
+    print(f"Loaded {n} samples.")
+
+    chars = sorted(chars)
+    vocab_size = len(chars)
+    print(f"Unique characters: {vocab_size}")
+    print(f"Vocab: {''.join(chars)}")
+    stoi = {ch: i for i, ch in enumerate(chars)}
+    itos = {i: ch for i, ch in enumerate(chars)}
+    lut = build_lut(stoi)
+
+    # 2. Split assignment
+    memorize = test_size <= 0
+    if memorize:
+        is_val = np.zeros(n, dtype=bool)
+        print(f"Split: Using full dataset ({n} samples) for both Train and Val (Memorization).")
+    else:
+        is_val = val_mask(n, test_size, shuffle, seed)
+        print(f"Split: {n - int(is_val.sum())} training samples, {int(is_val.sum())} validation samples.")
+
+    # 3. Encoding pass
+    os.makedirs(out_dir, exist_ok=True)
+    meta = {'vocab_size': vocab_size, 'itos': itos, 'stoi': stoi, **meta_fields(vocab_size, compact)}
+    with open(os.path.join(out_dir, 'meta.pkl'), 'wb') as f:
+        pickle.dump(meta, f)
+
+    names = ['train', 'val']
+    bins = {k: BinWriter(os.path.join(out_dir, f'{k}.bin'), itos, k, compact) for k in names}
+    idxs = {k: open(os.path.join(out_dir, f'{k}.idx'), 'wb') for k in names}
+    jsonls = {k: open(os.path.join(out_dir, f'{k}.jsonl'), 'w', encoding='utf-8') for k in names} if write_jsonl else {}
+    tokens = {k: 0 for k in names}
+    try:
+        chunk = {k: [] for k in names}
+        records = {k: [] for k in names}
+        input_lens = {k: [] for k in names}
+
+        def flush():
+            for k in names:
+                if chunk[k]:
+                    ids = encode_text(''.join(chunk[k]), lut, bins[k].dtype)
+                    bins[k].write(ids, len(chunk[k]))
+                    append_index(idxs[k], build_index(input_lens[k], [len(t) for t in chunk[k]], len(sep), tokens[k]))
+                    tokens[k] += len(ids)
+                if write_jsonl and records[k]:
+                    jsonls[k].write(''.join(json.dumps(item) + '\n' for item in records[k]))
+                chunk[k].clear()
+                records[k].clear()
+                input_lens[k].clear()
+
+        for i, s in enumerate(iter_samples(path)):
+            text = f"{s['input']}{sep}{s['output']}{stop_token}"
+            splits = names if memorize else [names[int(is_val[i])]]
+            for k in splits:
+                chunk[k].append(text)
+                records[k].append(s)
+                input_lens[k].append(len(s['input']))
+            if (i + 1) % chunk_size == 0:
+                flush()
+        flush()
+    finally:
+        for f in list(bins.values()) + list(idxs.values()) + list(jsonls.values()):
+            f.close()
+
+    print(f"Train tokens: {tokens['train']}")
+    print(f"Val tokens:   {tokens['val']}")
+    print(f"Saved meta.pkl, train.bin, val.bin, train.idx and val.idx to {out_dir}")
+    if write_jsonl:
+        print(f"Saved train.jsonl and val.jsonl to {out_dir}")
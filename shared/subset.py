@@ -0,0 +1,69 @@
+"""
+Stratified, reproducible eval subsets.
+
+Capping an eval at N samples used to take the first N rows of <split>.jsonl,
+whose order depends on the shuffle that produced the split. A subset here is
+drawn under a fixed seed, with each stratum of (operand length, carry count,
+answer length) represented in proportion to its share of the split (largest
+remainder rounding), so small eval budgets see the same mix of easy and hard
+sums for every condition.
+
+The chosen row indices are cached next to the split as
+<split>_subset_<N>_s<seed>.npz and rebuilt when the split file changes.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from shared.analytics import carry_stats
+from shared.scratchpad import num_digits
+
+
+def strata(a, b) -> np.ndarray:
+    """Stratum id of every sample: distinct (operand length, carries, answer length) triples."""
+    a = np.asarray(a, dtype=np.int64)
+    b = np.asarray(b, dtype=np.int64)
+    carries, _ = carry_stats(a, b)
+    keys = np.stack([np.maximum(num_digits(a), num_digits(b)), carries, num_digits(a + b)], axis=1)
+    return np.unique(keys, axis=0, return_inverse=True)[1].reshape(-1)
+
+
+def stratified_subset(a, b, size: int, seed: int = 1337) -> np.ndarray:
+    """Sorted indices of `size` samples, allocated to strata in proportion to their counts."""
+    groups = strata(a, b)
+    n = len(groups)
+    if size >= n:
+        return np.arange(n)
+    counts = np.bincount(groups)
+    share = size * counts / n
+    quota = np.floor(share).astype(np.int64)
+    leftover = size - int(quota.sum())
+    quota[np.argsort(-(share - quota), kind='stable')[:leftover]] += 1
+
+    rng = np.random.default_rng(seed)
+    picked = [rng.choice(np.flatnonzero(groups == g), size=q, replace=False)
+              for g, q in enumerate(quota) if q]
+    return np.sort(np.concatenate(picked))
+
+
+def _split_key(path: str) -> str:
+    st = os.stat(path)
+    return json.dumps([st.st_size, st.st_mtime_ns])
+
+
+def load_subset(data_dir: str, split: str, size: int, seed: int, operands) -> np.ndarray:
+    """
+    Cached stratified_subset() of <split>.jsonl. operands() is called to get the
+    (a, b) arrays of the whole split only when the cache has to be (re)built.
+    """
+    path = os.path.join(data_dir, f'{split}_subset_{size}_s{seed}.npz')
+    key = _split_key(os.path.join(data_dir, f'{split}.jsonl'))
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            if str(cached['key']) == key:
+                return cached['indices']
+    indices = stratified_subset(*operands(), size, seed)
+    np.savez(path, key=np.array(key), indices=indices)
+    return indices
@@ -0,0 +1,299 @@
+"""
+Checkpoint-sweep AR evaluation in one process.
+
+The COMMANDS.md loops start a fresh eval_generation.py process per (condition,
+iteration), re-importing torch and reloading meta.pkl and <split>.jsonl every
+time. The helpers here load the tokenizer and eval set once (the prompts come
+pre-tokenized from data/<dataset>/<split>_prompts.npz, see
+shared/prompt_cache.py), keep one resident GPT, and stream each ckpt_*.pt into it with load_state_dict(), reading the next
+checkpoint from disk while the current one is being evaluated.
+
+Scoring follows eval_generation.py: prompt with input + separator, decode greedily
+until the stop token, and count an exact match when the text before the stop
+token equals the ground-truth output. Prompts are decoded in right-padded
+batches with the KV cache (shared.generation.generate_batch), and by default a
+row stops as soon as it diverges from the expected output, which cannot change
+its exact-match verdict. Each result is
+written to the accuracy CSV and, when a ResultsStore is given, appended to it as
+an ar_accuracy row.
+"""
+
+import csv
+import glob
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import torch
+
+from shared.analytics import addition_tables, format_tables, parse_operands, write_tables
+from shared.encoding import CharTokenizer
+from shared.generation import generate_batch
+from shared.prompt_cache import load_prompt_cache
+from shared.sequential import planned_looks, wilson_interval, z_value
+from shared.subset import load_subset
+from shared.teacher_forcing import exact_and_positions, score_batch
+
+CKPT_PATTERN = re.compile(r'ckpt_(\d+)\.pt$')
+
+
+class EvalSet:
+    """Encoded prompts and targets of one <split>.jsonl, loaded once per sweep."""
+
+    def __init__(self, data_dir: str, split: str = 'val', max_samples: int = 0,
+                 sep: str = '=', stop_token: str = '\n', early_exit: bool = True, seed: int = 1337,
+                 subset: str = 'stratified'):
+        """
+        max_samples caps the set; subset picks which rows: 'stratified' (a seeded
+        subset balanced over operand length, carries and answer length, cached next
+        to the split, see shared/subset.py) or 'first' (the first max_samples rows).
+        """
+        self.tok = CharTokenizer.from_meta(data_dir)
+        self.stoi, self.itos = self.tok.stoi, self.tok.itos
+        self.stop_id = self.stoi[stop_token]
+        self.stop_token = stop_token
+        self.path = os.path.join(data_dir, f'{split}.jsonl')
+        self.split = split
+        self.dataset = os.path.basename(os.path.normpath(data_dir))
+        self.early_exit = early_exit
+        self.seed = seed  # stratified subset and sample order of sequential evaluation
+        self.interval = None
+        self._on_device = {}
+
+        cache = load_prompt_cache(data_dir, split, sep, stop_token)
+        rows = np.arange(len(cache['prompts']))
+        picked = ''
+        if max_samples and max_samples < len(rows):
+            rows, picked = rows[:max_samples], ', first rows'
+            if subset == 'stratified':
+                try:
+                    rows = load_subset(data_dir, split, max_samples, seed,
+                                       lambda: parse_operands(self.tok.decode_batch(cache['prompts'], cache['prompt_lengths'])))
+                    picked = ', stratified subset'
+                except (ValueError, IndexError):
+                    print(f"Warning: prompts in {self.path} are not a+b sums; using the first {max_samples} rows")
+        n = len(rows)
+        cache = {name: array[rows] for name, array in cache.items()}
+        self.prompts = torch.from_numpy(cache['prompts'].astype('int64'))
+        self.prompt_lengths = torch.from_numpy(cache['prompt_lengths'])
+        self.answer_lengths = torch.from_numpy(cache['answer_lengths'])
+        self.answers = [row[:k] for row, k in zip(cache['answers'].tolist(), cache['answer_lengths'].tolist())]
+        self.max_new_tokens = int(cache['answer_lengths'].max()) + len(stop_token)
+        # expected continuation: answer, stop token, stop-token padding
+        answers = torch.from_numpy(cache['answers'].astype('int64'))
+        self.expected = torch.cat([answers, answers.new_full((n, 1), self.stop_id)], dim=1)
+        print(f"Tokenizer ready  (vocab_size={self.tok.vocab_size})")
+        print(f"Eval set ready   ({n} samples from {self.path}{picked})")
+
+    def decode(self, ids):
+        return self.tok.decode(ids)
+
+    def _tensors(self, model):
+        """prompts, prompt_lengths, expected, answer_lengths on the model's device (kept across checkpoints)."""
+        device = next(model.parameters()).device
+        if device not in self._on_device:
+            self._on_device = {device: tuple(t.to(device) for t in (
+                self.prompts, self.prompt_lengths, self.expected, self.answer_lengths))}
+        return self._on_device[device]
+
+    def operands(self):
+        """(a, b) int arrays parsed from the prompts, for shared.analytics."""
+        return parse_operands(self.tok.decode_batch(self.prompts.numpy(), self.prompt_lengths.numpy()))
+
+    @torch.no_grad()
+    def exact_match(self, model, batch_size: int = 1000, details: bool = False,
+                    ci_width: float = 0.0, ci_step: int = 200, confidence: float = 0.95):
+        """
+        Greedy AR exact-match over the whole set -> (accuracy_pct, correct, total).
+
+        With details=True, also returns (texts, hits): each row's output before the
+        stop token and whether it matched. Rows are then decoded in full even when
+        early_exit is set, so the texts are complete.
+
+        With ci_width > 0 the evaluation is sequential (shared/sequential.py):
+        samples are scored in a fixed shuffled order, ci_step at a time, until the
+        Wilson interval at `confidence` (corrected for the number of looks) is at
+        most ci_width wide (a fraction, e.g. 0.064 for +-3.2%) or the set runs
+        out. total is then the number of samples scored, and self.interval holds
+        the final (lo, hi) in percent.
+        """
+        if details and ci_width:
+            raise ValueError("details are only available for full-set evaluation (ci_width=0)")
+        prompts, lengths, expected, _ = self._tensors(model)
+        early_exit = self.early_exit and not details
+        n = len(prompts)
+        order = torch.from_numpy(np.random.default_rng(self.seed).permutation(n)) if ci_width else torch.arange(n)
+        look = ci_step if ci_width else n
+        z = z_value(confidence, planned_looks(n, look))
+        correct, total = 0, 0
+        texts, hits = [], []
+        for look_start in range(0, n, look):
+            look_end = min(look_start + look, n)
+            for start in range(look_start, look_end, batch_size):
+                idx = order[start:min(start + batch_size, look_end)]
+                rows = idx.to(prompts.device)
+                chunk, chunk_lengths = prompts[rows], lengths[rows]
+                budget = min(self.max_new_tokens, model.config.block_size - int(chunk_lengths.max()))
+                outs = generate_batch(model, chunk, budget, self.stop_id, temperature=0, kv_cache=True,
+                                      lengths=chunk_lengths, expected=expected[rows] if early_exit else None)
+                for out, i in zip(outs, idx.tolist()):
+                    end = out.index(self.stop_id) if self.stop_id in out else len(out)
+                    hit = out[:end] == self.answers[i]
+                    correct += hit
+                    if details:
+                        texts.append(self.decode(out[:end]))
+                        hits.append(hit)
+                total += len(idx)
+            lo, hi = wilson_interval(correct, total, z)
+            if ci_width and hi - lo <= ci_width:
+                break
+        self.interval = (100.0 * lo, 100.0 * hi)
+        if details:
+            return 100.0 * correct / total, correct, total, (texts, hits)
+        return 100.0 * correct / total, correct, total
+
+    @torch.no_grad()
+    def teacher_forced(self, model, batch_size: int = 1000):
+        """
+        Teacher-forced exact-match (shared/teacher_forcing.py) over the whole set
+        -> (accuracy_pct, correct, total, position_accuracy), where
+        position_accuracy[k] is the argmax hit rate (%) at answer offset k
+        (the last offset of the longest answers is the stop token).
+        """
+        prompts, lengths, expected, answer_lengths = self._tensors(model)
+        correct, hits, counts = 0, 0, 0
+        for start in range(0, len(prompts), batch_size):
+            part = slice(start, start + batch_size)
+            hit, valid = score_batch(model, prompts[part], lengths[part], expected[part], answer_lengths[part])
+            exact, h, c = exact_and_positions(hit, valid)
+            correct += int(exact.sum())
+            hits, counts = hits + h, counts + c
+        total = len(prompts)
+        position_accuracy = (100.0 * hits / counts.clamp(min=1)).tolist()
+        return 100.0 * correct / total, correct, total, position_accuracy
+
+
+def find_checkpoints(out_dir: str):
+    """[(iter_str, path)] for every ckpt_<iter>.pt in out_dir, in iteration order."""
+    found = []
+    for path in glob.glob(os.path.join(out_dir, 'ckpt_*.pt')):
+        m = CKPT_PATTERN.search(path)
+        if m:
+            found.append((m.group(1), path))
+    return sorted(found, key=lambda t: int(t[0]))
+
+
+def load_checkpoint(path):
+    """torch.load a nanoGPT checkpoint onto the CPU, stripping torch.compile's '_orig_mod.' prefix."""
+    checkpoint = torch.load(path, map_location='cpu')
+    state_dict = checkpoint['model']
+    unwanted_prefix = '_orig_mod.'
+    for k in list(state_dict):
+        if k.startswith(unwanted_prefix):
+            state_dict[k[len(unwanted_prefix):]] = state_dict.pop(k)
+    return checkpoint
+
+
+def csv_columns(csv_path: str) -> list:
+    """Header of an existing CSV ([] when it does not exist or is empty)."""
+    if not os.path.exists(csv_path):
+        return []
+    with open(csv_path, newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def read_done(csv_path: str) -> set:
+    """(cond, iter) pairs already present in an accuracy CSV."""
+    if not os.path.exists(csv_path):
+        return set()
+    with open(csv_path, newline='') as f:
+        return {(row['cond'], row['iter']) for row in csv.DictReader(f)}
+
+
+def sweep(jobs, eval_set: EvalSet, csv_path: str, device: str = 'cuda', batch_size: int = 1000,
+          resume: bool = True, store=None, experiment: str = None, teacher_forced: bool = False,
+          analytics_dir: str = None, ci_width: float = 0.0, ci_step: int = 200):
+    """
+    Evaluate every (cond, iter_str, ckpt_path) job and append cond,iter,accuracy,n rows to
+    csv_path, n being the number of samples scored (and to store, a
+    shared.results_store.ResultsStore, under experiment). Resuming a CSV written
+    before the n column existed keeps its three columns.
+
+    With teacher_forced=True the accuracy is teacher-forced exact-match (one forward
+    pass per batch, stored as tf_accuracy) instead of greedy AR exact-match.
+
+    With analytics_dir, every AR evaluation also appends the shared.analytics
+    breakdowns (by operand length, carries, carry chain, answer length and digit
+    position) to <analytics_dir>/<table>.csv, tagged with cond and iter.
+
+    With ci_width > 0, AR evaluation is sequential (EvalSet.exact_match): each
+    checkpoint scores only as many samples as it takes for the 95% Wilson interval
+    to narrow to ci_width, and the CSV and store rows record that sample count as n.
+
+    With resume=True, rows already in csv_path are skipped, so an interrupted sweep
+    picks up where it stopped.
+    """
+    from model import GPT, GPTConfig  # comp560-nanoGPT, put on sys.path by the caller
+
+    if analytics_dir and teacher_forced:
+        raise ValueError("analytics need AR outputs; they are not available with teacher_forced")
+    if analytics_dir and ci_width:
+        raise ValueError("analytics need every sample scored; use them without ci_width")
+    if teacher_forced and ci_width:
+        raise ValueError("ci_width applies to AR evaluation; it is not available with teacher_forced")
+    operands = eval_set.operands() if analytics_dir else None
+
+    done = read_done(csv_path) if resume else set()
+    jobs = [j for j in jobs if (j[0], j[1]) not in done]
+    if done:
+        print(f"Skipping {len(done)} snapshots already in {csv_path}")
+    if not jobs:
+        return
+
+    os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+    new_file = not os.path.exists(csv_path) or not resume
+    with_n = new_file or 'n' in csv_columns(csv_path)
+    if ci_width and not with_n:
+        raise ValueError(f"{csv_path} has no n column to tell sequential estimates from full-set ones; "
+                         "write the sequential sweep to a new CSV")
+    model, model_args = None, None
+    with open(csv_path, 'w' if new_file else 'a', newline='') as f, ThreadPoolExecutor(1) as pool:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(['cond', 'iter', 'accuracy', 'n'])
+        pending = pool.submit(load_checkpoint, jobs[0][2])
+        for i, (cond, it, path) in enumerate(jobs):
+            checkpoint = pending.result()
+            if i + 1 < len(jobs):
+                pending = pool.submit(load_checkpoint, jobs[i + 1][2])
+
+            print(f"=== {cond} @ iter {it} ===")
+            if checkpoint['model_args'] != model_args:
+                model_args = checkpoint['model_args']
+                model = GPT(GPTConfig(**model_args)).to(device)
+                model.eval()
+            model.load_state_dict(checkpoint['model'])
+            del checkpoint
+
+            if teacher_forced:
+                acc, correct, total, positions = eval_set.teacher_forced(model, batch_size)
+                print(f"  TF exact-match: {acc:.1f}%  ({correct}/{total} correct)")
+                print(f"  Per-position:   {' '.join(f'{p:.0f}' for p in positions)}")
+            elif analytics_dir:
+                acc, correct, total, (texts, hits) = eval_set.exact_match(model, batch_size, details=True)
+                print(f"  Exact-match: {acc:.1f}%  ({correct}/{total} correct)")
+                tables = addition_tables(*operands, texts, correct=hits)
+                write_tables(tables, analytics_dir, cond=cond, iter=it)
+                print(format_tables(tables))
+            else:
+                acc, correct, total = eval_set.exact_match(model, batch_size, ci_width=ci_width, ci_step=ci_step)
+                print(f"  Exact-match: {acc:.1f}%  ({correct}/{total} correct)")
+                if ci_width:
+                    print(f"  95% CI:      [{eval_set.interval[0]:.1f}, {eval_set.interval[1]:.1f}]")
+            writer.writerow([cond, it, f"{acc:.1f}"] + ([total] if with_n else []))
+            f.flush()
+            if store is not None:
+                metric = 'tf_accuracy' if teacher_forced else 'ar_accuracy'
+                store.append(experiment, cond, int(it), eval_set.split, metric, acc,
+                             n=total, dataset=eval_set.dataset, source=path)
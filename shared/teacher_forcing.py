@@ -0,0 +1,71 @@
+"""
+Teacher-forced exact-match scoring in one forward pass per batch.
+
+For deterministic targets (a+b= -> build_scratchpad(a, b)) it is often enough
+to know whether the model's argmax at every answer position matches the target
+when the true prefix is fed in. Each sample is laid out as
+
+    input sep | answer stop
+              ^ last prompt token: its logits predict answer[0]
+
+and the whole right-padded batch runs through the trunk once. The answer
+positions are read off the offsets of the separator (the last prompt token,
+position prompt_len - 1) and of the stop token (position prompt_len +
+answer_len); the separator is located by length rather than by searching for
+'=', since inputs such as the phase 2 "a+b=a+b" contain it themselves.
+
+A sample is an exact match when every prediction from the separator up to and
+including the stop token is right. That is also exactly when a greedy decode
+reproduces the target, so teacher-forced exact-match equals greedy
+autoregressive exact-match (up to floating-point ties), at the cost of one
+forward pass instead of one per answer token. The per-offset hit rates show
+where in the answer the model goes wrong.
+"""
+
+import torch
+
+from shared.generation import forward_hidden
+
+
+@torch.no_grad()
+def score_batch(model, prompts, prompt_lengths, expected, answer_lengths):
+    """
+    Teacher-forced argmax hits for one batch.
+
+    Args:
+        prompts:        (B, P) LongTensor of prompts (input + separator), right-padded.
+        prompt_lengths: (B,) prompt lengths.
+        expected:       (B, E) LongTensor of answer, stop token, padding (E > max answer_len).
+        answer_lengths: (B,) answer lengths (stop token excluded).
+
+    Returns:
+        hits  (B, E) bool, argmax == target at answer offset k
+        valid (B, E) bool, k <= answer_len (the answer and its stop token)
+    """
+    device = prompts.device
+    B, E = expected.shape
+    span = prompt_lengths + answer_lengths  # stop token position, one past the last input position
+    width = int(span.max())
+    if width > model.config.block_size:
+        raise ValueError(f"prompt + answer = {width} tokens exceeds block_size={model.config.block_size}")
+
+    # input = prompt followed by the answer, cut before each row's stop token
+    cols = torch.arange(width, device=device)[None, :]
+    offset = cols - prompt_lengths[:, None]
+    from_prompt = prompts.gather(1, cols.clamp(max=prompts.size(1) - 1).expand(B, -1))
+    from_answer = expected.gather(1, offset.clamp(0, E - 1))
+    idx = torch.where(offset < 0, from_prompt, from_answer)
+
+    h = forward_hidden(model, idx)
+    k = torch.arange(E, device=device)[None, :]
+    valid = k <= answer_lengths[:, None]
+    pos = (prompt_lengths[:, None] - 1 + k).clamp(max=width - 1)
+    h = h.gather(1, pos[:, :, None].expand(-1, -1, h.size(-1)))
+    hits = model.lm_head(h).argmax(dim=-1) == expected
+    return hits & valid, valid
+
+
+def exact_and_positions(hits, valid):
+    """Per-sample exact match (B,) and per-offset (hit count, sample count) over a batch."""
+    exact = (hits | ~valid).all(dim=1)
+    return exact, hits.sum(dim=0), valid.sum(dim=0)
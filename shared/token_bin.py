@@ -0,0 +1,140 @@
+"""
+Versioned token stream format for train.bin / val.bin.
+
+The prepare scripts write every split as headerless uint16, which is what
+nanoGPT's train.py memory-maps. The character vocabularies used here have 13-20
+symbols, so half of every file is zero bytes. Version 1 of the format stores
+token ids as uint8 when the vocabulary has at most 256 symbols (uint16
+otherwise) behind a fixed 64-byte little-endian header:
+
+    magic        8s   b'NGTOKBIN'
+    version      u4   1
+    itemsize     u4   1 (uint8) or 2 (uint16)
+    num_tokens   u8
+    num_samples  u8
+    vocab_hash   16s  first 16 bytes of sha256 over the vocabulary in id order
+    split        8s   'train' / 'val', NUL padded
+    (zero padding to 64 bytes, so the token array stays aligned)
+
+open_bin() detects the header and memory-maps the tokens with the right dtype
+and offset; files without the magic are read as legacy uint16, so old datasets
+keep working. meta.pkl written alongside a version 1 file records
+bin_version and bin_dtype as well.
+
+Version 1 files are only readable through this module (SampleLoader,
+PackedLoader, train_ensemble.py); nanoGPT's train.py still expects legacy files,
+so the prepare scripts only write version 1 with --compact.
+"""
+
+import hashlib
+import os
+import struct
+
+import numpy as np
+
+MAGIC = b'NGTOKBIN'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ16s8s')
+HEADER_SIZE = 64
+LEGACY_DTYPE = np.uint16
+
+
+def token_dtype(vocab_size: int):
+    """Smallest unsigned dtype that holds every token id of the vocabulary."""
+    return np.uint8 if vocab_size <= 256 else np.uint16
+
+
+def vocab_hash(itos) -> bytes:
+    """16-byte digest of the vocabulary (itos: {id: char}) in id order."""
+    text = ''.join(itos[i] for i in range(len(itos)))
+    return hashlib.sha256(text.encode('utf-8')).digest()[:16]
+
+
+def meta_fields(vocab_size: int, compact: bool) -> dict:
+    """Extra meta.pkl keys describing the .bin files written next to it."""
+    if not compact:
+        return {}
+    return {'bin_version': VERSION, 'bin_dtype': np.dtype(token_dtype(vocab_size)).name}
+
+
+class BinWriter:
+    """
+    Append token ids to a .bin file in the legacy (compact=False) or version 1 format.
+
+    Used as a context manager; the header counts are filled in on close.
+    """
+
+    def __init__(self, path: str, itos, split: str, compact: bool = True):
+        self.path = path
+        self.compact = compact
+        self.dtype = token_dtype(len(itos)) if compact else LEGACY_DTYPE
+        self.hash = vocab_hash(itos)
+        self.split = split
+        self.num_tokens = 0
+        self.num_samples = 0
+        self.f = open(path, 'wb')
+        if compact:
+            self.f.write(b'\0' * HEADER_SIZE)
+
+    def write(self, ids, num_samples: int = 0) -> None:
+        ids = np.asarray(ids)
+        ids.astype(self.dtype, copy=False).tofile(self.f)
+        self.num_tokens += len(ids)
+        self.num_samples += num_samples
+
+    def close(self) -> None:
+        if self.f.closed:
+            return
+        if self.compact:
+            self.f.seek(0)
+            self.f.write(HEADER.pack(MAGIC, VERSION, np.dtype(self.dtype).itemsize, self.num_tokens,
+                                     self.num_samples, self.hash, self.split.encode('ascii')[:8]))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_bin(path: str, ids, itos, split: str, num_samples: int, compact: bool = True) -> None:
+    """Write one split's token ids in one go."""
+    with BinWriter(path, itos, split, compact) as w:
+        w.write(ids, num_samples)
+
+
+def read_header(path: str):
+    """The version 1 header as a dict, or None for a legacy headerless file."""
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < HEADER_SIZE or raw[:len(MAGIC)] != MAGIC:
+        return None
+    magic, version, itemsize, num_tokens, num_samples, digest, split = HEADER.unpack(raw[:HEADER.size])
+    if version != VERSION:
+        raise ValueError(f"{path}: unsupported .bin format version {version}")
+    return {
+        'version': version,
+        'dtype': {1: np.uint8, 2: np.uint16}[itemsize],
+        'num_tokens': num_tokens,
+        'num_samples': num_samples,
+        'vocab_hash': digest,
+        'split': split.rstrip(b'\0').decode('ascii'),
+    }
+
+
+def open_bin(path: str, meta: dict = None) -> np.ndarray:
+    """
+    Memory-map the token ids of a legacy or version 1 .bin file.
+
+    With meta (the dataset's meta.pkl), a version 1 file's vocabulary hash is
+    checked against meta['itos'].
+    """
+    header = read_header(path)
+    if header is None:
+        return np.memmap(path, dtype=LEGACY_DTYPE, mode='r')
+    if meta is not None and header['vocab_hash'] != vocab_hash(meta['itos']):
+        raise ValueError(f"{path} was written with a different vocabulary than its meta.pkl")
+    if header['num_tokens'] == 0:
+        return np.zeros(0, dtype=header['dtype'])
+    return np.memmap(path, dtype=header['dtype'], mode='r', offset=HEADER_SIZE, shape=(header['num_tokens'],))